@@ -2,16 +2,64 @@
 Database configuration and connection utilities.
 """
 
-import os
+import asyncio
+import atexit
 import logging
-from typing import Optional, Dict, Any
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from dataclasses import dataclass
 
-try:
-    from supabase import create_client, Client
-except ImportError:
-    create_client = None
-    Client = object
+from config.settings import get_runtime_config
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+@lru_cache(maxsize=None)
+def _load_create_client():
+    """Import supabase on first use so worker startup doesn't pay for its import graph."""
+    try:
+        from supabase import create_client
+    except ImportError:
+        return None
+    return create_client
+
+
+def _build_client_options():
+    """
+    Build Supabase client options with a pooled keep-alive HTTP client.
+    
+    Returns None when supabase-py is too old to accept a custom httpx client,
+    in which case its default client is used.
+    """
+    try:
+        import importlib.util
+        import httpx
+        from supabase import ClientOptions
+    except ImportError:
+        return None
+    try:
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=30.0),
+            # Fail fast on connect so a dead pooler endpoint doesn't eat the whole read budget
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+        return ClientOptions(httpx_client=http_client, postgrest_client_timeout=5)
+    except TypeError:
+        return None
+
+
+# Flipped once the minutes increment RPCs turn out not to be deployed, so later calls
+# go straight to the read-then-update fallback
+_minutes_rpc_missing = False
+
+
+def _is_missing_function_error(exc: Exception) -> bool:
+    """Check whether a PostgREST error means the called function doesn't exist."""
+    text = str(exc)
+    return "PGRST202" in text or "Could not find the function" in text
 
 
 @dataclass
@@ -23,10 +71,11 @@ class DatabaseConfig:
     
     @classmethod
     def from_env(cls) -> "DatabaseConfig":
+        runtime = get_runtime_config()
         return cls(
-            url=os.getenv("SUPABASE_URL", ""),
-            service_role_key=os.getenv("SUPABASE_SERVICE_ROLE", "") or os.getenv("SUPABASE_SERVICE_ROLE_KEY", ""),
-            enabled=bool(os.getenv("SUPABASE_URL") and (os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")))
+            url=runtime.supabase_url,
+            service_role_key=runtime.supabase_service_role_key,
+            enabled=bool(runtime.supabase_url and runtime.supabase_service_role_key)
         )
 
 
@@ -35,7 +84,8 @@ class DatabaseClient:
     
     def __init__(self, config: DatabaseConfig):
         self.config = config
-        self._client: Optional[Client] = None
+        self._client: Optional["Client"] = None
+        self._http_client = None
         self._initialize_client()
     
     def _initialize_client(self):
@@ -44,6 +94,7 @@ class DatabaseClient:
             logging.warning("Database client disabled - no Supabase configuration")
             return
         
+        create_client = _load_create_client()
         if not create_client:
             logging.warning("Supabase client not available - install supabase-py")
             return
@@ -53,20 +104,36 @@ class DatabaseClient:
             return
         
         try:
-            self._client = create_client(self.config.url, self.config.service_role_key)
+            # One pooled keep-alive connection set for every query this process makes
+            options = _build_client_options()
+            if options is not None:
+                self._client = create_client(self.config.url, self.config.service_role_key, options=options)
+                self._http_client = options.httpx_client
+            else:
+                self._client = create_client(self.config.url, self.config.service_role_key)
             logging.info("Database client initialized successfully")
         except Exception as e:
             logging.error(f"Failed to initialize database client: {e}")
             self._client = None
     
     @property
-    def client(self) -> Optional[Client]:
+    def client(self) -> Optional["Client"]:
         """Get the Supabase client instance."""
         return self._client
     
     def is_available(self) -> bool:
         """Check if database client is available."""
         return self._client is not None
+
+    def close(self) -> None:
+        """Close pooled HTTP connections held by the client."""
+        if self._http_client is not None:
+            try:
+                self._http_client.close()
+            except Exception as e:
+                logging.warning(f"Failed to close database HTTP client: {e}")
+            self._http_client = None
+        self._client = None
     
     async def fetch_assistant(self, assistant_id: str) -> Optional[Dict[str, Any]]:
         """Fetch assistant configuration from database."""
@@ -75,7 +142,7 @@ class DatabaseClient:
             return None
         
         try:
-            result = self._client.table("assistant").select(
+            result = await asyncio.to_thread(lambda: self._client.table("assistant").select(
                 "id, name, prompt, first_message, calendar, cal_api_key, cal_event_type_id, cal_event_type_slug, cal_timezone, "
                 "llm_provider_setting, llm_model_setting, temperature_setting, max_token_setting, "
                 "voice_provider_setting, voice_model_setting, voice_name_setting, "
@@ -92,7 +159,7 @@ class DatabaseClient:
                 "silence_timeout, max_call_duration, num_words_to_interrupt_assistant, user_id, inbound_workflow_id, "
                 "transfer_enabled, transfer_phone_number, transfer_country_code, transfer_sentence, transfer_condition, "
                 "workspace_id"
-            ).eq("id", assistant_id).single().execute()
+            ).eq("id", assistant_id).single().execute())
             
             if result.data:
                 logging.info(f"Assistant fetched from database: {assistant_id}")
@@ -142,7 +209,7 @@ class DatabaseClient:
             if end_time:
                 call_data["end_time"] = end_time
             
-            result = self._client.table("call_history").upsert(call_data).execute()
+            result = await asyncio.to_thread(lambda: self._client.table("call_history").upsert(call_data).execute())
             
             if result.data:
                 logging.info(f"Call history saved: {call_id}")
@@ -162,9 +229,9 @@ class DatabaseClient:
             return None
         
         try:
-            result = self._client.table("user_twilio_credentials").select(
+            result = await asyncio.to_thread(lambda: self._client.table("user_twilio_credentials").select(
                 "account_sid, auth_token, trunk_sid, is_active"
-            ).eq("user_id", user_id).eq("is_active", True).maybe_single().execute()
+            ).eq("user_id", user_id).eq("is_active", True).maybe_single().execute())
             
             if result.data:
                 return result.data
@@ -176,6 +243,29 @@ class DatabaseClient:
             logging.error(f"Error fetching Twilio credentials for user {user_id}: {e}")
             return None
 
+    async def _increment_minutes_rpc(self, function: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically add minutes through a Postgres function.
+        
+        Returns the updated totals, an empty dict when no row matched, or None
+        when the function isn't deployed and the caller should fall back.
+        """
+        global _minutes_rpc_missing
+        if _minutes_rpc_missing:
+            return None
+        try:
+            result = await asyncio.to_thread(lambda: self._client.rpc(function, params).execute())
+        except Exception as e:
+            if not _is_missing_function_error(e):
+                raise
+            _minutes_rpc_missing = True
+            logging.warning(f"Minutes increment RPC {function} not deployed, using read-then-update: {e}")
+            return None
+        rows = result.data or []
+        if isinstance(rows, dict):
+            return rows
+        return rows[0] if rows else {}
+
     async def deduct_minutes(self, user_id: str, minutes: float) -> Dict[str, Any]:
         """
         Deduct minutes from user's account after a call.
@@ -189,45 +279,57 @@ class DatabaseClient:
             # Convert minutes to integer (round up to be fair)
             minutes_to_deduct = int(minutes) + (1 if minutes % 1 > 0 else 0)
             
-            # Get current minutes
-            result = self._client.table("users").select(
-                "minutes_limit, minutes_used"
-            ).eq("id", user_id).single().execute()
-            
-            if not result.data:
-                logging.warning(f"User not found for minutes deduction: {user_id}")
-                return {"success": False, "error": "User not found"}
+            # One atomic UPDATE when the RPC is deployed; concurrent call ends can't lose increments
+            totals = await self._increment_minutes_rpc(
+                "increment_user_minutes_used", {"p_user_id": user_id, "p_minutes": minutes_to_deduct}
+            )
+            if totals is not None:
+                if not totals:
+                    logging.warning(f"User not found for minutes deduction: {user_id}")
+                    return {"success": False, "error": "User not found"}
+                current_limit = totals.get("minutes_limit", 0) or 0
+                new_used = totals.get("minutes_used", 0) or 0
+                is_unlimited = totals.get("is_unlimited", False)
+            else:
+                # Get current minutes
+                result = await asyncio.to_thread(lambda: self._client.table("users").select(
+                    "minutes_limit, minutes_used, is_unlimited"
+                ).eq("id", user_id).maybe_single().execute())
+                
+                if not (result and result.data):
+                    logging.warning(f"User not found for minutes deduction: {user_id}")
+                    return {"success": False, "error": "User not found"}
+                
+                current_limit = result.data.get("minutes_limit", 0) or 0
+                current_used = result.data.get("minutes_used", 0) or 0
+                new_used = current_used + minutes_to_deduct
+                is_unlimited = result.data.get("is_unlimited", False)
+                
+                # Update minutes_used
+                update_result = await asyncio.to_thread(lambda: self._client.table("users").update({
+                    "minutes_used": new_used
+                }).eq("id", user_id).execute())
+                
+                if not update_result.data:
+                    logging.error(f"Failed to update minutes for user: {user_id}")
+                    return {"success": False, "error": "Failed to update minutes"}
             
-            current_limit = result.data.get("minutes_limit", 0) or 0
-            current_used = result.data.get("minutes_used", 0) or 0
-            new_used = current_used + minutes_to_deduct
             remaining = max(0, current_limit - new_used)
+            logging.info(f"Minutes deducted: user={user_id}, deducted={minutes_to_deduct}, used={new_used}/{current_limit}, remaining={remaining}")
             
-            # Update minutes_used
-            update_result = self._client.table("users").update({
-                "minutes_used": new_used
-            }).eq("id", user_id).execute()
+            # Check if user exceeded limit (is_unlimited bypasses this)
+            exceeded = (not is_unlimited) and (new_used > current_limit)
+            if exceeded:
+                logging.warning(f"User {user_id} exceeded minutes limit: {new_used}/{current_limit}")
             
-            if update_result.data:
-                logging.info(f"Minutes deducted: user={user_id}, deducted={minutes_to_deduct}, used={new_used}/{current_limit}, remaining={remaining}")
-                
-                # Check if user exceeded limit (is_unlimited bypasses this)
-                is_unlimited = result.data.get("is_unlimited", False)
-                exceeded = (not is_unlimited) and (new_used > current_limit)
-                if exceeded:
-                    logging.warning(f"User {user_id} exceeded minutes limit: {new_used}/{current_limit}")
-                
-                return {
-                    "success": True,
-                    "minutes_deducted": minutes_to_deduct,
-                    "minutes_used": new_used,
-                    "minutes_limit": current_limit,
-                    "remaining_minutes": remaining,
-                    "exceeded_limit": exceeded
-                }
-            else:
-                logging.error(f"Failed to update minutes for user: {user_id}")
-                return {"success": False, "error": "Failed to update minutes"}
+            return {
+                "success": True,
+                "minutes_deducted": minutes_to_deduct,
+                "minutes_used": new_used,
+                "minutes_limit": current_limit,
+                "remaining_minutes": remaining,
+                "exceeded_limit": exceeded
+            }
                 
         except Exception as e:
             logging.error(f"Error deducting minutes: {e}")
@@ -243,11 +345,11 @@ class DatabaseClient:
             return {"available": True, "error": "Database not available - allowing call"}
         
         try:
-            result = self._client.table("users").select(
+            result = await asyncio.to_thread(lambda: self._client.table("users").select(
                 "minutes_limit, minutes_used, is_active, is_unlimited"
-            ).eq("id", user_id).single().execute()
+            ).eq("id", user_id).maybe_single().execute())
             
-            if not result.data:
+            if not (result and result.data):
                 logging.warning(f"User not found for minutes check: {user_id}")
                 return {"available": True, "error": "User not found - allowing call"}
             
@@ -302,11 +404,11 @@ class DatabaseClient:
             return {"available": True, "error": "Database not available - allowing call"}
 
         try:
-            result = self._client.table("workspace_settings").select(
-                "id, minute_limit, minutes_used"
-            ).eq("id", workspace_id).single().execute()
+            result = await asyncio.to_thread(lambda: self._client.table("workspace_settings").select(
+                "minute_limit, minutes_used"
+            ).eq("id", workspace_id).maybe_single().execute())
 
-            if not result.data:
+            if not (result and result.data):
                 logging.warning(f"Workspace not found for minutes check: {workspace_id}")
                 return {"available": True, "error": "Workspace not found - allowing call"}
 
@@ -340,35 +442,44 @@ class DatabaseClient:
         try:
             minutes_to_deduct = int(minutes) + (1 if minutes % 1 > 0 else 0)
 
-            result = self._client.table("workspace_settings").select(
-                "minute_limit, minutes_used"
-            ).eq("id", workspace_id).single().execute()
+            totals = await self._increment_minutes_rpc(
+                "increment_workspace_minutes_used", {"p_workspace_id": workspace_id, "p_minutes": minutes_to_deduct}
+            )
+            if totals is not None:
+                if not totals:
+                    return {"success": False, "error": "Workspace not found"}
+                minute_limit = totals.get("minute_limit", 0) or 0
+                new_used = totals.get("minutes_used", 0) or 0
+            else:
+                result = await asyncio.to_thread(lambda: self._client.table("workspace_settings").select(
+                    "minute_limit, minutes_used"
+                ).eq("id", workspace_id).maybe_single().execute())
 
-            if not result.data:
-                return {"success": False, "error": "Workspace not found"}
+                if not (result and result.data):
+                    return {"success": False, "error": "Workspace not found"}
 
-            minute_limit = result.data.get("minute_limit", 0) or 0
-            current_used = result.data.get("minutes_used", 0) or 0
-            new_used = current_used + minutes_to_deduct
-            remaining = max(0, minute_limit - new_used) if minute_limit > 0 else 0
+                minute_limit = result.data.get("minute_limit", 0) or 0
+                current_used = result.data.get("minutes_used", 0) or 0
+                new_used = current_used + minutes_to_deduct
 
-            update_result = self._client.table("workspace_settings").update({
-                "minutes_used": new_used
-            }).eq("id", workspace_id).execute()
+                update_result = await asyncio.to_thread(lambda: self._client.table("workspace_settings").update({
+                    "minutes_used": new_used
+                }).eq("id", workspace_id).execute())
 
-            if update_result.data:
-                logging.info(f"Workspace minutes deducted: workspace={workspace_id}, deducted={minutes_to_deduct}, used={new_used}/{minute_limit}")
-                exceeded = minute_limit > 0 and new_used > minute_limit
-                return {
-                    "success": True,
-                    "minutes_deducted": minutes_to_deduct,
-                    "minutes_used": new_used,
-                    "minute_limit": minute_limit,
-                    "remaining_minutes": remaining,
-                    "exceeded_limit": exceeded,
-                }
-            else:
-                return {"success": False, "error": "Failed to update workspace minutes"}
+                if not update_result.data:
+                    return {"success": False, "error": "Failed to update workspace minutes"}
+
+            remaining = max(0, minute_limit - new_used) if minute_limit > 0 else 0
+            logging.info(f"Workspace minutes deducted: workspace={workspace_id}, deducted={minutes_to_deduct}, used={new_used}/{minute_limit}")
+            exceeded = minute_limit > 0 and new_used > minute_limit
+            return {
+                "success": True,
+                "minutes_deducted": minutes_to_deduct,
+                "minutes_used": new_used,
+                "minute_limit": minute_limit,
+                "remaining_minutes": remaining,
+                "exceeded_limit": exceeded,
+            }
         except Exception as e:
             logging.error(f"Error deducting workspace minutes: {e}")
             return {"success": False, "error": str(e)}
@@ -376,17 +487,31 @@ class DatabaseClient:
 
 # Global database client instance
 _db_client: Optional[DatabaseClient] = None
+_db_client_lock = threading.Lock()
 
 
 def get_database_client() -> Optional[DatabaseClient]:
     """Get the global database client instance."""
     global _db_client
     if _db_client is None:
-        config = DatabaseConfig.from_env()
-        _db_client = DatabaseClient(config)
+        # Guard creation so concurrent first callers (event loop and to_thread workers) share one client
+        with _db_client_lock:
+            if _db_client is None:
+                config = DatabaseConfig.from_env()
+                _db_client = DatabaseClient(config)
+                atexit.register(close_database_client)
     return _db_client
 
 
+def close_database_client() -> None:
+    """Close the global database client and drop it so the next caller starts fresh."""
+    global _db_client
+    with _db_client_lock:
+        if _db_client is not None:
+            _db_client.close()
+            _db_client = None
+
+
 def get_database_config() -> DatabaseConfig:
     """Get database configuration."""
     return DatabaseConfig.from_env()
@@ -192,6 +192,60 @@ class N8NConfig:
     custom_fields: list = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class CallRuntimeConfig:
+    """Per-call environment knobs, snapshotted once per worker instead of read on every call."""
+    participant_timeout_seconds: float = 35.0
+    force_first_message: bool = True
+    backend_url: str = "http://localhost:4000"
+    openai_api_key: str = ""
+    
+    # Local JSONL file that holds database rows which failed to save, for replay by a later worker
+    db_write_spool_path: str = "/tmp/livekit_db_write_spool.jsonl"
+    
+    # Supabase REST credentials; the service role key may be set under either name
+    supabase_url: str = ""
+    supabase_service_role_key: str = ""
+    
+    # LiveKit server credentials used for SIP transfers (None when unset)
+    livekit_url: Optional[str] = None
+    livekit_api_key: Optional[str] = None
+    livekit_api_secret: Optional[str] = None
+    
+    # Provider API keys used when building STT/LLM/TTS plugins (None when unset)
+    deepgram_api_key: Optional[str] = None
+    groq_api_key: Optional[str] = None
+    cerebras_api_key: Optional[str] = None
+    rime_api_key: Optional[str] = None
+    hume_api_key: Optional[str] = None
+    elevenlabs_api_key: Optional[str] = None
+    cartesia_api_key: Optional[str] = None
+    
+    @classmethod
+    def from_env(cls) -> "CallRuntimeConfig":
+        return cls(
+            participant_timeout_seconds=float(os.getenv("PARTICIPANT_TIMEOUT_SECONDS", "35.0")),
+            force_first_message=os.getenv("FORCE_FIRST_MESSAGE", "true").lower() != "false",
+            backend_url=os.getenv("BACKEND_URL", "http://localhost:4000").rstrip("/"),
+            openai_api_key=os.getenv("OPENAI_API_KEY", "").strip(),
+            db_write_spool_path=os.getenv("DB_WRITE_SPOOL_PATH", "/tmp/livekit_db_write_spool.jsonl"),
+            supabase_url=os.getenv("SUPABASE_URL", "").strip(),
+            supabase_service_role_key=(
+                os.getenv("SUPABASE_SERVICE_ROLE", "").strip() or os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
+            ),
+            livekit_url=os.getenv("LIVEKIT_URL"),
+            livekit_api_key=os.getenv("LIVEKIT_API_KEY"),
+            livekit_api_secret=os.getenv("LIVEKIT_API_SECRET"),
+            deepgram_api_key=os.getenv("DEEPGRAM_API_KEY"),
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            cerebras_api_key=os.getenv("CEREBRAS_API_KEY"),
+            rime_api_key=os.getenv("RIME_API_KEY"),
+            hume_api_key=os.getenv("HUME_API_KEY"),
+            elevenlabs_api_key=os.getenv("ELEVENLABS_API_KEY"),
+            cartesia_api_key=os.getenv("CARTESIA_API_KEY")
+        )
+
+
 @dataclass
 class Settings:
     """Main settings container for the LiveKit voice agent system."""
@@ -310,6 +364,24 @@ def reload_settings() -> Settings:
     return _settings
 
 
+_runtime_config: Optional[CallRuntimeConfig] = None
+
+
+def get_runtime_config() -> CallRuntimeConfig:
+    """Get the global per-call runtime configuration snapshot."""
+    global _runtime_config
+    if _runtime_config is None:
+        _runtime_config = CallRuntimeConfig.from_env()
+    return _runtime_config
+
+
+def reload_runtime_config() -> CallRuntimeConfig:
+    """Re-read the per-call runtime configuration from the environment."""
+    global _runtime_config
+    _runtime_config = CallRuntimeConfig.from_env()
+    return _runtime_config
+
+
 def validate_model_names(config: Dict[str, Any]) -> Dict[str, Any]:
     """Validate and fix model names to prevent API errors."""
     # Valid OpenAI models
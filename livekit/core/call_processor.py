@@ -7,8 +7,9 @@ from typing import Optional, Dict, Any
 from livekit.agents import JobContext
 
 from config.settings import get_settings
-from integrations.supabase_client import SupabaseClient
+from integrations.supabase_client import get_supabase_client
 from integrations.n8n_integration import N8NIntegration
+from utils.helpers import parse_metadata
 from .inbound_handler import InboundCallHandler
 from .outbound_handler import OutboundCallHandler
 
@@ -18,7 +19,7 @@ class CallProcessor:
     
     def __init__(self):
         self.settings = get_settings()
-        self.supabase = SupabaseClient()
+        self.supabase = get_supabase_client()
         self.n8n = N8NIntegration()
         self.logger = logging.getLogger(__name__)
         
@@ -64,8 +65,7 @@ class CallProcessor:
             # Check job metadata for outbound call indicators
             metadata = ctx.job.metadata
             if metadata:
-                import json
-                dial_info = json.loads(metadata)
+                dial_info = parse_metadata(metadata)
                 if dial_info.get("phone_number") and dial_info.get("agentId"):
                     self.logger.info(f"CALL_TYPE_DETERMINED | type=outbound | phone={dial_info.get('phone_number')}")
                     return "outbound"
@@ -2,6 +2,7 @@
 Inbound call handler for processing incoming calls.
 """
 
+import asyncio
 import logging
 from typing import Optional, Dict, Any
 from livekit.agents import JobContext, Agent
@@ -75,7 +76,12 @@ class InboundCallHandler:
         """Resolve assistant configuration for a given DID."""
         try:
             # Query database for assistant associated with this DID
-            result = await self.supabase.client.table("assistants").select("*").eq("phone_number", called_did).execute()
+            # supabase-py is synchronous; run the query in a worker thread so the call's
+            # event loop keeps servicing audio while the request is in flight
+            result = await asyncio.wait_for(
+                asyncio.to_thread(lambda: self.supabase.client.table("assistants").select("*").eq("phone_number", called_did).execute()),
+                timeout=5
+            )
             
             if result.data and len(result.data) > 0:
                 assistant_data = result.data[0]
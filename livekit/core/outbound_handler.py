@@ -9,6 +9,7 @@ from livekit.agents import JobContext, Agent
 from config.settings import Settings
 from integrations.supabase_client import SupabaseClient
 from integrations.n8n_integration import N8NIntegration
+from utils.helpers import parse_metadata
 
 
 class OutboundCallHandler:
@@ -51,8 +52,7 @@ class OutboundCallHandler:
             if not ctx.job.metadata:
                 return None
             
-            import json
-            metadata = json.loads(ctx.job.metadata)
+            metadata = parse_metadata(ctx.job.metadata)
             
             campaign_info = {
                 "phone_number": metadata.get("phone_number"),
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
 import logging
-import hashlib
 import time
 from dataclasses import dataclass
-from typing import Protocol, Optional
+from typing import Protocol, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from livekit.agents.utils import http_context
 
+from utils.helpers import parse_json
+
 # Global cache for calendar slots
 _calendar_cache = {}
 _cache_ttl = 20  # Reduced for near real-time availability (Fix #2)
 _cache_max_size = 100  # Maximum cache entries
 
-def _get_calendar_cache_key(event_type_id: str, start_time: str, end_time: str) -> str:
-    """Generate cache key for calendar slots."""
-    return hashlib.md5(f"{event_type_id}:{start_time}:{end_time}".encode()).hexdigest()
+def _get_calendar_cache_key(event_type_id: str, start_time: str, end_time: str) -> Tuple[str, str, str]:
+    """Generate cache key for calendar slots (a plain tuple; dict hashing is all we need)."""
+    return (event_type_id, start_time, end_time)
 
 def _is_calendar_cache_valid(timestamp: float) -> bool:
     """Check if calendar cache entry is still valid."""
@@ -39,6 +41,25 @@ def _clean_calendar_cache():
         for key, _ in sorted_items[:len(_calendar_cache) - _cache_max_size]:
             del _calendar_cache[key]
 
+# Event type lengths shared across rooms, keyed by (api_key, event_type_id) -> (length, timestamp).
+# Lets initialize() skip the event-type round trip once a worker has seen the calendar; entries
+# expire so a length edited in Cal.com is picked up without a worker restart.
+_event_length_cache: dict[tuple[str, str], tuple[int, float]] = {}
+_event_length_ttl = 300  # seconds
+# Per-key fetch locks, only held while a fetch for that key is in flight
+_event_length_locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+def _get_cached_event_length(key: tuple[str, str]) -> Optional[int]:
+    """Return a cached event length, or None if missing/expired."""
+    entry = _event_length_cache.get(key)
+    if entry is None:
+        return None
+    length, timestamp = entry
+    if time.time() - timestamp >= _event_length_ttl:
+        _event_length_cache.pop(key, None)
+        return None
+    return length
+
 # API versions & base URLs
 CAL_EVENT_TYPES_VERSION = "2024-06-14"   # v2 event types requires this header
 CAL_BOOKINGS_VERSION    = "2024-08-13"   # v2 bookings requires this header
@@ -200,6 +221,29 @@ class CalComCalendar(Calendar):
             self._log.info("Cal.com: initialize skipped (no event_type_id). Default 30 min length.")
             return
 
+        key = (self._api_key, str(self._event_type_id))
+        cached_length = _get_cached_event_length(key)
+        if cached_length is not None:
+            self._event_length = cached_length
+            self._log.info("CALENDAR_INIT_CACHE_HIT | event_type_id=%s | length=%d", self._event_type_id, cached_length)
+            return
+
+        # One event-type fetch per calendar even when several rooms start at once
+        lock = _event_length_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                cached_length = _get_cached_event_length(key)
+                if cached_length is not None:
+                    self._event_length = cached_length
+                    return
+                await self._fetch_event_type()
+                _event_length_cache[key] = (self._event_length, time.time())
+        finally:
+            # Rooms still waiting hold their own reference; later rooms hit the cache
+            if _event_length_locks.get(key) is lock and not lock.locked():
+                del _event_length_locks[key]
+
+    async def _fetch_event_type(self) -> None:
         url = f"{BASE_URL_V2}event-types/{self._event_type_id}"
         self._log.info(f"Cal.com: Fetching event type from {url}")
         
@@ -221,7 +265,7 @@ class CalComCalendar(Calendar):
                                     raise Exception(f"Cal.com event type fetch failed: {resp2.status} - {txt2}")
                                 # Parse the retry response, not the original
                                 try:
-                                    data = await resp2.json()
+                                    data = await resp2.json(loads=parse_json)
                                 except Exception:
                                     self._log.error("Cal.com: event type response not JSON: %s", txt2)
                                     raise Exception("Cal.com event type response not valid JSON")
@@ -238,7 +282,7 @@ class CalComCalendar(Calendar):
                                         raise Exception(f"Cal.com event type fetch failed: {resp2.status} - {txt2}")
                                     # Parse the retry response, not the original
                                     try:
-                                        data = await resp2.json()
+                                        data = await resp2.json(loads=parse_json)
                                     except Exception:
                                         self._log.error("Cal.com: event type response not JSON: %s", txt2)
                                         raise Exception("Cal.com event type response not valid JSON")
@@ -251,7 +295,7 @@ class CalComCalendar(Calendar):
                 else:
                     # Happy path: parse resp
                     try:
-                        data = await resp.json()
+                        data = await resp.json(loads=parse_json)
                     except Exception:
                         self._log.error("Cal.com: event type response not JSON: %s", txt)
                         raise Exception("Cal.com event type response not valid JSON")
@@ -369,17 +413,20 @@ class CalComCalendar(Calendar):
                 self._log.info("Cal.com: Requesting v2 slots %s params=%s (attempt %d)", url, params, attempt + 1)
 
                 async with self._http.get(url, headers=self._headers_v2(CAL_BOOKINGS_VERSION), params=params, timeout=30) as resp:
-                    txt = await resp.text()
+                    # Read the body once; the JSON parser takes bytes directly, text is only built for logging
+                    body = await resp.read()
 
                     if resp.status == 200:
                         try:
-                            payload = await resp.json()
+                            payload = parse_json(body)
                             return self._parse_slots_response_v2(payload, request_tz)
                         except Exception:
-                            self._log.error("Cal.com V2 /slots/available non-JSON response: %s", txt)
+                            self._log.error("Cal.com V2 /slots/available non-JSON response: %s", body.decode("utf-8", errors="replace"))
                             return None
 
-                    elif resp.status >= 500:
+                    txt = body.decode("utf-8", errors="replace")
+
+                    if resp.status >= 500:
                         if attempt < 2:
                             wait_time = 0.8 * (2 ** attempt)
                             self._log.warning("Cal.com V2 /slots/available error %s (attempt %d), retrying in %.1fs: %s",
@@ -545,7 +592,7 @@ class CalComCalendar(Calendar):
 
                 # Parse v2 bookings response according to official API spec
                 try:
-                    response_data = await resp.json()
+                    response_data = await resp.json(loads=parse_json)
                     # A booking is successful if status is "success" OR it has an ID/UID (Fix #2 - Flexible Parsing)
                     data_obj = response_data.get("data", {}) if isinstance(response_data.get("data"), dict) else response_data
                     is_success = response_data.get("status") == "success" or bool(data_obj.get("id") or data_obj.get("uid"))
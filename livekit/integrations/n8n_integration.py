@@ -2,12 +2,14 @@
 N8N integration for webhook handling and data collection.
 """
 
-import json
+import asyncio
 import logging
 import datetime
 from typing import Dict, Any, Optional, List
 import aiohttp
 
+from utils.helpers import dump_json, parse_json
+
 
 class N8NPayloadBuilder:
     """Builds N8N webhook payloads."""
@@ -164,7 +166,7 @@ class N8NIntegration:
         """
         try:
             # Convert payload to JSON
-            json_data = json.dumps(payload, default=str)
+            json_data = dump_json(payload, default=str)
             
             self.logger.info(
                 f"N8N_WEBHOOK_SENDING | url={webhook_url} | payload_size={len(json_data)}"
@@ -180,7 +182,7 @@ class N8NIntegration:
                         "User-Agent": "LiveKit-Voice-Agent/1.0"
                     }
                 ) as response:
-                    response_data = await response.json()
+                    response_data = await response.json(loads=parse_json)
                     
                     if response.status == 200:
                         self.logger.info(
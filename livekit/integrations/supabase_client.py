@@ -2,6 +2,7 @@
 Supabase client wrapper for database operations.
 """
 
+import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 from config.database import DatabaseClient, get_database_client
@@ -96,6 +97,9 @@ class SupabaseClient:
                 )
                 
                 if result.data:
+                    # Don't let a cached copy of the row hide the new spreadsheet ID from later calls
+                    from services.config_resolver import invalidate_assistant_cache
+                    invalidate_assistant_cache(assistant_id)
                     self.logger.info(f"N8N_SPREADSHEET_SAVED | assistant_id={assistant_id} | spreadsheet_id={spreadsheet_id}")
                     return True
                 else:
@@ -105,3 +109,15 @@ class SupabaseClient:
             except Exception as e:
                 self.logger.error(f"Error saving N8N spreadsheet ID: {e}")
                 return False
+
+
+# Global wrapper instance, shared by every call handled in this worker
+_supabase_client: Optional[SupabaseClient] = None
+
+
+def get_supabase_client() -> SupabaseClient:
+    """Get the global Supabase client wrapper."""
+    global _supabase_client
+    if _supabase_client is None:
+        _supabase_client = SupabaseClient()
+    return _supabase_client
@@ -0,0 +1,198 @@
+"""
+Local write-ahead spool for database rows that failed to save.
+
+When Supabase is briefly unreachable at call end, the row is appended to a
+JSONL file instead of being lost; the next worker process to start replays the
+spool in batched inserts and drops whatever was saved. A row can carry a follow-up
+(e.g. the call's minutes deduction) that is handed to the flush caller once the row
+is saved, so work gated on the save isn't lost with it. Rows the database rejects
+outright, and rows older than MAX_SPOOL_AGE_SECONDS, are dropped rather than retried.
+"""
+
+import fcntl
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import get_runtime_config
+from utils.helpers import dump_json, parse_json
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 100
+# Bounds on the spool so rows that can never be saved don't accumulate forever
+MAX_SPOOL_BYTES = 50 * 1024 * 1024
+MAX_SPOOL_AGE_SECONDS = 7 * 24 * 3600
+
+# SQLSTATE classes for errors that retrying the same row can't fix:
+# data exceptions, integrity constraint violations, syntax/undefined objects
+_PERMANENT_SQLSTATE_CLASSES = ("22", "23", "42")
+
+# after_save is the follow-up passed to flush_spool's on_saved once the row is saved (or None)
+SpoolEntry = Tuple[str, Dict[str, Any], float, Optional[Dict[str, Any]]]   # (table, row, spooled_at, after_save)
+PendingRow = Tuple[Dict[str, Any], float, Optional[Dict[str, Any]]]        # (row, spooled_at, after_save)
+
+
+def spool_row(table: str, payload: Dict[str, Any], after_save: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Append a row to the spool for a later retry.
+
+    Blocking file I/O; call through asyncio.to_thread from async code.
+
+    Args:
+        table: Target table name
+        payload: Row to insert
+        after_save: JSON-serializable follow-up handed to flush_spool's on_saved
+            once the row has been saved (e.g. a minutes deduction)
+    """
+    spool_path = get_runtime_config().db_write_spool_path
+    line = _encode_entry(table, payload, time.time(), after_save)
+    with open(spool_path, "a", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            if f.tell() >= MAX_SPOOL_BYTES:
+                logger.error("DB_WRITE_SPOOL_FULL | table=%s | path=%s | row dropped", table, spool_path)
+                return
+            f.write(line)
+            f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    logger.warning("DB_WRITE_SPOOLED | table=%s | path=%s", table, spool_path)
+
+
+def _encode_entry(table: str, row: Dict[str, Any], spooled_at: float, after_save: Optional[Dict[str, Any]]) -> str:
+    """Serialize one spool entry as a JSONL line."""
+    entry = {"table": table, "row": row, "spooled_at": spooled_at}
+    if after_save is not None:
+        entry["after_save"] = after_save
+    return dump_json(entry, default=str) + "\n"
+
+
+def _read_spool(f) -> List[SpoolEntry]:
+    """Parse spooled entries, skipping lines that don't decode."""
+    entries = []
+    now = time.time()
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = parse_json(line)
+            # Entries written before timestamps were recorded count as fresh
+            entries.append((entry["table"], entry["row"], float(entry.get("spooled_at", now)), entry.get("after_save")))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.warning("DB_WRITE_SPOOL_BAD_LINE | dropped")
+    return entries
+
+
+def _is_permanent_error(error: Exception) -> bool:
+    """Whether the database rejected the row itself, so a retry would fail the same way."""
+    code = getattr(error, "code", None)
+    if not isinstance(code, str):
+        return False
+    # PostgREST request errors (bad column, bad payload) carry PGRST codes
+    return code.startswith("PGRST") or code[:2] in _PERMANENT_SQLSTATE_CLASSES
+
+
+def _insert_rows_individually(client, table: str, rows: List[PendingRow]) -> Tuple[List[PendingRow], List[PendingRow]]:
+    """
+    Insert rows one at a time after their batch failed.
+
+    Returns:
+        The rows saved, and the rows to keep for a later retry
+    """
+    saved = []
+    keep = []
+    for index, pending in enumerate(rows):
+        try:
+            client.table(table).insert(pending[0], returning="minimal").execute()
+            saved.append(pending)
+        except Exception as e:
+            if _is_permanent_error(e):
+                logger.error("DB_WRITE_SPOOL_ROW_REJECTED | table=%s | error=%s | row dropped", table, str(e))
+                continue
+            # The database itself is unreachable; keep this and the untried rows for next time
+            logger.warning("DB_WRITE_SPOOL_ROW_FAILED | table=%s | error=%s", table, str(e))
+            keep.extend(rows[index:])
+            break
+    return saved, keep
+
+
+def flush_spool(client, on_saved: Optional[Callable[[Dict[str, Any]], None]] = None) -> int:
+    """
+    Replay spooled rows with one insert per table batch.
+
+    When a batch fails its rows are retried one at a time: rows the database
+    rejects are dropped, rows that hit a transient error stay in the spool.
+    Rows older than MAX_SPOOL_AGE_SECONDS are dropped without a retry.
+    Blocking; intended for process startup or a worker thread.
+
+    Args:
+        client: Supabase client
+        on_saved: Called with each saved row's after_save follow-up, after the
+            spool has been rewritten so a saved row is never replayed twice
+
+    Returns:
+        Number of rows saved
+    """
+    spool_path = get_runtime_config().db_write_spool_path
+    if client is None or not os.path.exists(spool_path):
+        return 0
+
+    saved: List[PendingRow] = []
+    with open(spool_path, "r+", encoding="utf-8") as f:
+        # Hold the lock for the whole replay so concurrent workers neither double-insert
+        # nor append into a file that's about to be rewritten
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            entries = _read_spool(f)
+            if not entries:
+                return 0
+
+            cutoff = time.time() - MAX_SPOOL_AGE_SECONDS
+            by_table: Dict[str, List[PendingRow]] = defaultdict(list)
+            expired = 0
+            for table, row, spooled_at, after_save in entries:
+                if spooled_at < cutoff:
+                    expired += 1
+                    continue
+                by_table[table].append((row, spooled_at, after_save))
+            if expired:
+                logger.warning("DB_WRITE_SPOOL_EXPIRED | rows=%s | dropped", expired)
+
+            remaining: List[SpoolEntry] = []
+            for table, rows in by_table.items():
+                for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+                    batch = rows[i:i + FLUSH_BATCH_SIZE]
+                    try:
+                        client.table(table).insert([pending[0] for pending in batch], returning="minimal").execute()
+                        saved.extend(batch)
+                    except Exception as e:
+                        logger.warning("DB_WRITE_SPOOL_FLUSH_FAILED | table=%s | rows=%s | error=%s", table, len(batch), str(e))
+                        # One bad row fails the whole batch; isolate it instead of keeping all of them
+                        batch_saved, keep = _insert_rows_individually(client, table, batch)
+                        saved.extend(batch_saved)
+                        remaining.extend((table, *pending) for pending in keep)
+
+            f.seek(0)
+            f.truncate()
+            for table, row, spooled_at, after_save in remaining:
+                f.write(_encode_entry(table, row, spooled_at, after_save))
+            f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+    if saved:
+        logger.info("DB_WRITE_SPOOL_FLUSHED | rows=%s | remaining=%s", len(saved), len(remaining))
+
+    if on_saved is not None:
+        for _, _, after_save in saved:
+            if after_save is None:
+                continue
+            try:
+                on_saved(after_save)
+            except Exception as e:
+                logger.error("DB_WRITE_SPOOL_AFTER_SAVE_FAILED | error=%s", str(e))
+    return len(saved)
@@ -5,13 +5,15 @@ This replaces the complex main.py with a simplified, maintainable approach.
 
 from __future__ import annotations
 
+import contextlib
 import logging
 import os
 import sys
 import json
 import asyncio
 import datetime
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 import httpx
 from openai import AsyncOpenAI
@@ -106,9 +108,12 @@ except ImportError:
 from services.call_outcome_service import CallOutcomeService
 from services.agent_factory import AgentFactory
 from services.config_resolver import ConfigResolver
-from integrations.supabase_client import SupabaseClient
+from services.rag_service import get_rag_service
+from integrations.supabase_client import get_supabase_client
+from integrations.write_spool import flush_spool, spool_row
 from integrations.calendar_api import CalComCalendar, CalendarResult, CalendarError
 from config.database import get_database_client
+from config.settings import get_runtime_config
 from utils.logging_hardening import configure_safe_logging
 from utils.latency_logger import (
     measure_latency_context, 
@@ -116,20 +121,25 @@ from utils.latency_logger import (
     clear_tracker,
     LatencyProfiler
 )
-from utils.data_extractors import extract_phone_from_room, extract_name_from_summary, extract_call_sid_from_metadata
+from utils.data_extractors import CallMetadata, metadata_dict, extract_phone_from_room, extract_name_from_summary, extract_call_sid_from_metadata
+from utils.helpers import dump_json, parse_json
 
-# Configure logging with security hardening
-configure_safe_logging(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Log Cartesia availability status after logger is initialized
-if CARTESIA_AVAILABLE:
-    logger.info("CARTESIA_PACKAGE_LOADED | Cartesia plugin successfully imported")
-else:
-    logger.warning("CARTESIA_IMPORT_FAILED | Cartesia plugin not available - install with: pip install livekit-plugins-cartesia")
 
-# Enable DEBUG logging for livekit.agents to see detailed transcript information
-logging.getLogger("livekit.agents").setLevel(logging.DEBUG)
+def _configure_logging() -> None:
+    """Configure hardened logging once per process (worker main process and each job process)."""
+    configure_safe_logging(level=logging.INFO)
+
+    # Log Cartesia availability status after logger is initialized
+    if CARTESIA_AVAILABLE:
+        logger.info("CARTESIA_PACKAGE_LOADED | Cartesia plugin successfully imported")
+    else:
+        logger.warning("CARTESIA_IMPORT_FAILED | Cartesia plugin not available - install with: pip install livekit-plugins-cartesia")
+
+    # Enable DEBUG logging for livekit.agents to see detailed transcript information
+    logging.getLogger("livekit.agents").setLevel(logging.DEBUG)
+
 
 # Enable DEBUG logging for Hume plugin to capture detailed error responses
 if HUME_AVAILABLE:
@@ -184,12 +194,54 @@ def _build_background_ambient_config(setting: Optional[str]):
     logger.debug("BACKGROUND_AUDIO_PRESET_UNKNOWN | setting=%s", key)
     return None
 
-# ---- Shared OpenAI client & HTTP transport (used by all OpenAI calls) ----
+
+def _transcript_text(content: Any) -> str:
+    """Flatten a session history content value (str, list of parts, other) into stripped text."""
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        return " ".join(part for part in (str(c).strip() for c in content if c) if part)
+    return str(content).strip()
+
+
+def _normalize_transcript(session_history: list) -> Tuple[list, str]:
+    """
+    Convert session history into the [{role, content}] transcription format, dropping
+    empty turns, and render the same turns as "role: content" lines for LLM prompts.
+    
+    Both are built in one pass so post-call analysis and the history save share them.
+    """
+    transcription = []
+    lines = []
+    for item in session_history:
+        if not (isinstance(item, dict) and "role" in item and "content" in item):
+            continue
+        text = _transcript_text(item["content"])
+        if not text:
+            continue
+        transcription.append({"role": item["role"], "content": text})
+        lines.append(f"{item['role']}: {text}\n")
+    return transcription, "".join(lines)
+
+# Valid columns in call_history table based on migrations
+# Note: call_outcome column may not exist yet - exclude it until migration is applied
+_CALL_HISTORY_COLUMNS = frozenset({
+    "call_id", "assistant_id", "phone_number", "participant_identity",
+    "start_time", "end_time", "call_duration", "call_status",
+    "transcription", "call_summary", "success_evaluation", "structured_data",
+    "outcome_confidence", "outcome_reasoning", "outcome_key_points",
+    "outcome_sentiment", "follow_up_required", "follow_up_notes",
+    "call_sid", "outcome",
+})
+
+
+# ---- Shared OpenAI client & HTTP transport (used by all OpenAI and backend calls) ----
 _HTTP_TIMEOUT = httpx.Timeout(connect=5.0, read=60.0, write=30.0, pool=30.0)  # Increased read timeout
 _HTTP_CLIENT = httpx.AsyncClient(timeout=_HTTP_TIMEOUT)
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
 _OPENAI_CLIENT = AsyncOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
+    api_key=get_runtime_config().openai_api_key or None,
     http_client=_HTTP_CLIENT,  # ensures streaming reads don't hit short defaults
     timeout=60.0,              # increased overall guard for better reliability
     max_retries=5,             # increased retries for better resilience (was 3)
@@ -203,8 +255,8 @@ _OPENAI_CLIENT = AsyncOpenAI(
 class CallHandler:
     """Simplified call handler following LiveKit patterns."""
 
-    def __init__(self):
-        self.supabase = SupabaseClient()
+    def __init__(self, supabase=None):
+        self.supabase = supabase or get_supabase_client()
         self.call_outcome_service = CallOutcomeService()
         
         # Initialize refactored components
@@ -217,11 +269,6 @@ class CallHandler:
         self._prewarmed_vad = None
         self._prewarmed_rag = None
         
-        # Latency monitoring variables
-        self.end_of_utterance_delay = 0
-        self.llm_latency = 0
-        self.tts_latency = 0
-        
         # Track idle message counts per session
         self._idle_message_counts = {}
         
@@ -233,14 +280,10 @@ class CallHandler:
         try:
             # logger.info("PREWARM_START | warming up system components")
             
-            # Pre-warm VAD (Voice Activity Detection)
-            self._prewarmed_vad = silero.VAD.load()
-            # logger.info("PREWARM_VAD | VAD loaded successfully")
+            # VAD is loaded once per worker process in prewarm() and picked up in handle_call
             
-            # Pre-warm RAG service
-            from services.rag_service import RAGService
-            self._prewarmed_rag = RAGService()  # RAGService initializes itself in constructor
-            # logger.info("PREWARM_RAG | RAG service initialized")
+            # The RAG service (and its Pinecone import) is built by the agent only when the
+            # assistant has a knowledge base
             
             # LLM will be created dynamically based on assistant configuration
             # No hardcoded LLM prewarming - each assistant uses its own LLM settings
@@ -256,30 +299,31 @@ class CallHandler:
             # logger.error("PREWARM_ERROR | failed to pre-warm components: %s", str(e))
             pass
 
-    def _on_metrics_collected(self, event: MetricsCollectedEvent):
-        """Handle metrics collection events for latency monitoring."""
+    def _on_metrics_collected(self, event: MetricsCollectedEvent, latency: Dict[str, float]):
+        """Handle metrics collection events for latency monitoring; latency holds this call's last turn."""
         try:
             if event.type != "metrics_collected":
                 return
 
             # Update latency variables based on metric type
             if event.metrics.type == "eou_metrics":
-                self.end_of_utterance_delay = event.metrics.end_of_utterance_delay
-                logger.info(f"LATENCY_EOU | end_of_utterance_delay={self.end_of_utterance_delay}s")
+                latency["end_of_utterance_delay"] = event.metrics.end_of_utterance_delay
+                logger.debug("LATENCY_EOU | end_of_utterance_delay=%ss", latency["end_of_utterance_delay"])
 
             elif event.metrics.type == "llm_metrics":
-                self.llm_latency = event.metrics.ttft
-                logger.info(f"LATENCY_LLM | ttft={self.llm_latency}s")
+                latency["llm"] = event.metrics.ttft
+                logger.debug("LATENCY_LLM | ttft=%ss", latency["llm"])
 
             elif event.metrics.type == "tts_metrics":
-                self.tts_latency = event.metrics.ttfb
+                latency["tts"] = event.metrics.ttfb
                 # Calculate and log total latency when TTS completes
-                total_latency = self.end_of_utterance_delay + self.llm_latency + self.tts_latency
-                logger.info(f"LATENCY_TTS | ttfb={self.tts_latency}s")
-                logger.info(f"LATENCY_TOTAL | transcription_delay={self.end_of_utterance_delay}s | llm={self.llm_latency}s | tts={self.tts_latency}s | total={total_latency}s")
+                total_latency = latency["end_of_utterance_delay"] + latency["llm"] + latency["tts"]
+                logger.debug("LATENCY_TTS | ttfb=%ss", latency["tts"])
+                logger.info("LATENCY_TOTAL | transcription_delay=%ss | llm=%ss | tts=%ss | total=%ss",
+                            latency["end_of_utterance_delay"], latency["llm"], latency["tts"], total_latency)
 
         except Exception as e:
-            logger.error(f"METRICS_COLLECTION_ERROR | error={str(e)}")
+            logger.error("METRICS_COLLECTION_ERROR | error=%s", str(e))
 
     async def _on_user_state_changed(self, event: UserStateChangedEvent, session: AgentSession, config: Dict[str, Any], ctx: JobContext) -> None:
         """Handle user state changes to send idle messages when user goes away."""
@@ -290,7 +334,7 @@ class CallHandler:
             if event.old_state == "away" and event.new_state != "away":
                 if session_id in self._idle_message_counts:
                     self._idle_message_counts[session_id] = 0
-                    logger.info(f"IDLE_MESSAGE_RESET | user returned from away state")
+                    logger.info("IDLE_MESSAGE_RESET | user returned from away state")
                 return
             
             # Only handle transitions to 'away' state
@@ -313,19 +357,19 @@ class CallHandler:
             # Check if we've exceeded the maximum
             current_count = self._idle_message_counts[session_id]
             if current_count >= max_idle_messages:
-                logger.info(f"IDLE_MESSAGE_MAX_REACHED | count={current_count} | max={max_idle_messages} | ending call")
+                logger.info("IDLE_MESSAGE_MAX_REACHED | count=%s | max=%s | ending call", current_count, max_idle_messages)
                 # End the call after max idle messages
                 try:
                     # Disconnect the room using the context
                     await ctx.room.disconnect()
                     logger.info("IDLE_MESSAGE_DISCONNECT_SUCCESS | room disconnected")
                 except Exception as disconnect_error:
-                    logger.error(f"IDLE_MESSAGE_DISCONNECT_ERROR | error={str(disconnect_error)}")
+                    logger.error("IDLE_MESSAGE_DISCONNECT_ERROR | error=%s", str(disconnect_error))
                     # Fallback: try to close the session
                     try:
                         await session.aclose()
                     except Exception as close_error:
-                        logger.error(f"IDLE_MESSAGE_CLOSE_ERROR | error={str(close_error)}")
+                        logger.error("IDLE_MESSAGE_CLOSE_ERROR | error=%s", str(close_error))
                 return
             
             # Select an idle message (cycle through available messages)
@@ -335,23 +379,23 @@ class CallHandler:
             # Increment the count
             self._idle_message_counts[session_id] = current_count + 1
             
-            logger.info(f"IDLE_MESSAGE_SENDING | count={current_count + 1}/{max_idle_messages} | message='{idle_message[:60]}{'...' if len(idle_message) > 60 else ''}'")
+            logger.info("IDLE_MESSAGE_SENDING | count=%s/%s | message='%s%s'", current_count + 1, max_idle_messages, idle_message[:60], '...' if len(idle_message) > 60 else '')
             
             # Send the idle message
             try:
                 await session.say(idle_message)
-                logger.info(f"IDLE_MESSAGE_SENT | count={current_count + 1}/{max_idle_messages}")
+                logger.info("IDLE_MESSAGE_SENT | count=%s/%s", current_count + 1, max_idle_messages)
             except AttributeError:
                 # Fallback if say() not available
                 await session.generate_reply(
                     instructions=f"Say exactly this: '{idle_message}'"
                 )
-                logger.info(f"IDLE_MESSAGE_SENT_FALLBACK | count={current_count + 1}/{max_idle_messages}")
+                logger.info("IDLE_MESSAGE_SENT_FALLBACK | count=%s/%s", current_count + 1, max_idle_messages)
             except Exception as say_error:
-                logger.error(f"IDLE_MESSAGE_SEND_ERROR | error={str(say_error)}")
+                logger.error("IDLE_MESSAGE_SEND_ERROR | error=%s", str(say_error))
                 
         except Exception as e:
-            logger.error(f"IDLE_MESSAGE_HANDLER_ERROR | error={str(e)}")
+            logger.error("IDLE_MESSAGE_HANDLER_ERROR | error=%s", str(e))
 
     def _start_max_call_duration_timer(self, ctx: JobContext, config: Dict[str, Any], session: AgentSession) -> None:
         """Automatically hang up the call once the configured max duration elapses."""
@@ -368,7 +412,7 @@ class CallHandler:
         if duration_seconds <= 0:
             return
 
-        logger.info(f"MAX_DURATION_TIMER_START | duration_seconds={duration_seconds}")
+        logger.info("MAX_DURATION_TIMER_START | duration_seconds=%s", duration_seconds)
 
         async def enforce_max_duration():
             try:
@@ -379,7 +423,7 @@ class CallHandler:
                 end_call_message = config.get("end_call_message")
                 if end_call_message:
                     try:
-                        logger.info(f"MAX_DURATION_END_MESSAGE | message='{end_call_message[:60]}{'...' if len(end_call_message) > 60 else ''}'")
+                        logger.info("MAX_DURATION_END_MESSAGE | message='%s%s'", end_call_message[:60], '...' if len(end_call_message) > 60 else '')
                         try:
                             await session.say(end_call_message)
                         except AttributeError:
@@ -391,7 +435,7 @@ class CallHandler:
                         await asyncio.sleep(max(message_duration, 3))  # At least 3 seconds
                         logger.info("MAX_DURATION_END_MESSAGE_SPOKEN | waiting complete")
                     except Exception as message_error:
-                        logger.error(f"MAX_DURATION_END_MESSAGE_ERROR | error={str(message_error)}")
+                        logger.error("MAX_DURATION_END_MESSAGE_ERROR | error=%s", str(message_error))
                         # Continue to hangup even if message failed
                 
                 logger.info("MAX_DURATION_HANGUP | hanging up call by deleting room")
@@ -405,18 +449,18 @@ class CallHandler:
                     )
                     logger.info("MAX_DURATION_HANGUP_SUCCESS | room deleted successfully")
                 except Exception as delete_error:
-                    logger.error(f"MAX_DURATION_HANGUP_FAILED | error={str(delete_error)}")
+                    logger.error("MAX_DURATION_HANGUP_FAILED | error=%s", str(delete_error))
                     # Fallback to disconnect if delete_room fails
                     try:
                         await ctx.room.disconnect()
                         logger.info("MAX_DURATION_HANGUP_FALLBACK | used room.disconnect()")
                     except Exception as disconnect_error:
-                        logger.error(f"MAX_DURATION_HANGUP_FALLBACK_FAILED | error={str(disconnect_error)}")
+                        logger.error("MAX_DURATION_HANGUP_FALLBACK_FAILED | error=%s", str(disconnect_error))
             except asyncio.CancelledError:
                 logger.info("MAX_DURATION_TIMER_CANCELLED")
                 raise
             except Exception as e:
-                logger.error(f"MAX_DURATION_TIMER_ERROR | error={str(e)}")
+                logger.error("MAX_DURATION_TIMER_ERROR | error=%s", str(e))
 
         timer_task = asyncio.create_task(enforce_max_duration())
 
@@ -484,7 +528,6 @@ class CallHandler:
                 ctx.room.name,
                 background_setting,
                 str(e),
-                exc_info=True
             )
             try:
                 await player.aclose()
@@ -504,11 +547,17 @@ class CallHandler:
 
     async def handle_call(self, ctx: JobContext) -> None:
         """Handle incoming call with proper LiveKit patterns."""
-        logger.info(f"JOB_STARTED | room={ctx.room.name} | job_id={ctx.job.id}")
+        logger.info("JOB_STARTED | room=%s | job_id=%s", ctx.room.name, ctx.job.id)
         call_id = ctx.room.name  # Use room name as call ID
         profiler = LatencyProfiler(call_id, "call_processing")
         
         try:
+            # Start the assistant lookup from job data while the room connects; the
+            # resolver below picks up the cached (or in-flight) row
+            prefetch_task = asyncio.create_task(
+                self.config_resolver.prefetch_assistant(ctx.job.metadata, ctx.job.room.name)
+            )
+
             # Measure connection latency
             async with measure_latency_context("room_connection", call_id):
                 await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
@@ -519,10 +568,19 @@ class CallHandler:
             # Log job metadata for debugging
             # logger.info(f"JOB_METADATA | metadata={ctx.job.metadata}")
 
+            # Decode room/job metadata once for everything this call needs from it
+            call_meta = CallMetadata.from_job_context(ctx)
+
+            # Use the VAD model prewarm() loaded for this worker process
+            self._prewarmed_vad = ctx.proc.userdata.get("vad") or self._prewarmed_vad
+
             # Measure call type determination and config resolution
             async with measure_latency_context("call_type_determination", call_id):
-                call_type = self._determine_call_type(ctx)
-                assistant_config = await self.config_resolver.resolve_assistant_config(ctx, call_type)
+                call_type = self._determine_call_type(ctx, call_meta)
+                assistant_config = await self.config_resolver.resolve_assistant_config(ctx, call_type, call_meta)
+            if not prefetch_task.done():
+                # Resolution took a different path (e.g. assistant from room metadata)
+                prefetch_task.cancel()
 
             profiler.checkpoint("config_resolved", {"call_type": call_type})
 
@@ -531,67 +589,90 @@ class CallHandler:
                 profiler.finish(success=False, error="No assistant config found")
                 return
 
-            # Check minutes availability before starting call
-            user_id = assistant_config.get("user_id")
-            if user_id:
-                db_client = get_database_client()
-                if db_client:
-                    minutes_check = await db_client.check_minutes_available(user_id)
-                    if not minutes_check.get("available", True) and not minutes_check.get("unlimited", False):
-                        remaining = minutes_check.get("remaining_minutes", 0)
-                        logger.warning(f"MINUTES_INSUFFICIENT | user={user_id} | remaining={remaining} | call_rejected")
-                        # Disconnect the call if no minutes available
-                        await ctx.room.disconnect()
-                        profiler.finish(success=False, error=f"Insufficient minutes: {remaining} remaining")
-                        return
-                    elif minutes_check.get("unlimited"):
-                        logger.info(f"MINUTES_CHECK | user={user_id} | unlimited_plan")
-                    else:
-                        remaining = minutes_check.get("remaining_minutes", 0)
-                        logger.info(f"MINUTES_CHECK | user={user_id} | remaining={remaining}")
-
-                    # Check workspace minutes if assistant belongs to a workspace
-                    workspace_id = assistant_config.get("workspace_id")
-                    if workspace_id:
-                        ws_check = await db_client.check_workspace_minutes_available(workspace_id)
-                        if not ws_check.get("available", True) and not ws_check.get("unlimited", False):
-                            ws_remaining = ws_check.get("remaining_minutes", 0)
-                            logger.warning(f"WORKSPACE_MINUTES_INSUFFICIENT | workspace={workspace_id} | user={user_id} | remaining={ws_remaining} | call_rejected")
+            # Start building the agent (prompt assembly + calendar init round trip) while the
+            # minutes checks are in flight; it is cancelled if the call is rejected or setup fails.
+            agent_factory = AgentFactory(
+                self.supabase,
+                self._prewarmed_llms,
+                self._prewarmed_tts,
+                self._prewarmed_vad
+            )
+            agent_task = asyncio.create_task(agent_factory.create_agent(assistant_config))
+
+            try:
+                # Check minutes availability before starting call
+                user_id = assistant_config.get("user_id")
+                if user_id:
+                    db_client = get_database_client()
+                    if db_client:
+                        # User and workspace checks are independent; run both round trips concurrently
+                        workspace_id = assistant_config.get("workspace_id")
+                        if workspace_id:
+                            minutes_check, ws_check = await asyncio.gather(
+                                db_client.check_minutes_available(user_id),
+                                db_client.check_workspace_minutes_available(workspace_id),
+                            )
+                        else:
+                            minutes_check, ws_check = await db_client.check_minutes_available(user_id), None
+
+                        if not minutes_check.get("available", True) and not minutes_check.get("unlimited", False):
+                            remaining = minutes_check.get("remaining_minutes", 0)
+                            logger.warning("MINUTES_INSUFFICIENT | user=%s | remaining=%s | call_rejected", user_id, remaining)
+                            # Disconnect the call if no minutes available
                             await ctx.room.disconnect()
-                            profiler.finish(success=False, error=f"Workspace minutes exhausted: {ws_remaining} remaining")
+                            profiler.finish(success=False, error=f"Insufficient minutes: {remaining} remaining")
                             return
+                        elif minutes_check.get("unlimited"):
+                            logger.info("MINUTES_CHECK | user=%s | unlimited_plan", user_id)
                         else:
-                            ws_remaining = ws_check.get("remaining_minutes", 0)
-                            logger.info(f"WORKSPACE_MINUTES_CHECK | workspace={workspace_id} | remaining={'unlimited' if ws_check.get('unlimited') else ws_remaining}")
-
-            # Handle outbound calls
-            if call_type == "outbound":
-                async with measure_latency_context("outbound_call_handling", call_id):
-                    await self._handle_outbound_call(ctx, assistant_config)
-                profiler.checkpoint("outbound_handled")
-
-            # Create session and agent BEFORE waiting for participant to start listening immediately
-            async with measure_latency_context("session_creation", call_id):
-                session = self._create_session(assistant_config)
-                
-                # Initialize agent factory with pre-warmed components
-                agent_factory = AgentFactory(
-                    self.supabase,
-                    self._prewarmed_llms,
-                    self._prewarmed_tts,
-                    self._prewarmed_vad
-                )
+                            remaining = minutes_check.get("remaining_minutes", 0)
+                            logger.info("MINUTES_CHECK | user=%s | remaining=%s", user_id, remaining)
+
+                        # Check workspace minutes if assistant belongs to a workspace
+                        if ws_check is not None:
+                            if not ws_check.get("available", True) and not ws_check.get("unlimited", False):
+                                ws_remaining = ws_check.get("remaining_minutes", 0)
+                                logger.warning("WORKSPACE_MINUTES_INSUFFICIENT | workspace=%s | user=%s | remaining=%s | call_rejected", workspace_id, user_id, ws_remaining)
+                                await ctx.room.disconnect()
+                                profiler.finish(success=False, error=f"Workspace minutes exhausted: {ws_remaining} remaining")
+                                return
+                            else:
+                                ws_remaining = ws_check.get("remaining_minutes", 0)
+                                logger.info("WORKSPACE_MINUTES_CHECK | workspace=%s | remaining=%s", workspace_id, 'unlimited' if ws_check.get('unlimited') else ws_remaining)
+
+                # Handle outbound calls
+                if call_type == "outbound":
+                    async with measure_latency_context("outbound_call_handling", call_id):
+                        await self._handle_outbound_call(ctx, assistant_config, call_meta)
+                    profiler.checkpoint("outbound_handled")
+
+                # Create session and agent BEFORE waiting for participant to start listening immediately
+                async with measure_latency_context("session_creation", call_id):
+                    session = self._create_session(ctx, assistant_config)
                 
-                agent = await agent_factory.create_agent(assistant_config)
+                    # Agent creation was started alongside the minutes checks
+                    agent = await agent_task
                 
-                # Provide session to agent for real-time speech generation
-                if hasattr(agent, 'set_session'):
-                    agent.set_session(session)
+                    # Provide session to agent for real-time speech generation
+                    if hasattr(agent, 'set_session'):
+                        agent.set_session(session)
+            finally:
+                # Don't leave the agent being built for a call that was rejected or failed
+                if not agent_task.done():
+                    agent_task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await agent_task
+                elif not agent_task.cancelled() and agent_task.exception():
+                    # Retrieve a build failure the early exit skipped, so it isn't only reported
+                    # later as "Task exception was never retrieved"
+                    logger.warning("AGENT_CREATION_FAILED | room=%s | error=%s", ctx.room.name, str(agent_task.exception()))
 
             profiler.checkpoint("agent_created")
 
             # Register metrics collection event handler for latency monitoring
-            session.on("metrics_collected", self._on_metrics_collected)
+            # Per-call latency state; the handler itself is shared by every call in this process
+            turn_latency = {"end_of_utterance_delay": 0, "llm": 0, "tts": 0}
+            session.on("metrics_collected", lambda event: self._on_metrics_collected(event, turn_latency))
             
             # Register user state changed event handler for idle messages
             # Note: .on() requires a synchronous callback, so we use asyncio.create_task
@@ -614,28 +695,34 @@ class CallHandler:
             # logger.info(f"SESSION_STARTED | room={ctx.room.name} | listening for speech")
             profiler.checkpoint("session_started")
 
-            # Start ambient audio if configured
-            await self._maybe_start_background_audio(ctx, session, assistant_config)
+            # Start ambient audio if configured; the track publish overlaps the participant wait
+            background_audio_task = asyncio.create_task(
+                self._maybe_start_background_audio(ctx, session, assistant_config)
+            )
 
             # Wait for participant with configurable timeout
-            participant_timeout = float(os.getenv("PARTICIPANT_TIMEOUT_SECONDS", "35.0"))
+            participant_timeout = get_runtime_config().participant_timeout_seconds
             try:
                 async with measure_latency_context("participant_wait", call_id, {"timeout_seconds": participant_timeout}):
-                    participant = await asyncio.wait_for(
-                        ctx.wait_for_participant(),
-                        timeout=participant_timeout
-                    )
+                    async with asyncio.timeout(participant_timeout):
+                        participant = await ctx.wait_for_participant()
                 # logger.info(f"PARTICIPANT_CONNECTED | phone={extract_phone_from_room(ctx.room.name)}")
                 profiler.checkpoint("participant_connected")
-            except asyncio.TimeoutError:
+            except TimeoutError:
                 phone_number = extract_phone_from_room(ctx.room.name)
                 # logger.error(f"PARTICIPANT_TIMEOUT | phone={phone_number} | timeout={participant_timeout}s")
+                await background_audio_task
+                # Nobody joined; delete the room so it doesn't linger on the LiveKit server. Awaited,
+                # since the job tears down as soon as this returns and would cancel a background task
+                await self._safe_delete_room(ctx, "participant_timeout")
                 profiler.finish(success=False, error="Participant timeout")
                 return
 
+            await background_audio_task
+
             # Trigger first message ONLY AFTER participant joins
             first_message = assistant_config.get("first_message", "")
-            force_first = os.getenv("FORCE_FIRST_MESSAGE", "true").lower() != "false"
+            force_first = get_runtime_config().force_first_message
             if force_first and first_message:
                 # logger.info(f"TRIGGERING_FIRST_MESSAGE | message='{first_message}'")
                 # Wait a tiny bit for participant audio to settle
@@ -683,25 +770,34 @@ class CallHandler:
                     # logger.error(f"SESSION_HISTORY_READ_FAILED | error={str(e)}")
                     session_history = []
 
+                # Normalize the transcript once for every analysis and the history save
+                transcription, transcript_text = _normalize_transcript(session_history)
+
+                # A booking confirmed late in the call may still be writing its bookings row;
+                # the saved call data reads its appointment ID
+                if agent is not None and hasattr(agent, "wait_for_pending_writes"):
+                    await agent.wait_for_pending_writes()
+
                 # Perform post-call analysis and save to database
                 try:
-                    analysis_results = await self._perform_post_call_analysis(assistant_config, session_history, agent, call_duration)
-                    logger.info(f"POST_CALL_ANALYSIS_RESULTS | summary={bool(analysis_results.get('call_summary'))} | success={analysis_results.get('call_success')} | data_fields={len(analysis_results.get('structured_data', {}))}")
+                    analysis_results = await self._perform_post_call_analysis(assistant_config, transcription, transcript_text, agent, call_duration)
+                    logger.info("POST_CALL_ANALYSIS_RESULTS | summary=%s | success=%s | data_fields=%s", bool(analysis_results.get('call_summary')), analysis_results.get('call_success'), len(analysis_results.get('structured_data', {})))
                     
                     # Save call history and analysis data to database
                     await self._save_call_history_to_database(
                         ctx=ctx,
                         assistant_config=assistant_config,
-                        session_history=session_history,
+                        transcription=transcription,
                         analysis_results=analysis_results,
                         participant=participant,
                         start_time=start_time,
                         end_time=end_time,
-                        agent=agent
+                        agent=agent,
+                        call_meta=call_meta
                     )
                     
                 except Exception as e:
-                    logger.error(f"POST_CALL_ANALYSIS_FAILED | error={str(e)}")
+                    logger.error("POST_CALL_ANALYSIS_FAILED | error=%s", str(e))
                     pass
 
             # Register shutdown callback to ensure proper cleanup and analysis
@@ -718,33 +814,26 @@ class CallHandler:
             profiler.finish(success=False, error=str(e))
             raise
 
-    def _determine_call_type(self, ctx: JobContext) -> str:
+    def _determine_call_type(self, ctx: JobContext, call_meta: Optional[CallMetadata] = None) -> str:
         """Determine the type of call based on room name and metadata."""
         room_name = ctx.room.name.lower()
+        call_meta = call_meta or CallMetadata.from_job_context(ctx)
         
         # Check room metadata for call type
-        if ctx.room.metadata:
-            try:
-                room_metadata = json.loads(ctx.room.metadata)
-                if room_metadata.get("source") == "web":
-                    return "web"
-                if room_metadata.get("callType") == "web":
-                    return "web"
-                if room_metadata.get("source") == "outbound":
-                    return "outbound"
-            except (json.JSONDecodeError, KeyError):
-                pass
+        room_metadata = call_meta.room
+        if room_metadata.get("source") == "web":
+            return "web"
+        if room_metadata.get("callType") == "web":
+            return "web"
+        if room_metadata.get("source") == "outbound":
+            return "outbound"
         
         # Check job metadata
-        if ctx.job.metadata:
-            try:
-                job_metadata = json.loads(ctx.job.metadata)
-                if job_metadata.get("source") == "web":
-                    return "web"
-                if job_metadata.get("assistantId") or job_metadata.get("assistant_id"):
-                    return "inbound_with_assistant"
-            except (json.JSONDecodeError, KeyError):
-                pass
+        job_metadata = call_meta.job
+        if job_metadata.get("source") == "web":
+            return "web"
+        if job_metadata.get("assistantId") or job_metadata.get("assistant_id"):
+            return "inbound_with_assistant"
         
         # Fall back to room name patterns
         if room_name.startswith("outbound") or room_name.startswith("lead") or room_name.startswith("campaign"):
@@ -756,11 +845,19 @@ class CallHandler:
         else:
             return "inbound"
 
-    async def _handle_outbound_call(self, ctx: JobContext, assistant_config: Dict[str, Any]) -> None:
+    async def _safe_delete_room(self, ctx: JobContext, reason: str) -> None:
+        """Delete the call's room, logging instead of raising on failure."""
+        try:
+            await ctx.api.room.delete_room(api.DeleteRoomRequest(room=ctx.room.name))
+            logger.info("ROOM_DELETED | room=%s | reason=%s", ctx.room.name, reason)
+        except Exception as e:
+            logger.warning("ROOM_DELETE_FAILED | room=%s | reason=%s | error=%s", ctx.room.name, reason, str(e))
+
+    async def _handle_outbound_call(self, ctx: JobContext, assistant_config: Dict[str, Any], call_meta: Optional[CallMetadata] = None) -> None:
         """Handle outbound call specific logic."""
         try:
             # Extract call metadata
-            metadata = json.loads(ctx.job.metadata) if ctx.job.metadata else {}
+            metadata = call_meta.job if call_meta else metadata_dict(ctx.job.metadata)
             call_sid = extract_call_sid_from_metadata(metadata)
             
             if call_sid:
@@ -782,7 +879,7 @@ class CallHandler:
             # logger.error(f"SESSION_WAIT_ERROR | error={str(e)}")
             pass
 
-    async def _perform_post_call_analysis(self, config: Dict[str, Any], session_history: list, agent, call_duration: int = 0) -> Dict[str, Any]:
+    async def _perform_post_call_analysis(self, config: Dict[str, Any], transcription: list, transcript_text: str, agent, call_duration: int = 0) -> Dict[str, Any]:
         """Perform complete post-call analysis including AI-powered outcome determination."""
         analysis_results = {
             "call_summary": None,
@@ -795,39 +892,39 @@ class CallHandler:
         }
 
         try:
-            # Process session history into transcription format
-            transcription = []
-            for item in session_history:
-                if isinstance(item, dict) and "role" in item and "content" in item:
-                    content = item["content"]
-                    # Handle different content formats
-                    if isinstance(content, list):
-                        content_parts = []
-                        for c in content:
-                            if c and str(c).strip():
-                                content_parts.append(str(c).strip())
-                        content = " ".join(content_parts)
-                    elif not isinstance(content, str):
-                        content = str(content)
-                    
-                    # Only add non-empty content
-                    if content and content.strip():
-                        transcription.append({
-                            "role": item["role"],
-                            "content": content.strip()
-                        })
-            
             # logger.info(f"POST_CALL_ANALYSIS_TRANSCRIPTION | items={len(transcription)} | duration={call_duration}s")
             
             # Determine call type for outcome analysis
             call_type = "inbound"  # Default to inbound, could be determined from context
             
-            # Use OpenAI to analyze call outcome
-            outcome_analysis = await self.call_outcome_service.analyze_call_outcome(
-                transcription=transcription,
-                call_duration=call_duration,
-                call_type=call_type
-            )
+            # A dropped or one-sided call gives the LLMs nothing to work with; skip the
+            # analysis round-trips and let the heuristics below decide the outcome
+            if len(transcription) < 2 or call_duration < 5:
+                logger.info("ANALYSIS_SKIPPED_SHORT | items=%s | duration=%ss", len(transcription), call_duration)
+                outcome_analysis = None
+                analysis_data = {
+                    "structured_data": agent.get_structured_data() if agent and hasattr(agent, "get_structured_data") else {}
+                }
+            else:
+                # Outcome analysis and the assistant-configured analyses are independent LLM calls;
+                # run them together
+                outcome_analysis, analysis_data = await asyncio.gather(
+                    # Use OpenAI to analyze call outcome
+                    self.call_outcome_service.analyze_call_outcome(
+                        transcription=transcription,
+                        call_duration=call_duration,
+                        call_type=call_type
+                    ),
+                    # Use comprehensive analysis processing like the old code
+                    self._process_call_analysis(
+                        assistant_id=config.get("id"),
+                        transcription=transcription,  # Use processed transcription
+                        transcript_text=transcript_text,
+                        call_duration=call_duration,
+                        agent=agent,
+                        assistant_config=config
+                    ),
+                )
             
             if outcome_analysis:
                 analysis_results.update({
@@ -855,21 +952,12 @@ class CallHandler:
                     # logger.info(f"BOOKING_STATUS_CONFIRMED | outcome=Booked Appointment")
                 else:
                     # Fallback to heuristic-based outcome determination
-                    fallback_outcome = self.call_outcome_service.get_fallback_outcome(transcription, call_duration)
+                    fallback_outcome = self.call_outcome_service.get_fallback_outcome(transcription, call_duration, transcript_text)
                     analysis_results["call_outcome"] = fallback_outcome
                     analysis_results["outcome_confidence"] = 0.3  # Low confidence for fallback
                     analysis_results["outcome_reasoning"] = "Fallback heuristic analysis (OpenAI unavailable)"
                     # logger.warning(f"FALLBACK_OUTCOME_ANALYSIS | outcome={fallback_outcome}")
             
-            # Use comprehensive analysis processing like the old code
-            analysis_data = await self._process_call_analysis(
-                assistant_id=config.get("id"),
-                transcription=transcription,  # Use processed transcription
-                call_duration=call_duration,
-                agent=agent,
-                assistant_config=config
-            )
-            
             # Merge analysis results
             analysis_results.update(analysis_data)
             
@@ -895,12 +983,13 @@ class CallHandler:
         self, 
         ctx: JobContext, 
         assistant_config: Dict[str, Any], 
-        session_history: list, 
+        transcription: list, 
         analysis_results: Dict[str, Any],
         participant,
         start_time: datetime.datetime,
         end_time: datetime.datetime,
-        agent=None
+        agent=None,
+        call_meta: Optional[CallMetadata] = None
     ) -> None:
         """Save call history and analysis data to database."""
         try:
@@ -916,37 +1005,10 @@ class CallHandler:
             call_duration = int((end_time - start_time).total_seconds())
             
             # Extract call_sid like in old implementation
-            call_sid = self._extract_call_sid(ctx, participant)
+            call_meta = call_meta or CallMetadata.from_job_context(ctx)
+            call_sid = self._extract_call_sid(ctx, participant, call_meta)
             # logger.info(f"CALL_SID_EXTRACTED | call_sid={call_sid}")
             
-            # Process transcription from session history
-            transcription = []
-            # logger.info(f"SESSION_HISTORY_DEBUG | items_count={len(session_history)}")
-            
-            for i, item in enumerate(session_history):
-                # logger.info(f"SESSION_ITEM_{i} | type={type(item)} | content={str(item)[:100]}...")
-                if isinstance(item, dict) and "role" in item and "content" in item:
-                    content = item["content"]
-                    # Handle different content formats
-                    if isinstance(content, list):
-                        content_parts = []
-                        for c in content:
-                            if c and str(c).strip():
-                                content_parts.append(str(c).strip())
-                        content = " ".join(content_parts)
-                    elif not isinstance(content, str):
-                        content = str(content)
-                    
-                    # Only add non-empty content
-                    if content and content.strip():
-                        transcription.append({
-                            "role": item["role"],
-                            "content": content.strip()
-                        })
-                        # logger.info(f"TRANSCRIPTION_ADDED | role={item['role']} | content_length={len(content.strip())}")
-            
-            # logger.info(f"TRANSCRIPTION_PREPARED | session_items={len(session_history)} | transcription_items={len(transcription)}")
-            
             # Determine call status from AI analysis results
             call_status = analysis_results.get("call_outcome", "Qualified")
             
@@ -977,18 +1039,13 @@ class CallHandler:
             # logger.info(f"PARTICIPANT_IDENTITY_DETERMINED | phone={extract_phone_from_room(ctx.room.name)}")
 
             # Extract agent's phone number (the number called or calling from)
-            agent_phone = None
-            if ctx.job.metadata:
-                try:
-                    job_metadata = json.loads(ctx.job.metadata)
-                    agent_phone = (
-                        job_metadata.get("called_number") or 
-                        job_metadata.get("to_number") or 
-                        job_metadata.get("phoneNumber") or
-                        job_metadata.get("from_number")
-                    )
-                except:
-                    pass
+            job_metadata = call_meta.job
+            agent_phone = (
+                job_metadata.get("called_number") or 
+                job_metadata.get("to_number") or 
+                job_metadata.get("phoneNumber") or
+                job_metadata.get("from_number")
+            )
             
             if not agent_phone:
                 from utils.data_extractors import extract_did_from_room
@@ -998,8 +1055,11 @@ class CallHandler:
             if not agent_phone and assistant_config.get("id"):
                 try:
                     assistant_id = assistant_config.get("id")
-                    phone_result = await asyncio.to_thread(
-                        lambda: self.supabase.client.table("phone_number").select("number").eq("inbound_assistant_id", assistant_id).execute()
+                    phone_result = await asyncio.wait_for(
+                        asyncio.to_thread(
+                            lambda: self.supabase.client.table("phone_number").select("number").eq("inbound_assistant_id", assistant_id).execute()
+                        ),
+                        timeout=5
                     )
                     if phone_result.data and len(phone_result.data) > 0:
                         agent_phone = phone_result.data[0]["number"]
@@ -1062,7 +1122,7 @@ class CallHandler:
                         booking_occurred = True
                     elif hasattr(booking_data, 'booked') and booking_data.booked:
                         booking_occurred = True
-                    logger.info(f"CHECKING_FINALIZED_BOOKING_DATA | appointment_id={booking_data.appointment_id} | booked={booking_data.booked}")
+                    logger.info("CHECKING_FINALIZED_BOOKING_DATA | appointment_id=%s | booked=%s", booking_data.appointment_id, booking_data.booked)
                 # Fallback to current booking_data if finalized not available
                 elif hasattr(agent, '_booking_data'):
                     booking_data = agent._booking_data
@@ -1079,7 +1139,7 @@ class CallHandler:
                           hasattr(booking_data, 'selected_slot') and booking_data.selected_slot and
                           call_status and "Booked" in call_status):
                         booking_occurred = True
-                        logger.info(f"BOOKING_INFERRED_FROM_DATA | name={booking_data.name} | outcome={call_status}")
+                        logger.info("BOOKING_INFERRED_FROM_DATA | name=%s | outcome=%s", booking_data.name, call_status)
             
             if booking_occurred and booking_data:
                 # Use finalized booking data if available, otherwise fallback to current booking_data
@@ -1138,7 +1198,7 @@ class CallHandler:
                     }
                 }
                 
-                logger.info(f"APPOINTMENT_OBJECT_CREATED | status=booked | calendar={calendar_name} | has_link={bool(booking_link)}")
+                logger.info("APPOINTMENT_OBJECT_CREATED | status=booked | calendar=%s | has_link=%s", calendar_name, bool(booking_link))
             else:
                 # No booking occurred
                 appointment = {
@@ -1169,7 +1229,7 @@ class CallHandler:
                         booking_data_available = True
                     elif hasattr(booking_data, 'booked') and booking_data.booked:
                         booking_data_available = True
-                    logger.info(f"USING_FINALIZED_BOOKING_DATA | appointment_id={booking_data.appointment_id} | booked={booking_data.booked}")
+                    logger.info("USING_FINALIZED_BOOKING_DATA | appointment_id=%s | booked=%s", booking_data.appointment_id, booking_data.booked)
                 # Fallback to current booking_data if finalized not available
                 elif hasattr(agent, '_booking_data'):
                     booking_data = agent._booking_data
@@ -1231,7 +1291,7 @@ class CallHandler:
                 if hasattr(agent, 'phone_number') and agent.phone_number:
                     structured_data["agent_phone"] = agent.phone_number
                 
-                logger.info(f"BOOKING_DATA_ADDED_TO_CALL_DATA | booking_id={booking_data.appointment_id} | has_slot={bool(booking_data.selected_slot)}")
+                logger.info("BOOKING_DATA_ADDED_TO_CALL_DATA | booking_id=%s | has_slot=%s", booking_data.appointment_id, bool(booking_data.selected_slot))
                 
                 # If appointment was created as "not_booked" but we have booking data, update it to "booked"
                 if appointment and appointment.get("status") == "not_booked":
@@ -1250,7 +1310,7 @@ class CallHandler:
                             appointment["end_time"] = booking_data.selected_slot.end_time.isoformat()
                         else:
                             appointment["end_time"] = (booking_data.selected_slot.start_time + datetime.timedelta(minutes=30)).isoformat()
-                    logger.info(f"APPOINTMENT_STATUS_UPDATED | status=booked | booking_id={booking_data.appointment_id}")
+                    logger.info("APPOINTMENT_STATUS_UPDATED | status=booked | booking_id=%s", booking_data.appointment_id)
             
             # Add appointment object to call_data (after potential update)
             call_data["appointment"] = appointment
@@ -1289,110 +1349,131 @@ class CallHandler:
                 call_data["follow_up_notes"] = analysis_results["follow_up_notes"]
             
             # Separate database payload from workflow context data
-            # Valid columns in call_history table based on migrations
-            # Note: call_outcome column may not exist yet - exclude it until migration is applied
-            VALID_DB_COLUMNS = {
-                "call_id", "assistant_id", "phone_number", "participant_identity",
-                "start_time", "end_time", "call_duration", "call_status",
-                "transcription", "call_summary", "success_evaluation", "structured_data",
-                "outcome_confidence", "outcome_reasoning", "outcome_key_points",
-                "outcome_sentiment", "follow_up_required", "follow_up_notes",
-                "call_sid",  "outcome",
-            }
-            
-            db_payload = {k: v for k, v in call_data.items() if k in VALID_DB_COLUMNS}
+            db_payload = {k: v for k, v in call_data.items() if k in _CALL_HISTORY_COLUMNS}
             
             # Log what we're saving
             # logger.info(f"DB_PAYLOAD_PREPARED | keys={list(db_payload.keys())}")
             
             # Save to database with timeout protection
+            history_saved = False
             try:
-                result = await self._safe_db_insert("call_history", db_payload, timeout=6)
-                if result.data:
-                    logger.info(f"CALL_HISTORY_SAVED | call_id={call_id} | duration={call_duration}s | ai_status={call_status} | confidence={analysis_results.get('outcome_confidence', 'N/A')} | transcription_items={len(transcription)}")
-                    if transcription:
-                        sample_transcript = transcription[0] if len(transcription) > 0 else {}
-                        logger.info(f"TRANSCRIPTION_SAMPLE | first_entry={sample_transcript}")
-                    
-                    # Deduct minutes from user account after call completes
-                    user_id = assistant_config.get("user_id")
-                    if user_id and call_duration > 0:
-                        db_client = get_database_client()
-                        if db_client:
-                            # Convert seconds to minutes (round up)
-                            minutes_used = call_duration / 60.0
-                            max_retries = 3
-                            deduction_result = {"success": False, "error": "not attempted"}
-                            for attempt in range(max_retries):
-                                try:
-                                    deduction_result = await db_client.deduct_minutes(user_id, minutes_used)
-                                    if deduction_result.get("success"):
-                                        break
-                                    if attempt < max_retries - 1:
-                                        wait = 2 ** attempt  # 1s, 2s backoff
-                                        logger.warning(f"MINUTES_DEDUCTION_RETRY | user={user_id} | attempt={attempt + 1} | error={deduction_result.get('error')} | retrying_in={wait}s")
-                                        await asyncio.sleep(wait)
-                                except Exception as deduct_exc:
-                                    if attempt < max_retries - 1:
-                                        wait = 2 ** attempt
-                                        logger.warning(f"MINUTES_DEDUCTION_EXCEPTION_RETRY | user={user_id} | attempt={attempt + 1} | error={str(deduct_exc)} | retrying_in={wait}s")
-                                        await asyncio.sleep(wait)
-                                    else:
-                                        deduction_result = {"success": False, "error": str(deduct_exc)}
-                            if deduction_result.get("success"):
-                                remaining = deduction_result.get("remaining_minutes", 0)
-                                exceeded = deduction_result.get("exceeded_limit", False)
-                                logger.info(f"MINUTES_DEDUCTED | user={user_id} | minutes={minutes_used:.2f} | remaining={remaining} | exceeded={exceeded}")
-                                if exceeded:
-                                    logger.warning(f"MINUTES_LIMIT_EXCEEDED | user={user_id} | used={deduction_result.get('minutes_used')} | limit={deduction_result.get('minutes_limit')}")
-                            else:
-                                logger.error(f"MINUTES_DEDUCTION_FAILED | user={user_id} | minutes={minutes_used:.2f} | error={deduction_result.get('error')} | all_retries_exhausted=True")
-
-                            # Deduct workspace minutes if assistant belongs to a workspace
-                            workspace_id = assistant_config.get("workspace_id")
-                            if workspace_id:
-                                ws_deduction = {"success": False, "error": "not attempted"}
-                                for ws_attempt in range(max_retries):
-                                    try:
-                                        ws_deduction = await db_client.deduct_workspace_minutes(workspace_id, minutes_used)
-                                        if ws_deduction.get("success"):
-                                            break
-                                        if ws_attempt < max_retries - 1:
-                                            wait = 2 ** ws_attempt
-                                            logger.warning(f"WORKSPACE_MINUTES_DEDUCTION_RETRY | workspace={workspace_id} | attempt={ws_attempt + 1} | retrying_in={wait}s")
-                                            await asyncio.sleep(wait)
-                                    except Exception as ws_exc:
-                                        if ws_attempt < max_retries - 1:
-                                            await asyncio.sleep(2 ** ws_attempt)
-                                        else:
-                                            ws_deduction = {"success": False, "error": str(ws_exc)}
-                                if ws_deduction.get("success"):
-                                    ws_remaining = ws_deduction.get("remaining_minutes", 0)
-                                    ws_exceeded = ws_deduction.get("exceeded_limit", False)
-                                    logger.info(f"WORKSPACE_MINUTES_DEDUCTED | workspace={workspace_id} | minutes={minutes_used:.2f} | remaining={ws_remaining}")
-                                    if ws_exceeded:
-                                        logger.warning(f"WORKSPACE_MINUTES_LIMIT_EXCEEDED | workspace={workspace_id} | used={ws_deduction.get('minutes_used')} | limit={ws_deduction.get('minute_limit')}")
-                                else:
-                                    logger.error(f"WORKSPACE_MINUTES_DEDUCTION_FAILED | workspace={workspace_id} | error={ws_deduction.get('error')} | all_retries_exhausted=True")
-                else:
-                    logger.error(f"CALL_HISTORY_SAVE_FAILED | call_id={call_id}")
+                # Nothing reads the inserted row back, so don't have PostgREST echo the
+                # full transcription; insert errors still raise
+                await self._safe_db_insert("call_history", db_payload, timeout=6, returning="minimal")
+                logger.info("CALL_HISTORY_SAVED | call_id=%s | duration=%ss | ai_status=%s | confidence=%s | transcription_items=%s", call_id, call_duration, call_status, analysis_results.get('outcome_confidence', 'N/A'), len(transcription))
+                if transcription:
+                    logger.debug("TRANSCRIPTION_SAMPLE | first_entry=%s", transcription[0])
+                
+                history_saved = True
             except Exception as e:
-                logger.error(f"CALL_HISTORY_SAVE_ERROR | table=call_history | error={str(e)}")
-            
-            # Execute custom workflows - independent of history saving, uses full call_data
-            try:
-                await self._execute_user_workflows(assistant_config, call_data)
-            except Exception as workflow_error:
-                logger.error(f"WORKFLOW_EXECUTION_ERROR | error={str(workflow_error)}")
-
-            # POST transcript + call data to extract endpoint so structured_data.outcome is populated
-            try:
-                await self._trigger_extract_workflow(assistant_config, call_data, transcription)
-            except Exception as extract_error:
-                logger.error(f"EXTRACT_WORKFLOW_TRIGGER_FAILED | error={str(extract_error)}")
+                logger.error("CALL_HISTORY_SAVE_ERROR | table=call_history | error=%s", str(e))
+                # Keep the row locally; the next worker to start replays it and then bills the
+                # minutes, so history and billing stay consistent
+                try:
+                    await asyncio.to_thread(
+                        spool_row, "call_history", db_payload, _minutes_deduction(assistant_config, call_duration)
+                    )
+                except Exception as spool_error:
+                    logger.error("CALL_HISTORY_SPOOL_ERROR | call_id=%s | error=%s", call_id, str(spool_error))
+            
+            # Post-save steps are independent of each other; run them concurrently so shutdown
+            # waits for the slowest one instead of their sum.
+            # - custom workflows (independent of history saving, uses full call_data)
+            # - extract endpoint (populates structured_data.outcome on the saved row)
+            # - minutes deduction (only once the call is recorded; a spooled call is billed on replay)
+            post_save_steps = [
+                ("WORKFLOW_EXECUTION_ERROR", self._execute_user_workflows(assistant_config, call_data)),
+                ("EXTRACT_WORKFLOW_TRIGGER_FAILED", self._trigger_extract_workflow(assistant_config, call_data, transcription)),
+            ]
+            if history_saved:
+                post_save_steps.append(("MINUTES_DEDUCTION_ERROR", self._deduct_call_minutes(assistant_config, call_duration)))
+            
+            step_results = await asyncio.gather(*(step for _, step in post_save_steps), return_exceptions=True)
+            for (error_event, _), step_result in zip(post_save_steps, step_results):
+                if isinstance(step_result, Exception):
+                    logger.error("%s | error=%s", error_event, str(step_result))
                 
         except Exception as e:
-            logger.error(f"POST_CALL_PROCESSING_ERROR | error={str(e)}")
+            logger.error("POST_CALL_PROCESSING_ERROR | error=%s", str(e))
+
+    async def _deduct_call_minutes(self, assistant_config: Dict[str, Any], call_duration: int) -> None:
+        """Deduct call minutes from the user (and workspace, if any) after the call is saved."""
+        deduction = _minutes_deduction(assistant_config, call_duration)
+        if deduction:
+            await self._deduct_minutes(deduction)
+
+    @staticmethod
+    async def _deduct_minutes(deduction: Dict[str, Any]) -> None:
+        """Apply a deduction built by _minutes_deduction to the user and, if set, the workspace."""
+        db_client = get_database_client()
+        if not db_client:
+            return
+        minutes_used = deduction["minutes"]
+        deductions = [CallHandler._deduct_user_minutes(db_client, deduction["user_id"], minutes_used)]
+        # Deduct workspace minutes if assistant belongs to a workspace; the two rows are
+        # independent, so their round-trips (and retries) overlap instead of queueing
+        workspace_id = deduction.get("workspace_id")
+        if workspace_id:
+            deductions.append(CallHandler._deduct_workspace_minutes(db_client, workspace_id, minutes_used))
+        await asyncio.gather(*deductions)
+
+    @staticmethod
+    async def _deduct_user_minutes(db_client, user_id: str, minutes_used: float) -> None:
+        """Deduct minutes from the user's account, retrying with backoff."""
+        max_retries = 3
+        deduction_result = {"success": False, "error": "not attempted"}
+        for attempt in range(max_retries):
+            try:
+                deduction_result = await db_client.deduct_minutes(user_id, minutes_used)
+                if deduction_result.get("success"):
+                    break
+                if attempt < max_retries - 1:
+                    wait = 2 ** attempt  # 1s, 2s backoff
+                    logger.warning("MINUTES_DEDUCTION_RETRY | user=%s | attempt=%s | error=%s | retrying_in=%ss", user_id, attempt + 1, deduction_result.get('error'), wait)
+                    await asyncio.sleep(wait)
+            except Exception as deduct_exc:
+                if attempt < max_retries - 1:
+                    wait = 2 ** attempt
+                    logger.warning("MINUTES_DEDUCTION_EXCEPTION_RETRY | user=%s | attempt=%s | error=%s | retrying_in=%ss", user_id, attempt + 1, str(deduct_exc), wait)
+                    await asyncio.sleep(wait)
+                else:
+                    deduction_result = {"success": False, "error": str(deduct_exc)}
+        if deduction_result.get("success"):
+            remaining = deduction_result.get("remaining_minutes", 0)
+            exceeded = deduction_result.get("exceeded_limit", False)
+            logger.info("MINUTES_DEDUCTED | user=%s | minutes=%.2f | remaining=%s | exceeded=%s", user_id, minutes_used, remaining, exceeded)
+            if exceeded:
+                logger.warning("MINUTES_LIMIT_EXCEEDED | user=%s | used=%s | limit=%s", user_id, deduction_result.get('minutes_used'), deduction_result.get('minutes_limit'))
+        else:
+            logger.error("MINUTES_DEDUCTION_FAILED | user=%s | minutes=%.2f | error=%s | all_retries_exhausted=True", user_id, minutes_used, deduction_result.get('error'))
+
+    @staticmethod
+    async def _deduct_workspace_minutes(db_client, workspace_id: str, minutes_used: float) -> None:
+        """Deduct minutes from the assistant's workspace, retrying with backoff."""
+        max_retries = 3
+        ws_deduction = {"success": False, "error": "not attempted"}
+        for ws_attempt in range(max_retries):
+            try:
+                ws_deduction = await db_client.deduct_workspace_minutes(workspace_id, minutes_used)
+                if ws_deduction.get("success"):
+                    break
+                if ws_attempt < max_retries - 1:
+                    wait = 2 ** ws_attempt
+                    logger.warning("WORKSPACE_MINUTES_DEDUCTION_RETRY | workspace=%s | attempt=%s | retrying_in=%ss", workspace_id, ws_attempt + 1, wait)
+                    await asyncio.sleep(wait)
+            except Exception as ws_exc:
+                if ws_attempt < max_retries - 1:
+                    await asyncio.sleep(2 ** ws_attempt)
+                else:
+                    ws_deduction = {"success": False, "error": str(ws_exc)}
+        if ws_deduction.get("success"):
+            ws_remaining = ws_deduction.get("remaining_minutes", 0)
+            ws_exceeded = ws_deduction.get("exceeded_limit", False)
+            logger.info("WORKSPACE_MINUTES_DEDUCTED | workspace=%s | minutes=%.2f | remaining=%s", workspace_id, minutes_used, ws_remaining)
+            if ws_exceeded:
+                logger.warning("WORKSPACE_MINUTES_LIMIT_EXCEEDED | workspace=%s | used=%s | limit=%s", workspace_id, ws_deduction.get('minutes_used'), ws_deduction.get('minute_limit'))
+        else:
+            logger.error("WORKSPACE_MINUTES_DEDUCTION_FAILED | workspace=%s | error=%s | all_retries_exhausted=True", workspace_id, ws_deduction.get('error'))
 
     async def _execute_user_workflows(self, assistant_config: Dict[str, Any], call_data: Dict[str, Any]) -> None:
         """Trigger backend workflow execution for post-call event."""
@@ -1403,7 +1484,7 @@ class CallHandler:
             return
 
         try:
-            backend_url = os.environ.get('BACKEND_URL', 'http://localhost:4000')
+            backend_url = get_runtime_config().backend_url
             
             # Prepare context for the workflow
             # Extract outcome from call_data if available (for condition node evaluation)
@@ -1422,16 +1503,18 @@ class CallHandler:
                 "callData": call_data
             }
             
-            logger.info(f"TRIGGERING_BACKEND_WORKFLOW | event=call_ended | outcome={outcome} | user={user_id} | assistant={assistant_id}")
+            logger.info("TRIGGERING_BACKEND_WORKFLOW | event=call_ended | outcome=%s | user=%s | assistant=%s", outcome, user_id, assistant_id)
             
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    f"{backend_url}/api/v1/workflows/execution/trigger",
-                    json=context,
-                    timeout=5.0
-                )
+            # Shared keep-alive client: reuses the backend connection across calls
+            # Encode with orjson; the payload carries the full call data and transcription
+            await _HTTP_CLIENT.post(
+                f"{backend_url}/api/v1/workflows/execution/trigger",
+                content=dump_json(context, default=str),
+                headers=_JSON_HEADERS,
+                timeout=5.0
+            )
         except Exception as e:
-            logger.error(f"BACKEND_WORKFLOW_TRIGGER_FAILED | error={str(e)}")
+            logger.error("BACKEND_WORKFLOW_TRIGGER_FAILED | error=%s", str(e))
 
     async def _trigger_extract_workflow(
         self,
@@ -1457,7 +1540,7 @@ class CallHandler:
             return
 
         try:
-            backend_url = os.environ.get("BACKEND_URL", "http://localhost:4000")
+            backend_url = get_runtime_config().backend_url
 
             payload = {
                 "call_id": call_id,
@@ -1491,20 +1574,20 @@ class CallHandler:
                 f"| transcript_items={len(transcription)}"
             )
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{backend_url}/api/v1/workflows/extract",
-                    json=payload,
-                    timeout=10.0,
-                )
-                logger.info(
-                    f"EXTRACT_WORKFLOW_SENT | call_id={call_id} | status={response.status_code}"
-                )
+            response = await _HTTP_CLIENT.post(
+                f"{backend_url}/api/v1/workflows/extract",
+                content=dump_json(payload, default=str),
+                headers=_JSON_HEADERS,
+                timeout=10.0,
+            )
+            logger.info(
+                f"EXTRACT_WORKFLOW_SENT | call_id={call_id} | status={response.status_code}"
+            )
 
         except Exception as e:
-            logger.error(f"EXTRACT_WORKFLOW_REQUEST_FAILED | call_id={call_id} | error={str(e)}")
+            logger.error("EXTRACT_WORKFLOW_REQUEST_FAILED | call_id=%s | error=%s", call_id, str(e))
 
-    def _extract_call_sid(self, ctx: JobContext, participant) -> Optional[str]:
+    def _extract_call_sid(self, ctx: JobContext, participant, call_meta: Optional[CallMetadata] = None) -> Optional[str]:
         """Extract call_sid from various sources like in old implementation."""
         call_sid = None
         
@@ -1530,9 +1613,9 @@ class CallHandler:
             pass
 
         # Try room metadata if not found
-        if not call_sid and hasattr(ctx.room, 'metadata') and ctx.room.metadata:
+        if not call_sid:
             try:
-                room_meta = json.loads(ctx.room.metadata) if isinstance(ctx.room.metadata, str) else ctx.room.metadata
+                room_meta = call_meta.room if call_meta else metadata_dict(ctx.room.metadata)
                 call_sid = room_meta.get('call_sid') or room_meta.get('CallSid') or room_meta.get('provider_id')
                 if call_sid:
                     # logger.info(f"CALL_SID_FROM_ROOM_METADATA | call_sid={call_sid}")
@@ -1544,7 +1627,7 @@ class CallHandler:
         # Try participant metadata if not found
         if not call_sid and hasattr(participant, 'metadata') and participant.metadata:
             try:
-                participant_meta = json.loads(participant.metadata) if isinstance(participant.metadata, str) else participant.metadata
+                participant_meta = metadata_dict(participant.metadata)
                 call_sid = participant_meta.get('call_sid') or participant_meta.get('CallSid') or participant_meta.get('provider_id')
                 if call_sid:
                     # logger.info(f"CALL_SID_FROM_PARTICIPANT_METADATA | call_sid={call_sid}")
@@ -1563,6 +1646,7 @@ class CallHandler:
         self, 
         assistant_id: str, 
         transcription: list, 
+        transcript_text: str,
         call_duration: int, 
         agent, 
         assistant_config: Dict[str, Any]
@@ -1577,38 +1661,51 @@ class CallHandler:
         try:
             # logger.info(f"PROCESS_CALL_ANALYSIS_START | assistant_id={assistant_id} | transcription_items={len(transcription)}")
             
+            # The LLM analyses don't depend on each other; run the configured ones concurrently
+            # so call end waits for the slowest instead of their sum. Each helper enforces its
+            # own timeout.
+            analyses = {}
+            
             # Generate call summary if configured
             call_summary_prompt = assistant_config.get("analysis_summary_prompt")
             if call_summary_prompt:
-                try:
-                    analysis_data["call_summary"] = await self._generate_call_summary_with_llm(
-                        transcription=transcription,
-                        prompt=call_summary_prompt,
-                        timeout=assistant_config.get("analysis_summary_timeout", 30)
-                    )
-                    # logger.info(f"CALL_SUMMARY_GENERATED | assistant_id={assistant_id} | length={len(analysis_data['call_summary']) if analysis_data['call_summary'] else 0}")
-                except Exception as e:
-                    # logger.warning(f"CALL_SUMMARY_FAILED | assistant_id={assistant_id} | error={str(e)}")
-                    pass
+                analyses["call_summary"] = self._generate_call_summary_with_llm(
+                    transcript_text=transcript_text,
+                    prompt=call_summary_prompt,
+                    timeout=assistant_config.get("analysis_summary_timeout", 30)
+                )
             
             # Evaluate call success if configured
             success_prompt = assistant_config.get("analysis_evaluation_prompt")
             if success_prompt:
-                try:
-                    analysis_data["call_success"] = await self._evaluate_call_success_with_llm(
-                        transcription=transcription,
-                        prompt=success_prompt,
-                        timeout=assistant_config.get("analysis_evaluation_timeout", 15)
-                    )
-                    # logger.info(f"CALL_SUCCESS_EVALUATED | assistant_id={assistant_id} | success={analysis_data['call_success']}")
-                except Exception as e:
-                    # logger.warning(f"CALL_SUCCESS_EVALUATION_FAILED | assistant_id={assistant_id} | error={str(e)}")
-                    pass
+                analyses["call_success"] = self._evaluate_call_success_with_llm(
+                    transcript_text=transcript_text,
+                    prompt=success_prompt,
+                    timeout=assistant_config.get("analysis_evaluation_timeout", 15)
+                )
             
             # Process structured data extraction
             structured_data_fields = assistant_config.get("structured_data_fields", [])
             # logger.info(f"STRUCTURED_DATA_CONFIG_CHECK | assistant_id={assistant_id} | fields_count={len(structured_data_fields)}")
             
+            # If we have configured fields, also try AI extraction
+            if structured_data_fields and len(structured_data_fields) > 0:
+                analyses["ai_structured_data"] = self._extract_structured_data_with_ai(
+                    transcript_text=transcript_text,
+                    fields=structured_data_fields,
+                    prompt=assistant_config.get("analysis_structured_data_prompt"),
+                    properties=assistant_config.get("analysis_structured_data_properties", {}),
+                    timeout=assistant_config.get("analysis_structured_data_timeout", 20),
+                    agent=agent
+                )
+            
+            results = dict(zip(analyses, await asyncio.gather(*analyses.values(), return_exceptions=True)))
+            
+            # A failed summary or evaluation just leaves its field unset
+            for key in ("call_summary", "call_success"):
+                if key in results and not isinstance(results[key], Exception):
+                    analysis_data[key] = results[key]
+            
             # Always try to get data directly from agent
             agent_structured_data = {}
             if agent and hasattr(agent, 'get_structured_data'):
@@ -1627,29 +1724,18 @@ class CallHandler:
                     }
                     # logger.info(f"NAME_EXTRACTED_FROM_SUMMARY | assistant_id={assistant_id} | name={extracted_name}")
             
-            # If we have configured fields, also try AI extraction
-            if structured_data_fields and len(structured_data_fields) > 0:
-                try:
-                    ai_structured_data = await self._extract_structured_data_with_ai(
-                        transcription=transcription,
-                        fields=structured_data_fields,
-                        prompt=assistant_config.get("analysis_structured_data_prompt"),
-                        properties=assistant_config.get("analysis_structured_data_properties", {}),
-                        timeout=assistant_config.get("analysis_structured_data_timeout", 20),
-                        agent=agent
-                    )
+            if "ai_structured_data" in results:
+                ai_structured_data = results["ai_structured_data"]
+                if not isinstance(ai_structured_data, Exception):
                     # Merge AI extracted data with agent data (agent data takes precedence)
                     final_structured_data = {**ai_structured_data, **agent_structured_data}
                     analysis_data["structured_data"] = final_structured_data
                     # logger.info(f"STRUCTURED_DATA_EXTRACTED_WITH_AI | assistant_id={assistant_id} | ai_fields={len(ai_structured_data)} | agent_fields={len(agent_structured_data)} | final_fields={len(final_structured_data)}")
-                except Exception as e:
-                    # logger.error(f"AI_STRUCTURED_DATA_EXTRACTION_FAILED | assistant_id={assistant_id} | error={str(e)} | fields_count={len(structured_data_fields)} | transcription_items={len(transcription)}")
-                    # logger.error(f"AI_EXTRACTION_FALLBACK | assistant_id={assistant_id} | falling_back_to_agent_data_only | agent_fields={len(agent_structured_data)}")
-                    # Fallback to agent data only - but log this as an error, not a warning
-                    # Add a flag to indicate AI extraction failed
+                else:
+                    # Fallback to agent data only, flagging that AI extraction failed
                     fallback_data = agent_structured_data.copy()
                     fallback_data["_ai_extraction_failed"] = {
-                        "error": str(e),
+                        "error": str(ai_structured_data),
                         "timestamp": datetime.datetime.now().isoformat(),
                         "configured_fields_count": len(structured_data_fields)
                     }
@@ -1673,21 +1759,9 @@ class CallHandler:
         
         return analysis_data
 
-    async def _generate_call_summary_with_llm(self, transcription: list, prompt: str, timeout: int = 30) -> str:
+    async def _generate_call_summary_with_llm(self, transcript_text: str, prompt: str, timeout: int = 30) -> str:
         """Generate call summary using LLM like the old code."""
         try:
-            # logger.info(f"CALL_SUMMARY_DEBUG | transcription_items={len(transcription)}")
-            
-            # Prepare transcription text
-            transcript_text = ""
-            for item in transcription:
-                if isinstance(item, dict) and "content" in item:
-                    role = item.get("role", "unknown")
-                    content = item["content"]
-                    if isinstance(content, str):
-                        transcript_text += f"{role}: {content}\n"
-                        # logger.info(f"TRANSCRIPT_ITEM | role={role} | content_length={len(content)}")
-            
             # logger.info(f"TRANSCRIPT_TEXT_LENGTH | length={len(transcript_text)}")
             
             if not transcript_text.strip():
@@ -1695,13 +1769,13 @@ class CallHandler:
                 return "No conversation content available for summary."
 
             # Use OpenAI API for summary generation
-            openai_api_key = os.getenv("OPENAI_API_KEY")
+            openai_api_key = get_runtime_config().openai_api_key
             if not openai_api_key:
                 # logger.warning("OPENAI_API_KEY not configured for call summary")
                 return "Summary generation not available - API key not configured."
 
             # Use shared OpenAI client
-            client = AsyncOpenAI(api_key=openai_api_key)
+            client = _OPENAI_CLIENT
             
             response = await asyncio.wait_for(
                 client.chat.completions.create(
@@ -1725,29 +1799,20 @@ class CallHandler:
             # logger.warning(f"CALL_SUMMARY_ERROR | error={str(e)}")
             return f"Summary generation failed: {str(e)}"
 
-    async def _evaluate_call_success_with_llm(self, transcription: list, prompt: str, timeout: int = 15) -> bool:
+    async def _evaluate_call_success_with_llm(self, transcript_text: str, prompt: str, timeout: int = 15) -> bool:
         """Evaluate call success using LLM like the old code."""
         try:
-            # Prepare transcription text
-            transcript_text = ""
-            for item in transcription:
-                if isinstance(item, dict) and "content" in item:
-                    role = item.get("role", "unknown")
-                    content = item["content"]
-                    if isinstance(content, str):
-                        transcript_text += f"{role}: {content}\n"
-            
             if not transcript_text.strip():
                 return False
 
             # Use OpenAI API for success evaluation
-            openai_api_key = os.getenv("OPENAI_API_KEY")
+            openai_api_key = get_runtime_config().openai_api_key
             if not openai_api_key:
                 # logger.warning("OPENAI_API_KEY not configured for success evaluation")
                 return False
 
             # Use shared OpenAI client
-            client = AsyncOpenAI(api_key=openai_api_key)
+            client = _OPENAI_CLIENT
             
             response = await asyncio.wait_for(
                 client.chat.completions.create(
@@ -1774,7 +1839,7 @@ class CallHandler:
 
     async def _extract_structured_data_with_ai(
         self, 
-        transcription: list, 
+        transcript_text: str, 
         fields: list, 
         prompt: str = None, 
         properties: dict = None, 
@@ -1785,27 +1850,18 @@ class CallHandler:
         try:
             # logger.info(f"AI_STRUCTURED_DATA_EXTRACTION_START | fields_count={len(fields)}")
             
-            # Prepare transcription text
-            transcript_text = ""
-            for item in transcription:
-                if isinstance(item, dict) and "content" in item:
-                    role = item.get("role", "unknown")
-                    content = item["content"]
-                    if isinstance(content, str):
-                        transcript_text += f"{role}: {content}\n"
-            
             if not transcript_text.strip():
                 # logger.warning("EMPTY_TRANSCRIPT_FOR_AI_EXTRACTION")
                 return {}
 
             # Use OpenAI API for structured data extraction
-            openai_api_key = os.getenv("OPENAI_API_KEY")
+            openai_api_key = get_runtime_config().openai_api_key
             if not openai_api_key:
                 # logger.warning("OPENAI_API_KEY not configured for structured data extraction")
                 return {}
 
             # Use shared OpenAI client
-            client = AsyncOpenAI(api_key=openai_api_key)
+            client = _OPENAI_CLIENT
             
             # Build the extraction prompt
             extraction_prompt = prompt or "Extract the following information from the call transcript:"
@@ -1823,7 +1879,8 @@ class CallHandler:
                         {"role": "user", "content": f"Please extract the requested information from this call:\n\n{transcript_text}"}
                     ],
                     max_tokens=1000,
-                    temperature=0.1
+                    temperature=0.1,
+                    response_format={"type": "json_object"},
                 ),
                 timeout=min(max(timeout, 15), 60),
             )
@@ -1831,8 +1888,7 @@ class CallHandler:
             # Parse the response
             result_text = response.choices[0].message.content.strip()
             try:
-                import json
-                extracted_data = json.loads(result_text)
+                extracted_data = parse_json(result_text)
                 # logger.info(f"AI_STRUCTURED_DATA_EXTRACTED | fields={list(extracted_data.keys())}")
                 return extracted_data
             except json.JSONDecodeError:
@@ -1846,14 +1902,16 @@ class CallHandler:
             # logger.warning(f"AI_STRUCTURED_DATA_EXTRACTION_ERROR | error={str(e)}")
             return {}
 
-    def _create_session(self, config: Dict[str, Any]) -> AgentSession:
+    def _create_session(self, ctx: JobContext, config: Dict[str, Any]) -> AgentSession:
         """Create agent session using assistant's database settings."""
         # Validate and fix model names to prevent API errors
         from config.settings import validate_model_names
         config = validate_model_names(config)
         
-        # re-use prewarmed VAD, fallback if missing
-        vad = getattr(self, "_prewarmed_vad", None) or silero.VAD.load()
+        # re-use the VAD prewarm() loaded into the process, loading one only on a cold start
+        vad = ctx.proc.userdata.get("vad") or self._prewarmed_vad
+        if vad is None:
+            vad = ctx.proc.userdata["vad"] = silero.VAD.load()
 
         # Get configuration from assistant data - optimized for performance
         llm_provider = config.get("llm_provider_setting", "OpenAI")
@@ -1866,7 +1924,7 @@ class CallHandler:
         voice_name = config.get("voice_name_setting", "alloy")
 
         # Debug logging for TTS provider selection
-        logger.info(f"TTS_PROVIDER_SELECTED | provider={voice_provider} | model={voice_model} | voice={voice_name}")
+        logger.info("TTS_PROVIDER_SELECTED | provider=%s | model=%s | voice=%s", voice_provider, voice_model, voice_name)
 
         # Create LLM based on provider
         llm = self._create_llm(llm_provider, llm_model, temperature, max_tokens, config)
@@ -1874,8 +1932,48 @@ class CallHandler:
         # Create TTS based on provider
         tts = self._create_tts(voice_provider, voice_model, voice_name, config)
 
-        # Create STT - prefer Deepgram streaming for better latency, fallback to OpenAI Whisper
+        # Create STT - prefer Deepgram streaming for better latency, fallback to OpenAI Whisper.
+        # Flux (English only) does its own turn detection, so the session needs to know.
         language_setting = config.get("language_setting", "en")
+        use_flux = language_setting == "en"
+        stt = self._create_stt(language_setting)
+
+        # Get call management settings from assistant config
+        max_call_duration_minutes = config.get("max_call_duration", 30)  # From DB (in seconds, convert to minutes)
+        silence_timeout_seconds = config.get("silence_timeout", 20)       # From DB
+        
+        # Convert max call duration from seconds to minutes for session timeout
+        max_call_duration_seconds = max_call_duration_minutes
+
+        # Get voice timing settings from assistant config
+        voice_on_punctuation_seconds = config.get("voice_on_punctuation_seconds", 0.1)      # From DB
+        voice_on_no_punctuation_seconds = config.get("voice_on_no_punctuation_seconds", 1.5)  # From DB
+        voice_on_number_seconds = config.get("voice_on_number_seconds", 0.5)               # From DB
+        voice_backoff_seconds = config.get("voice_backoff_seconds", 1)                      # From DB
+
+        # Get interruption threshold settings from assistant config
+        min_interruption_words = config.get("num_words_to_interrupt_assistant", 3)  # From DB, default to 3 words
+        min_interruption_duration = 0.5  # Require at least 0.5 seconds of speech
+        false_interruption_timeout = 2.0  # Wait 2 seconds before signaling false interruption
+
+        return AgentSession(
+            vad=vad,
+            stt=stt,
+            llm=llm,
+            tts=tts,
+            turn_detection="stt" if use_flux else "vad",
+            allow_interruptions=True,
+            preemptive_generation=True,  # Enable preemptive generation for reduced latency
+            min_endpointing_delay=voice_on_punctuation_seconds,   # From assistant DB
+            max_endpointing_delay=voice_on_no_punctuation_seconds, # From assistant DB
+            user_away_timeout=silence_timeout_seconds,       # Align user-away timer with idle message timeout
+            min_interruption_words=min_interruption_words,    # Require N words before interrupting
+            min_interruption_duration=min_interruption_duration,  # Require minimum speech duration
+            false_interruption_timeout=false_interruption_timeout,  # Timeout for false interruptions
+        )
+
+    def _create_stt(self, language_setting: str):
+        """Create STT for a language: Deepgram (Flux for English) when configured, else OpenAI Whisper."""
         
         # Map combined language codes to Deepgram-supported codes
         language_mapping = {
@@ -1900,7 +1998,7 @@ class CallHandler:
         
         # Try Deepgram STT first if available and API key is set
         stt = None
-        deepgram_api_key = os.getenv("DEEPGRAM_API_KEY")
+        deepgram_api_key = get_runtime_config().deepgram_api_key
         
         if DEEPGRAM_AVAILABLE and deepgram_api_key:
             try:
@@ -1917,9 +2015,9 @@ class CallHandler:
                         model=stt_model,
                         language=deepgram_language
                     )
-                    logger.info(f"DEEPGRAM_STT_CONFIGURED | model={stt_model} | language={deepgram_language}")
+                    logger.info("DEEPGRAM_STT_CONFIGURED | model=%s | language=%s", stt_model, deepgram_language)
             except Exception as e:
-                logger.warning(f"DEEPGRAM_STT_FAILED | flux={use_flux} | error={str(e)} | falling back to OpenAI Whisper")
+                logger.warning("DEEPGRAM_STT_FAILED | flux=%s | error=%s | falling back to OpenAI Whisper", use_flux, str(e))
                 stt = None
         
         # Fallback to OpenAI Whisper STT if Deepgram is not available or failed
@@ -1944,40 +2042,7 @@ class CallHandler:
             )
         else:
             logger.info("OPENAI_STT_SKIPPED | reason=DEEPGRAM_CONFIGURED")
-
-        # Get call management settings from assistant config
-        max_call_duration_minutes = config.get("max_call_duration", 30)  # From DB (in seconds, convert to minutes)
-        silence_timeout_seconds = config.get("silence_timeout", 20)       # From DB
-        
-        # Convert max call duration from seconds to minutes for session timeout
-        max_call_duration_seconds = max_call_duration_minutes
-
-        # Get voice timing settings from assistant config
-        voice_on_punctuation_seconds = config.get("voice_on_punctuation_seconds", 0.1)      # From DB
-        voice_on_no_punctuation_seconds = config.get("voice_on_no_punctuation_seconds", 1.5)  # From DB
-        voice_on_number_seconds = config.get("voice_on_number_seconds", 0.5)               # From DB
-        voice_backoff_seconds = config.get("voice_backoff_seconds", 1)                      # From DB
-
-        # Get interruption threshold settings from assistant config
-        min_interruption_words = config.get("num_words_to_interrupt_assistant", 3)  # From DB, default to 3 words
-        min_interruption_duration = 0.5  # Require at least 0.5 seconds of speech
-        false_interruption_timeout = 2.0  # Wait 2 seconds before signaling false interruption
-
-        return AgentSession(
-            vad=vad,
-            stt=stt,
-            llm=llm,
-            tts=tts,
-            turn_detection="stt" if use_flux else "vad",
-            allow_interruptions=True,
-            preemptive_generation=True,  # Enable preemptive generation for reduced latency
-            min_endpointing_delay=voice_on_punctuation_seconds,   # From assistant DB
-            max_endpointing_delay=voice_on_no_punctuation_seconds, # From assistant DB
-            user_away_timeout=silence_timeout_seconds,       # Align user-away timer with idle message timeout
-            min_interruption_words=min_interruption_words,    # Require N words before interrupting
-            min_interruption_duration=min_interruption_duration,  # Require minimum speech duration
-            false_interruption_timeout=false_interruption_timeout,  # Timeout for false interruptions
-        )
+        return stt
 
     # Keep the original LLM and TTS creation methods for pre-warming
     def _create_llm(self, provider: str, model: str, temperature: float, max_tokens: int, config: Dict[str, Any]):
@@ -1989,8 +2054,8 @@ class CallHandler:
             groq_temperature = config.get("groq_temperature", 0.10)  # From DB  
             groq_max_tokens = config.get("groq_max_tokens", 250)    # From DB
             
-            # Get API key from environment (centralized)
-            groq_api_key = os.getenv("GROQ_API_KEY")
+            # Get API key from the runtime config snapshot
+            groq_api_key = get_runtime_config().groq_api_key
             
             if groq_api_key:
                 # Handle model mapping for decommissioned models
@@ -2010,7 +2075,7 @@ class CallHandler:
                     parallel_tool_calls=False,  # Disabled to prevent parallel function call errors
                     tool_choice="auto",
                 )
-                logger.info(f"GROQ_LLM_CONFIGURED | model={mapped_model} | temp={groq_temperature} | tokens={groq_max_tokens}")
+                logger.info("GROQ_LLM_CONFIGURED | model=%s | temp=%s | tokens=%s", mapped_model, groq_temperature, groq_max_tokens)
                 return llm
             else:
                 logger.warning("GROQ_API_KEY_NOT_SET | falling back to OpenAI LLM")
@@ -2021,8 +2086,8 @@ class CallHandler:
             cerebras_temperature = config.get("temperature_setting", 0.3)  # From DB
             cerebras_max_tokens = config.get("max_token_setting", 250)     # From DB
             
-            # Get API key from environment (centralized)
-            cerebras_api_key = os.getenv("CEREBRAS_API_KEY")
+            # Get API key from the runtime config snapshot
+            cerebras_api_key = get_runtime_config().cerebras_api_key
             
             if cerebras_api_key:
                 llm = openai.LLM(
@@ -2033,7 +2098,7 @@ class CallHandler:
                     parallel_tool_calls=False,  # Disabled to prevent parallel function call errors
                     tool_choice="auto",
                 )
-                logger.info(f"CEREBRAS_LLM_CONFIGURED | model={cerebras_model} | temp={cerebras_temperature} | tokens={cerebras_max_tokens}")
+                logger.info("CEREBRAS_LLM_CONFIGURED | model=%s | temp=%s | tokens=%s", cerebras_model, cerebras_temperature, cerebras_max_tokens)
                 return llm
             else:
                 logger.warning("CEREBRAS_API_KEY_NOT_SET | falling back to OpenAI LLM")
@@ -2054,8 +2119,8 @@ class CallHandler:
         }
         mapped_model = model_mapping.get(openai_model, "gpt-4o-mini")
         
-        # Get API key from environment (centralized)
-        openai_api_key = os.getenv("OPENAI_API_KEY")
+        # Get API key from the runtime config snapshot
+        openai_api_key = get_runtime_config().openai_api_key or None
         
         llm = openai.LLM(
             model=mapped_model,
@@ -2064,7 +2129,7 @@ class CallHandler:
             parallel_tool_calls=False,  # Disabled to prevent parallel function call errors
             tool_choice="auto",
         )
-        logger.info(f"OPENAI_LLM_CONFIGURED | model={mapped_model} | temp={openai_temperature} | tokens={openai_max_tokens}")
+        logger.info("OPENAI_LLM_CONFIGURED | model=%s | temp=%s | tokens=%s", mapped_model, openai_temperature, openai_max_tokens)
         return llm
 
     def _create_tts(self, provider: str, model: str, voice_name: str, config: Dict[str, Any]):
@@ -2079,7 +2144,7 @@ class CallHandler:
         - OpenAI: Default fallback TTS provider
         """
         # Debug logging for TTS provider check
-        logger.info(f"TTS_PROVIDER_CHECK | provider={provider} | CARTESIA_AVAILABLE={CARTESIA_AVAILABLE}")
+        logger.info("TTS_PROVIDER_CHECK | provider=%s | CARTESIA_AVAILABLE=%s", provider, CARTESIA_AVAILABLE)
         
         if provider == "Rime" and RIME_AVAILABLE:
             # Use assistant's Rime settings from database
@@ -2088,8 +2153,8 @@ class CallHandler:
             rime_speed_alpha = config.get("speed_alpha", 0.9)  # From DB
             rime_reduce_latency = config.get("reduce_latency", True)  # From DB
             
-            # Get API key from environment (centralized)
-            rime_api_key = os.getenv("RIME_API_KEY")
+            # Get API key from the runtime config snapshot
+            rime_api_key = get_runtime_config().rime_api_key
             
             if rime_api_key:
                 # Use arcana model when specified
@@ -2101,7 +2166,7 @@ class CallHandler:
                         reduce_latency=rime_reduce_latency,
                         api_key=rime_api_key,  # From environment
                     )
-                    logger.info(f"RIME_TTS_CONFIGURED | model=arcana | speaker={rime_speaker} | speed={rime_speed_alpha}")
+                    logger.info("RIME_TTS_CONFIGURED | model=arcana | speaker=%s | speed=%s", rime_speaker, rime_speed_alpha)
                 else:
                     # Use mist-v2 with hyphen for compatibility
                     model_name = "mist-v2" if rime_model == "mistv2" else rime_model
@@ -2112,7 +2177,7 @@ class CallHandler:
                         reduce_latency=rime_reduce_latency,
                         api_key=rime_api_key,  # From environment
                     )
-                    logger.info(f"RIME_TTS_CONFIGURED | model={model_name} | speaker={rime_speaker} | speed={rime_speed_alpha}")
+                    logger.info("RIME_TTS_CONFIGURED | model=%s | speaker=%s | speed=%s", model_name, rime_speaker, rime_speed_alpha)
                 return tts
             else:
                 logger.warning("RIME_API_KEY_NOT_SET | falling back to Deepgram TTS")
@@ -2125,9 +2190,9 @@ class CallHandler:
             hume_speed = config.get("speed", 1.0)  # From DB
             hume_instant_mode = config.get("instant_mode", True)  # From DB
             
-            # Get API key from environment (centralized)
-            hume_api_key = os.getenv("HUME_API_KEY")
-            openai_api_key = os.getenv("OPENAI_API_KEY")
+            # Get API key from the runtime config snapshot
+            hume_api_key = get_runtime_config().hume_api_key
+            openai_api_key = get_runtime_config().openai_api_key or None
             
             if hume_api_key:
                 try:
@@ -2148,7 +2213,7 @@ class CallHandler:
                         model_version="1",  # Default model version
                         api_key=hume_api_key,
                     )
-                    logger.info(f"HUME_TTS_CONFIGURED_DEFAULT | voice={hume_voice_name} | speed={hume_speed} | instant_mode={hume_instant_mode} | model_version=1")
+                    logger.info("HUME_TTS_CONFIGURED_DEFAULT | voice=%s | speed=%s | instant_mode=%s | model_version=1", hume_voice_name, hume_speed, hume_instant_mode)
                     
                     # Safety check: ensure hume_tts was created
                     if hume_tts is None:
@@ -2176,15 +2241,15 @@ class CallHandler:
                         
                         # Wrap with FallbackAdapter: primary Hume, fallback OpenAI
                         tts = FallbackAdapter([hume_tts, openai_tts])
-                        logger.info(f"HUME_TTS_WITH_FALLBACK | primary=Hume | fallback=OpenAI | voice={mapped_voice}")
+                        logger.info("HUME_TTS_WITH_FALLBACK | primary=Hume | fallback=OpenAI | voice=%s", mapped_voice)
                     else:
                         # No fallback available, use Hume only
                         tts = hume_tts
-                        logger.info(f"HUME_TTS_NO_FALLBACK | using Hume TTS only")
+                        logger.info("HUME_TTS_NO_FALLBACK | using Hume TTS only")
                     
                     return tts
                 except Exception as e:
-                    logger.error(f"HUME_TTS_CONFIG_FAILED | error={str(e)} | falling back to OpenAI")
+                    logger.error("HUME_TTS_CONFIG_FAILED | error=%s | falling back to OpenAI", str(e))
                     # Fall through to OpenAI TTS below
             else:
                 logger.warning("HUME_API_KEY_NOT_SET | falling back to OpenAI TTS")
@@ -2195,8 +2260,8 @@ class CallHandler:
             elevenlabs_model = config.get("voice_model_setting", "eleven_turbo_v2")  # From DB
             elevenlabs_voice = config.get("voice_name_setting", "Rachel")             # From DB
             
-            # Get API key from environment (centralized)
-            elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
+            # Get API key from the runtime config snapshot
+            elevenlabs_api_key = get_runtime_config().elevenlabs_api_key
             
             if elevenlabs_api_key:
                 tts = lk_elevenlabs.TTS(
@@ -2204,7 +2269,7 @@ class CallHandler:
                     voice_id=elevenlabs_voice,
                     api_key=elevenlabs_api_key,  # From environment
                 )
-                logger.info(f"ELEVENLABS_TTS_CONFIGURED | model={elevenlabs_model} | voice={elevenlabs_voice}")
+                logger.info("ELEVENLABS_TTS_CONFIGURED | model=%s | voice=%s", elevenlabs_model, elevenlabs_voice)
                 return tts
             else:
                 logger.warning("ELEVENLABS_API_KEY_NOT_SET | falling back to OpenAI TTS")
@@ -2214,15 +2279,15 @@ class CallHandler:
             # Use assistant's Deepgram settings from database
             deepgram_model = config.get("voice_model_setting", "aura-asteria-en")  # From DB
             
-            # Get API key from environment (centralized)
-            deepgram_api_key = os.getenv("DEEPGRAM_API_KEY")
+            # Get API key from the runtime config snapshot
+            deepgram_api_key = get_runtime_config().deepgram_api_key
             
             if deepgram_api_key:
                 tts = lk_deepgram.TTS(
                     model=deepgram_model,
                     api_key=deepgram_api_key,
                 )
-                logger.info(f"DEEPGRAM_TTS_CONFIGURED | model={deepgram_model}")
+                logger.info("DEEPGRAM_TTS_CONFIGURED | model=%s", deepgram_model)
                 return tts
             else:
                 logger.warning("DEEPGRAM_API_KEY_NOT_SET | falling back to OpenAI TTS")
@@ -2246,9 +2311,9 @@ class CallHandler:
             cartesia_volume = config.get("volume", 1.0)  # From DB (if available)
             cartesia_emotion = config.get("emotion")  # From DB (optional)
             
-            # Get API key from environment (centralized)
-            cartesia_api_key = os.getenv("CARTESIA_API_KEY")
-            logger.info(f"CARTESIA_CONFIG | model={cartesia_model} | voice={cartesia_voice} | api_key_set={bool(cartesia_api_key)}")
+            # Get API key from the runtime config snapshot
+            cartesia_api_key = get_runtime_config().cartesia_api_key
+            logger.info("CARTESIA_CONFIG | model=%s | voice=%s | api_key_set=%s", cartesia_model, cartesia_voice, bool(cartesia_api_key))
             
             if cartesia_api_key:
                 # Build TTS parameters
@@ -2267,14 +2332,14 @@ class CallHandler:
                 tts = lk_cartesia.TTS(
                     **tts_params
                 )
-                logger.info(f"CARTESIA_TTS_CONFIGURED | model={cartesia_model} | voice={cartesia_voice} | speed={cartesia_speed} | language={cartesia_language}")
+                logger.info("CARTESIA_TTS_CONFIGURED | model=%s | voice=%s | speed=%s | language=%s", cartesia_model, cartesia_voice, cartesia_speed, cartesia_language)
                 return tts
             else:
                 logger.warning("CARTESIA_API_KEY_NOT_SET | falling back to OpenAI TTS")
         elif provider == "Cartesia" and not CARTESIA_AVAILABLE:
-            logger.warning(f"CARTESIA_NOT_AVAILABLE | provider={provider} | CARTESIA_AVAILABLE={CARTESIA_AVAILABLE} | falling back to OpenAI TTS")
+            logger.warning("CARTESIA_NOT_AVAILABLE | provider=%s | CARTESIA_AVAILABLE=%s | falling back to OpenAI TTS", provider, CARTESIA_AVAILABLE)
         elif provider != "Cartesia":
-            logger.debug(f"PROVIDER_NOT_CARTESIA | provider={provider} | skipping Cartesia check")
+            logger.debug("PROVIDER_NOT_CARTESIA | provider=%s | skipping Cartesia check", provider)
         
         # Default to OpenAI TTS with assistant's settings
         openai_voice = config.get("voice_name_setting", "Rachel")  # From DB
@@ -2297,52 +2362,107 @@ class CallHandler:
         }
         mapped_voice = voice_mapping.get(voice_name.lower(), "alloy")
         
-        # Get API key from environment (centralized)
-        openai_api_key = os.getenv("OPENAI_API_KEY")
+        # Get API key from the runtime config snapshot
+        openai_api_key = get_runtime_config().openai_api_key or None
         
         tts = openai.TTS(
             model="tts-1",
             voice=mapped_voice,
             api_key=openai_api_key,
         )
-        logger.info(f"OPENAI_TTS_CONFIGURED | voice={mapped_voice}")
+        logger.info("OPENAI_TTS_CONFIGURED | voice=%s", mapped_voice)
         return tts
 
-    async def _safe_db_insert(self, table: str, payload: dict, timeout: int = 5):
-        """Safely insert data into database with timeout protection."""
+    async def _safe_db_insert(self, table: str, payload: dict, timeout: int = 5, returning: str = "representation"):
+        """Safely insert data into database with timeout protection.
+        
+        Pass returning="minimal" when the inserted row isn't needed; the response then carries no data.
+        """
         try:
             return await asyncio.wait_for(
-                asyncio.to_thread(lambda: self.supabase.client.table(table).insert(payload).execute()),
+                asyncio.to_thread(lambda: self.supabase.client.table(table).insert(payload, returning=returning).execute()),
                 timeout=timeout
             )
         except asyncio.TimeoutError:
-            logger.error(f"DATABASE_INSERT_TIMEOUT | table={table} | timeout={timeout}s")
+            logger.error("DATABASE_INSERT_TIMEOUT | table=%s | timeout=%ss", table, timeout)
             raise
         except Exception as e:
-            logger.error(f"DATABASE_INSERT_ERROR | table={table} | error={str(e)}")
+            logger.error("DATABASE_INSERT_ERROR | table=%s | error=%s", table, str(e))
             raise
 
 
+def _minutes_deduction(assistant_config: Dict[str, Any], call_duration: int) -> Optional[Dict[str, Any]]:
+    """Describe the minutes a call should be billed, or None when there is nothing to deduct."""
+    user_id = assistant_config.get("user_id")
+    if not user_id or call_duration <= 0:
+        return None
+    return {
+        "user_id": user_id,
+        "workspace_id": assistant_config.get("workspace_id"),
+        "minutes": call_duration / 60.0,
+    }
+
+
+def _apply_spooled_deduction(deduction: Dict[str, Any]) -> None:
+    """Bill a replayed call's minutes; runs on the spool flush thread, which has no event loop."""
+    asyncio.run(CallHandler._deduct_minutes(deduction))
+
+
+def _flush_write_spool(supabase) -> None:
+    """Replay the local write spool, logging instead of raising."""
+    try:
+        flush_spool(supabase.client, on_saved=_apply_spooled_deduction)
+    except Exception as e:
+        logger.warning("WRITE_SPOOL_FLUSH_FAILED | error=%s", str(e))
+
+
+def _warm_rag_service() -> None:
+    """Build the RAG service (Pinecone import and client) ahead of the first knowledge-base call."""
+    try:
+        get_rag_service()
+    except Exception as e:
+        logger.warning("RAG_PREWARM_FAILED | error=%s", str(e))
+
+
 def prewarm(proc: agents.JobProcess):
     """Pre-warm the system before handling calls."""
+    _configure_logging()
     # logger.info("PREWARM_FUNCTION | system pre-warming started")
-    # Pre-warming is now handled in CallHandler.__init__
+    # Build the process-wide Supabase client before a job arrives so the first
+    # call doesn't pay for client construction; CallHandler reuses this instance
+    proc.userdata["supabase"] = get_supabase_client()
+    # Replay rows spooled by earlier calls while the database was unreachable; off-thread so
+    # a slow replay doesn't hold up the process becoming ready
+    threading.Thread(target=_flush_write_spool, args=(proc.userdata["supabase"],), daemon=True).start()
+    # Knowledge-base agents build the RAG service in UnifiedAgent.__init__, right before the
+    # greeting; when Pinecone is configured, do that work here instead, off the main thread
+    if os.getenv("PINECONE_API_KEY", "").strip():
+        threading.Thread(target=_warm_rag_service, daemon=True).start()
+    # Load the Silero VAD model once per process; every session reuses it
+    proc.userdata["vad"] = silero.VAD.load()
+    # Snapshot per-call environment knobs before the first job; every get_runtime_config() shares it
+    get_runtime_config()
+    # Remaining pre-warming is handled in CallHandler.__init__
 
 
 async def entrypoint(ctx: JobContext):
     """Main entry point for LiveKit agent."""
-    logger.info(f"🎯 AGENT_ENTRYPOINT_CALLED | room={ctx.room.name}")
-    logger.info(f"📋 Job metadata: {ctx.job.metadata}")
-    logger.info(f"📋 Room metadata: {ctx.room.metadata}")
+    logger.info("🎯 AGENT_ENTRYPOINT_CALLED | room=%s | job_metadata_len=%s | room_metadata_len=%s", ctx.room.name, len(ctx.job.metadata or ''), len(ctx.room.metadata or ''))
+    # Raw metadata can carry full campaign prompts; only dump it when debugging
+    logger.debug("📋 Job metadata: %s", ctx.job.metadata)
+    logger.debug("📋 Room metadata: %s", ctx.room.metadata)
     
-    # Create call handler and process the call
-    handler = CallHandler()
+    # Reuse the process-wide call handler (built on the first job, once an event loop is running)
+    handler = ctx.proc.userdata.get("handler")
+    if handler is None:
+        handler = ctx.proc.userdata["handler"] = CallHandler(supabase=ctx.proc.userdata.get("supabase"))
     await handler.handle_call(ctx)
     
-    logger.info(f"✅ AGENT_ENTRYPOINT_COMPLETE | room={ctx.room.name}")
+    logger.info("✅ AGENT_ENTRYPOINT_COMPLETE | room=%s", ctx.room.name)
 
 
 if __name__ == "__main__":
+    _configure_logging()
     # Get agent name from environment variable
     agent_name = os.getenv("LK_AGENT_NAME", "ai")
     # logger.info(f"🤖 Agent name: {agent_name}")
@@ -2,22 +2,120 @@
 Agent factory for creating and configuring LiveKit agents.
 """
 
-import os
-import json
 import asyncio
 import datetime
 import logging
+import re
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from zoneinfo import ZoneInfo
 
 from livekit.agents import Agent
 from services.unified_agent import UnifiedAgent
 from integrations.calendar_api import CalComCalendar
-from config.settings import validate_model_names
+from config.settings import validate_model_names, get_runtime_config
 from utils.instruction_builder import build_analysis_instructions, build_call_management_instructions
+from utils.helpers import fingerprint_text
 
 logger = logging.getLogger(__name__)
 
+# Per-language greeting templates used when a stock English greeting needs localizing
+_DEFAULT_GREETINGS = {
+    "hi": "नमस्ते! मैं {name} बोल रही हूँ। मैं आज आपकी कैसे मदद कर सकती हूँ?",
+    "es": "¡Hola! Soy {name}. ¿En qué puedo ayudarle hoy?",
+    "pt": "Olá! Aqui é {name}. Como posso ajudar você hoje?",
+    "fr": "Bonjour! C'est {name}. Comment puis-je vous aider aujourd'hui?",
+    "de": "Hallo! Hier ist {name}. Wie kann ich Ihnen heute helfen?",
+    "nl": "Hallo! Met {name}. Waarmee kan ik u vandaag helpen?",
+    "it": "Ciao! Sono {name}. Come posso aiutarla oggi?",
+    "zh": "您好！我是 {name}。请问今天有什么可以帮您的吗？",
+    "en-es": "Hi! This is {name}. ¡Hola! Habla con {name}. How can I help you? ¿En qué puedo ayudarle?"
+}
+
+_KNOWN_ENGLISH_DEFAULTS = frozenset([
+    "Hi! This is Helen from Dental Care. How may I help you today?",
+    "Hi! This is [Your Name] from [Your Company]. How may I help you today?",
+    "Hello, how can I help you today?",
+    "Hi, how are you today?",
+    "I'm still here if you need anything",
+    "Are you still there?",
+    "Did you have any other questions?",
+    ""
+])
+
+_GREETING_KEYWORDS = ("hi", "hello", "hey", "help you", "how are you", "this is")
+_GREETING_NAME_RE = re.compile(r"(?:this is|i'm|i am)\s+([^.!?]+)", re.IGNORECASE)
+
+_LANGUAGE_NAMES = {
+    "en": "English",
+    "es": "Spanish",
+    "pt": "Portuguese",
+    "fr": "French",
+    "de": "German",
+    "nl": "Dutch",
+    "it": "Italian",
+    "hi": "Hindi",
+    "zh": "Chinese",
+    "en-es": "English or Spanish as appropriate for the user's input"
+}
+
+# Keywords that suggest a structured-data field should be asked of the user
+_ASK_KEYWORDS = frozenset({
+    "name", "email", "phone", "number", "date", "time", "slot", "appointment",
+    "booking", "location", "address", "company", "budget", "interest"
+})
+
+
+@lru_cache(maxsize=32)
+def _language_instructions(language_setting: str) -> str:
+    """Build the LANGUAGE prompt section; it depends only on the language setting."""
+    lang_name = _LANGUAGE_NAMES.get(language_setting, "English")
+    if language_setting == "en-es":
+        rule = "If the user speaks English, respond in English. If they speak Spanish, respond in Spanish."
+    else:
+        rule = f"Even if the user speaks another language, you must stay in {lang_name}."
+    return f"\n\nLANGUAGE:\n- You MUST respond in {lang_name} at all times. {rule}"
+
+
+# Static prompt sections, appended when the assistant has a knowledge base / calendar
+_KNOWLEDGE_BASE_INSTRUCTIONS = "\n\nKNOWLEDGE BASE ACCESS:\nYou have access to a knowledge base with information about the company. You can use the following tools when needed:\n- query_knowledge_base: Search for specific information\n- get_detailed_information: Get comprehensive details about a topic\n\nIMPORTANT: Only use the knowledge base tools when explicitly instructed to do so in your system prompt or when the user specifically requests information that requires knowledge base lookup. Do not automatically search the knowledge base unless instructed.\n\nWhen you do use the knowledge base, provide complete, well-formatted responses with proper context and source information when available."
+
+_BOOKING_INSTRUCTIONS = (
+    "\n\nBOOKING CAPABILITIES:\n"
+    "You can help users book appointments using the following tools:\n"
+    "- set_call_timezone: Set the caller's time zone (REQUIRED before listing slots or scheduling).\n"
+    "- list_slots_on_day: Show available slots for a specific day. Requires caller timezone to be set first.\n"
+    "- choose_slot: Select a time slot.\n"
+    "- set_name: Set the customer's name.\n"
+    "- set_email: Set the customer's email.\n"
+    "- set_phone: Set the customer's phone number.\n"
+    "- finalize_booking: Complete the booking when ALL info is collected.\n\n"
+    "CONVERSATIONAL GUIDELINES:\n"
+    "1. COLLECT INFO FIRST: Before asking for availability or timezone, you MUST collect the customer's name, email, and phone number. This is your first priority.\n"
+    "2. ASK FOR TIMEZONE AFTER INFO: Once you have the contact details, ask for their time zone before listing availability.\n"
+    "3. ASK FOR DAY THEN TIME: After getting the timezone, ask what day works best. Then offer specific times.\n"
+    "4. OFFER EXACTLY 3 OPTIONS: When presenting availability, offer exactly 3 slots in ONE casual sentence. Always say the day before the time (e.g., 'I’ve got Wednesday at 2, Thursday at 1:30, or Friday at 3 — any of those work?'). Do not list more than 3, do not use numbers, and do not use multiple sentences.\n"
+    "5. MANDATORY TOOL CALL: You MUST call `finalize_booking` or `auto_book_appointment` before confirming ANY appointment. Never say 'You're all set' or similar before the tool confirms success.\n"
+    "6. WAIT FOR TOOL: The tool will provide the final confirmation message. Do not make it up.\n\n"
+    "CRITICAL BOOKING RULES:\n"
+    "- INFO PRIORITY: Never list slots or ask for timezone until you have Name, Email, and Phone.\n"
+    "- TIMEZONE: Ensure timezone is resolved before listing slots. Once established (even if it's UTC), do NOT repetitively confirm it to the user.\n"
+    "- CONCISENESS: Just provide the requested information. Do not repeat 'We have established...' or similar redundant phrases.\n"
+    "- ONLY start booking if the user explicitly requests it.\n"
+    "- Do NOT call finalize_booking until you have: timezone, slot, name, email, and phone."
+)
+
+@lru_cache(maxsize=64)
+def _static_suffix(language_setting: str, has_knowledge_base: bool, has_calendar: bool) -> str:
+    """Join the static prompt tail (language, knowledge base, booking) once per combination."""
+    parts = [_language_instructions(language_setting)]
+    if has_knowledge_base:
+        parts.append(_KNOWLEDGE_BASE_INSTRUCTIONS)
+    if has_calendar:
+        parts.append(_BOOKING_INSTRUCTIONS)
+    return "".join(parts)
+
+
 # Global OpenAI client for field classification
 _OPENAI_CLIENT = None
 
@@ -26,7 +124,7 @@ def get_openai_client():
     global _OPENAI_CLIENT
     if _OPENAI_CLIENT is None:
         from openai import AsyncOpenAI
-        _OPENAI_CLIENT = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        _OPENAI_CLIENT = AsyncOpenAI(api_key=get_runtime_config().openai_api_key or None)
     return _OPENAI_CLIENT
 
 
@@ -44,7 +142,8 @@ class AgentFactory:
         # Validate model names first
         config = validate_model_names(config)
         
-        instructions = config.get("prompt", "You are a helpful assistant.")
+        # Collect prompt fragments and join once instead of re-allocating on every +=
+        instruction_parts = [config.get("prompt", "You are a helpful assistant.")]
 
         # Add date context only if calendar is configured
         cal_api_key = config.get('cal_api_key')
@@ -59,7 +158,7 @@ class AgentFactory:
                 tz_name = "UTC"
                 now_local = datetime.datetime.now(ZoneInfo(tz_name))
             
-            instructions += (
+            instruction_parts.append(
                 f"\n\nCONTEXT:\n"
                 f"- Current local time: {now_local.strftime('%Y-%m-%d %H:%M:%S')} ({tz_name})\n"
                 f"- Timezone: {tz_name}\n"
@@ -70,59 +169,34 @@ class AgentFactory:
         # Add call management settings to instructions
         call_management_config = build_call_management_instructions(config)
         if call_management_config:
-            instructions += "\n\n" + call_management_config
+            instruction_parts.extend(("\n\n", call_management_config))
 
         # Add analysis instructions for structured data collection
         analysis_instructions = await build_analysis_instructions(config, self._classify_data_fields_with_llm)
         if analysis_instructions:
-            instructions += "\n\n" + analysis_instructions
+            instruction_parts.extend(("\n\n", analysis_instructions))
             logger.info(f"ANALYSIS_INSTRUCTIONS_ADDED | length={len(analysis_instructions)}")
 
         # Add first message handling
         first_message = config.get("first_message", "")
         language_setting = config.get("language_setting", "en")
         
-        # Backend-level localization for default greetings if user hasn't customized them
-        default_greetings = {
-            "hi": "नमस्ते! मैं {name} बोल रही हूँ। मैं आज आपकी कैसे मदद कर सकती हूँ?",
-            "es": "¡Hola! Soy {name}. ¿En qué puedo ayudarle hoy?",
-            "pt": "Olá! Aqui é {name}. Como posso ajudar você hoje?",
-            "fr": "Bonjour! C'est {name}. Comment puis-je vous aider aujourd'hui?",
-            "de": "Hallo! Hier ist {name}. Wie kann ich Ihnen heute helfen?",
-            "nl": "Hallo! Met {name}. Waarmee kan ik u vandaag helpen?",
-            "it": "Ciao! Sono {name}. Come posso aiutarla oggi?",
-            "zh": "您好！我是 {name}。请问今天有什么可以帮您的吗？",
-            "en-es": "Hi! This is {name}. ¡Hola! Habla con {name}. How can I help you? ¿En qué puedo ayudarle?"
-        }
-        
-        known_english_defaults = [
-            "Hi! This is Helen from Dental Care. How may I help you today?",
-            "Hi! This is [Your Name] from [Your Company]. How may I help you today?",
-            "Hello, how can I help you today?",
-            "Hi, how are you today?",
-            "I'm still here if you need anything",
-            "Are you still there?",
-            "Did you have any other questions?",
-            ""
-        ]
-
         # Robust English detection: if non-English language and message is pure ASCII with greeting keywords
         is_english_looking = False
-        if first_message and all(ord(c) < 128 for c in first_message):
-            greeting_keywords = ["hi", "hello", "hey", "help you", "how are you", "this is"]
-            if any(keyword in first_message.lower() for keyword in greeting_keywords):
+        if first_message and first_message.isascii():
+            lowered = first_message.lower()
+            if any(keyword in lowered for keyword in _GREETING_KEYWORDS):
                 is_english_looking = True
 
         # If language is not English and first_message is English-looking, translate it
-        if language_setting != "en" and (first_message in known_english_defaults or is_english_looking):
+        if language_setting != "en" and (first_message in _KNOWN_ENGLISH_DEFAULTS or is_english_looking):
             # Try to extract name/company if it's "this is X from Y" or "this is X"
             name_part = "your assistant"
-            import re
-            name_match = re.search(r"(?:this is|i'm|i am)\s+([^.!?]+)", first_message, re.IGNORECASE)
+            name_match = _GREETING_NAME_RE.search(first_message)
             if name_match:
                 name_part = name_match.group(1).strip()
-            
-            template = default_greetings.get(language_setting, "नमस्ते! मैं आपकी मदद कैसे कर सकता हूँ?")
+
+            template = _DEFAULT_GREETINGS.get(language_setting, "नमस्ते! मैं आपकी मदद कैसे कर सकता हूँ?")
             # For Hindi specifically, if we can't find a template, use a generic Hindi one
             if "{name}" in template:
                 translated_message = template.replace("{name}", name_part)
@@ -134,36 +208,13 @@ class AgentFactory:
             config["first_message"] = first_message
             logger.info(f"FIRST_MESSAGE_LOCALIZED_BACKEND | language={language_setting} | original={config.get('first_message', '')[:20]} | localized={first_message[:30]}...")
 
-        force_first = os.getenv("FORCE_FIRST_MESSAGE", "true").lower() != "false"
+        force_first = get_runtime_config().force_first_message
         if force_first and first_message:
-            instructions += f' IMPORTANT: Start the conversation by saying exactly: "{first_message}" Do not repeat or modify this greeting.'
+            instruction_parts.append(f' IMPORTANT: Start the conversation by saying exactly: "{first_message}" Do not repeat or modify this greeting.')
             logger.info(f"FIRST_MESSAGE_SET | first_message={first_message}")
 
-        # Add language constraints to ensure the LLM responds in the correct language
-        language_names = {
-            "en": "English",
-            "es": "Spanish",
-            "pt": "Portuguese",
-            "fr": "French",
-            "de": "German",
-            "nl": "Dutch",
-            "it": "Italian",
-            "hi": "Hindi",
-            "zh": "Chinese",
-            "en-es": "English or Spanish as appropriate for the user's input"
-        }
-        lang_name = language_names.get(language_setting, "English")
-        instructions += f"\n\nLANGUAGE:\n- You MUST respond in {lang_name} at all times. "
-        if language_setting == "en-es":
-            instructions += "If the user speaks English, respond in English. If they speak Spanish, respond in Spanish."
-        else:
-            instructions += f"Even if the user speaks another language, you must stay in {lang_name}."
-        
-        logger.info(f"LANGUAGE_INSTRUCTIONS_ADDED | language={language_setting} | name={lang_name}")
-
-        # Log final instructions for debugging
-        # logger.info(f"FINAL_INSTRUCTIONS_LENGTH | length={len(instructions)}")
-        # logger.info(f"FINAL_INSTRUCTIONS_PREVIEW | preview={instructions}...")
+        # Language constraints ensure the LLM responds in the correct language
+        logger.info(f"LANGUAGE_INSTRUCTIONS_ADDED | language={language_setting} | name={_LANGUAGE_NAMES.get(language_setting, 'English')}")
 
         # Create unified agent that combines RAG and booking capabilities
         knowledge_base_id = config.get("knowledge_base_id")
@@ -174,37 +225,21 @@ class AgentFactory:
 
         # Add RAG tools to instructions if knowledge base is available
         if knowledge_base_id:
-            instructions += "\n\nKNOWLEDGE BASE ACCESS:\nYou have access to a knowledge base with information about the company. You can use the following tools when needed:\n- query_knowledge_base: Search for specific information\n- get_detailed_information: Get comprehensive details about a topic\n\nIMPORTANT: Only use the knowledge base tools when explicitly instructed to do so in your system prompt or when the user specifically requests information that requires knowledge base lookup. Do not automatically search the knowledge base unless instructed.\n\nWhen you do use the knowledge base, provide complete, well-formatted responses with proper context and source information when available."
             logger.info("RAG_TOOLS | Knowledge base tools added to instructions (conditional usage)")
 
         # Add booking instructions only if calendar is available
         if calendar:
-            instructions += (
-                "\n\nBOOKING CAPABILITIES:\n"
-                "You can help users book appointments using the following tools:\n"
-                "- set_call_timezone: Set the caller's time zone (REQUIRED before listing slots or scheduling).\n"
-                "- list_slots_on_day: Show available slots for a specific day. Requires caller timezone to be set first.\n"
-                "- choose_slot: Select a time slot.\n"
-                "- set_name: Set the customer's name.\n"
-                "- set_email: Set the customer's email.\n"
-                "- set_phone: Set the customer's phone number.\n"
-                "- finalize_booking: Complete the booking when ALL info is collected.\n\n"
-                "CONVERSATIONAL GUIDELINES:\n"
-                "1. COLLECT INFO FIRST: Before asking for availability or timezone, you MUST collect the customer's name, email, and phone number. This is your first priority.\n"
-                "2. ASK FOR TIMEZONE AFTER INFO: Once you have the contact details, ask for their time zone before listing availability.\n"
-                "3. ASK FOR DAY THEN TIME: After getting the timezone, ask what day works best. Then offer specific times.\n"
-                "4. OFFER EXACTLY 3 OPTIONS: When presenting availability, offer exactly 3 slots in ONE casual sentence. Always say the day before the time (e.g., 'I’ve got Wednesday at 2, Thursday at 1:30, or Friday at 3 — any of those work?'). Do not list more than 3, do not use numbers, and do not use multiple sentences.\n"
-                "5. MANDATORY TOOL CALL: You MUST call `finalize_booking` or `auto_book_appointment` before confirming ANY appointment. Never say 'You're all set' or similar before the tool confirms success.\n"
-                "6. WAIT FOR TOOL: The tool will provide the final confirmation message. Do not make it up.\n\n"
-                "CRITICAL BOOKING RULES:\n"
-                "- INFO PRIORITY: Never list slots or ask for timezone until you have Name, Email, and Phone.\n"
-                "- TIMEZONE: Ensure timezone is resolved before listing slots. Once established (even if it's UTC), do NOT repetitively confirm it to the user.\n"
-                "- CONCISENESS: Just provide the requested information. Do not repeat 'We have established...' or similar redundant phrases.\n"
-                "- ONLY start booking if the user explicitly requests it.\n"
-                "- Do NOT call finalize_booking until you have: timezone, slot, name, email, and phone."
-            )
             logger.info("BOOKING_TOOLS | Calendar booking tools and guidelines added to instructions")
 
+        # Language, knowledge-base and booking sections form a static suffix per combination
+        instruction_parts.append(_static_suffix(language_setting, bool(knowledge_base_id), bool(calendar)))
+
+        instructions = "".join(instruction_parts)
+
+        # Log final instructions for debugging; hashing is skipped unless DEBUG is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PROMPT_TRACE_FINAL | length=%d | fingerprint=%s", len(instructions), fingerprint_text(instructions))
+
         # Create unified agent with both RAG and booking capabilities
         # Use pre-warmed components if available
         llm_provider = config.get("llm_provider_setting", "OpenAI")
@@ -238,10 +273,11 @@ class AgentFactory:
         # Handle case where structured_data_fields is None
         if analysis_fields is None:
             analysis_fields = []
-        logger.info(f"ANALYSIS_FIELDS_DEBUG | raw_config={config.get('structured_data_fields')} | processed_fields={analysis_fields}")
+        logger.info("ANALYSIS_FIELDS_DEBUG | raw_config=%s | processed_fields=%s", config.get('structured_data_fields'), analysis_fields)
         if analysis_fields:
             agent.set_analysis_fields(analysis_fields)
-            logger.info(f"ANALYSIS_FIELDS_SET | count={len(analysis_fields)} | fields={[f.get('name', 'unnamed') for f in analysis_fields]}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("ANALYSIS_FIELDS_SET | count=%d | fields=%s", len(analysis_fields), [f.get('name', 'unnamed') for f in analysis_fields])
         else:
             logger.warning("NO_ANALYSIS_FIELDS_CONFIGURED | assistant has no structured_data_fields")
         
@@ -265,9 +301,10 @@ class AgentFactory:
         # Debug logging for calendar configuration
         cal_api_key = config.get('cal_api_key')
         cal_event_type_id = config.get('cal_event_type_id')
-        logger.info(f"CALENDAR_DEBUG | cal_api_key present: {bool(cal_api_key)} | cal_event_type_id present: {bool(cal_event_type_id)}")
-        logger.info(f"CALENDAR_DEBUG | cal_api_key value: {cal_api_key[:10] if cal_api_key else 'NOT_FOUND'}... | cal_event_type_id value: {cal_event_type_id or 'NOT_FOUND'}")
-        logger.info(f"CALENDAR_DEBUG | cal_timezone: {config.get('cal_timezone', 'NOT_FOUND')}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("CALENDAR_DEBUG | cal_api_key present: %s | cal_event_type_id present: %s", bool(cal_api_key), bool(cal_event_type_id))
+            logger.info("CALENDAR_DEBUG | cal_api_key value: %s... | cal_event_type_id value: %s", cal_api_key[:10] if cal_api_key else 'NOT_FOUND', cal_event_type_id or 'NOT_FOUND')
+            logger.info("CALENDAR_DEBUG | cal_timezone: %s", config.get('cal_timezone', 'NOT_FOUND'))
         
         if config.get("cal_api_key") and config.get("cal_event_type_id"):
             # Validate and convert event_type_id to proper format
@@ -334,18 +371,12 @@ class AgentFactory:
         ask_user = []
         extract = []
         
-        # Keywords that suggest we should ask the user
-        ASK_KEYWORDS = {
-            "name", "email", "phone", "number", "date", "time", "slot", "appointment", 
-            "booking", "location", "address", "company", "budget", "interest"
-        }
-        
         for field in structured_data:
             name = field.get("name", "").lower()
             desc = field.get("description", "").lower()
             
             # If the name or description contains any ask-keywords, assume we ask the user
-            should_ask = any(kw in name or kw in desc for kw in ASK_KEYWORDS)
+            should_ask = any(kw in name or kw in desc for kw in _ASK_KEYWORDS)
             
             if should_ask:
                 ask_user.append(field.get("name"))
@@ -3,12 +3,15 @@ OpenAI Call Outcome Analysis Service
 Analyzes call transcriptions using OpenAI to determine intelligent call outcomes
 """
 
-import os
 import json
 import logging
 from typing import Optional, Dict, List, Any
 from dataclasses import dataclass
 
+from utils.helpers import parse_json
+from utils.call_analysis import KeywordMatcher
+from config.settings import get_runtime_config
+
 import asyncio
 import time
 from typing import Tuple
@@ -23,6 +26,54 @@ from utils.latency_logger import measure_latency_context
 
 logger = logging.getLogger(__name__)
 
+# Keyword rules for the heuristic fallback outcome, checked in priority order
+_FALLBACK_KEYWORDS = {
+    # Actual booking success indicators
+    "booked": (
+        "appointment has been successfully booked",
+        "appointment scheduled successfully",
+        "successfully booked",
+        "appointment confirmed",
+        "booking confirmed",
+        "appointment is booked",
+        "your appointment is scheduled",
+        "perfect! your appointment has been successfully booked",
+    ),
+    "booking_failed": (
+        "booking failed",
+        "couldn't book",
+        "unable to book",
+        "booking error",
+        "appointment not booked",
+        "booking unsuccessful",
+    ),
+    # Booking attempts without a clear success: interest shown but booking didn't complete
+    "booking_attempt": (
+        "book an appointment",
+        "schedule an appointment",
+        "make an appointment",
+        "want to book",
+        "book the appointment",
+    ),
+    "spam": ("spam", "unwanted", "robocall"),
+    "not_qualified": ("not qualified", "not eligible", "outside service"),
+    "escalated": ("message", "franchise", "escalate"),
+    "closing": ("thank you", "goodbye"),
+}
+
+_FALLBACK_OUTCOME_RULES = (
+    ("booked", "Booked Appointment"),
+    ("booking_failed", "Not Qualified"),
+    ("booking_attempt", "Qualified"),
+    ("spam", "Spam"),
+    ("not_qualified", "Not Qualified"),
+    ("escalated", "Escalated"),
+    ("closing", "Qualified"),
+)
+
+_FALLBACK_MATCHER = KeywordMatcher(_FALLBACK_KEYWORDS)
+
+
 @dataclass
 class CallOutcomeAnalysis:
     """Result of call outcome analysis"""
@@ -39,7 +90,7 @@ class CallOutcomeService:
     
     def __init__(self):
         self.client = None
-        api_key = os.getenv("OPENAI_API_KEY")
+        api_key = get_runtime_config().openai_api_key
         if AsyncOpenAI and api_key:
             try:
                 self.client = AsyncOpenAI(api_key=api_key)
@@ -131,16 +182,15 @@ class CallOutcomeService:
             role = turn.get('role', 'unknown')
             content = turn.get('content', '')
             
-            # Handle different content formats
-            if isinstance(content, list):
-                content = ' '.join(str(item) for item in content if item)
-            elif not isinstance(content, str):
-                content = str(content)
+            # Normalized transcripts carry plain strings; only other shapes need converting
+            if not isinstance(content, str):
+                content = ' '.join(str(item) for item in content if item) if isinstance(content, list) else str(content)
             
-            if content.strip():
+            content = content.strip()
+            if content:
                 # Format as conversation
                 speaker = "Assistant" if role == "assistant" else "Caller"
-                formatted_lines.append(f"{speaker}: {content.strip()}")
+                formatted_lines.append(f"{speaker}: {content}")
         
         return '\n'.join(formatted_lines)
     
@@ -253,7 +303,7 @@ Respond with ONLY the JSON object, no additional text.
                 cleaned_response = cleaned_response[:-3]
             
             # Parse JSON
-            data = json.loads(cleaned_response)
+            data = parse_json(cleaned_response)
             
             return CallOutcomeAnalysis(
                 outcome=data.get('outcome', 'Qualified'),
@@ -278,74 +328,39 @@ Respond with ONLY the JSON object, no additional text.
                 follow_up_required=False
             )
     
-    def get_fallback_outcome(self, transcription: List[Dict[str, Any]], call_duration: int) -> str:
+    def get_fallback_outcome(
+        self,
+        transcription: List[Dict[str, Any]],
+        call_duration: int,
+        transcript_text: Optional[str] = None
+    ) -> str:
         """
         Provide fallback outcome determination when OpenAI is not available
         Uses simple heuristics similar to the current hardcoded approach
+        
+        transcript_text, when the caller already rendered the transcript (e.g. for
+        the LLM prompts), is scanned instead of re-joining the turns.
         """
         if call_duration < 10:
             return "Call Dropped"
         
-        # Extract content for analysis
-        all_content = ""
-        for turn in transcription:
-            content = turn.get('content', '')
-            if isinstance(content, list):
-                content = ' '.join(str(item) for item in content if item)
-            elif not isinstance(content, str):
-                content = str(content)
-            all_content += content.lower() + " "
-        
-        # Simple keyword matching with more sophisticated logic
-        all_content_lower = all_content.lower()
-        
-        # Check for actual booking success indicators
-        booking_success_keywords = [
-            "appointment has been successfully booked",
-            "appointment scheduled successfully", 
-            "successfully booked",
-            "appointment confirmed",
-            "booking confirmed",
-            "appointment is booked",
-            "your appointment is scheduled",
-            "perfect! your appointment has been successfully booked",
-            "appointment scheduled successfully"
-        ]
-        
-        booking_attempt_keywords = [
-            "book an appointment",
-            "schedule an appointment", 
-            "make an appointment",
-            "want to book",
-            "book the appointment"
-        ]
-        
-        booking_failure_keywords = [
-            "booking failed",
-            "couldn't book",
-            "unable to book",
-            "booking error",
-            "appointment not booked",
-            "booking unsuccessful"
-        ]
-        
-        # Check for actual success first
-        if any(keyword in all_content_lower for keyword in booking_success_keywords):
-            return "Booked Appointment"
-        # Check for failure indicators
-        elif any(keyword in all_content_lower for keyword in booking_failure_keywords):
-            return "Not Qualified"
-        # Check for booking attempts but no clear success
-        elif any(keyword in all_content_lower for keyword in booking_attempt_keywords):
-            # If they tried to book but we don't see success, it's likely not booked
-            return "Qualified"  # They showed interest but booking didn't complete
-        elif any(keyword in all_content_lower for keyword in ["spam", "unwanted", "robocall"]):
-            return "Spam"
-        elif any(keyword in all_content_lower for keyword in ["not qualified", "not eligible", "outside service"]):
-            return "Not Qualified"
-        elif any(keyword in all_content_lower for keyword in ["message", "franchise", "escalate"]):
-            return "Escalated"
-        elif any(keyword in all_content_lower for keyword in ["thank you", "goodbye"]):
-            return "Qualified"
+        if transcript_text is not None:
+            all_content_lower = transcript_text.lower()
         else:
-            return "Qualified" if call_duration > 30 else "Call Dropped"
+            # Extract content for analysis (collected then joined once; lowercased in one pass)
+            parts = []
+            for turn in transcription:
+                content = turn.get('content', '')
+                if not isinstance(content, str):
+                    content = ' '.join(str(item) for item in content if item) if isinstance(content, list) else str(content)
+                parts.append(content)
+            
+            # Simple keyword matching with more sophisticated logic
+            all_content_lower = " ".join(parts).lower()
+        
+        # One keyword scan, then take the highest-priority rule that matched
+        matches = _FALLBACK_MATCHER.match(all_content_lower)
+        for rule, outcome in _FALLBACK_OUTCOME_RULES:
+            if matches[rule]:
+                return outcome
+        return "Qualified" if call_duration > 30 else "Call Dropped"
@@ -3,46 +3,152 @@ Configuration resolver for assistant configurations.
 """
 
 import asyncio
-import json
 import logging
+import time
 from typing import Optional, Dict, Any
 from livekit.agents import JobContext
 from integrations.supabase_client import SupabaseClient
-from utils.data_extractors import extract_did_from_room
+from utils.data_extractors import CallMetadata, extract_did_from_room, metadata_dict
 
 logger = logging.getLogger(__name__)
 
 
+# Metadata key paths, checked in priority order
+_ASSISTANT_ID_PATHS = (("assistantId",), ("assistant_id",))
+_OUTBOUND_ASSISTANT_ID_PATHS = (("assistantId",), ("agentId",), ("assistant_id",))
+_CALLED_DID_PATHS = (("called_number",), ("to_number",), ("phoneNumber",))
+
+
+# Resolved assistant rows change rarely; cache them briefly so repeat calls to the
+# same number/assistant skip the Supabase round trip
+_assistant_cache_ttl = 60  # seconds
+_assistant_cache_max_size = 256
+_assistant_by_id_cache: Dict[str, tuple] = {}   # assistant_id -> (assistant, timestamp)
+_assistant_by_did_cache: Dict[str, tuple] = {}  # called DID -> (assistant, timestamp)
+
+
+def _get_cached_assistant(cache: Dict[str, tuple], key: str) -> Optional[Dict[str, Any]]:
+    """Return a copy of a cached assistant row, or None if missing/expired."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    assistant, timestamp = entry
+    if time.time() - timestamp >= _assistant_cache_ttl:
+        cache.pop(key, None)
+        return None
+    # Callers mutate the config (e.g. localized first_message); never hand out the cached dict
+    return dict(assistant)
+
+
+def _cache_assistant(cache: Dict[str, tuple], key: str, assistant: Dict[str, Any]) -> None:
+    """Store a copy of an assistant row, evicting the oldest entry when full."""
+    if len(cache) >= _assistant_cache_max_size and key not in cache:
+        cache.pop(next(iter(cache)))
+    cache[key] = (dict(assistant), time.time())
+
+
+def invalidate_assistant_cache(assistant_id: str) -> None:
+    """Evict an assistant from both caches after it has been written to."""
+    _assistant_by_id_cache.pop(assistant_id, None)
+    for did in [did for did, (assistant, _) in _assistant_by_did_cache.items() if assistant.get("id") == assistant_id]:
+        del _assistant_by_did_cache[did]
+
+
+# In-flight fetches keyed by lookup, so concurrent lookups of the same assistant/DID
+# share one query and its result (including a miss or an error)
+_assistant_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+async def _single_flight(key: tuple, fetch) -> Optional[Dict[str, Any]]:
+    """Run fetch() at most once per key at a time; concurrent callers await the same result."""
+    future = _assistant_inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fetch())
+        _assistant_inflight[key] = future
+        future.add_done_callback(lambda done: _assistant_inflight.pop(key, None) if _assistant_inflight.get(key) is done else None)
+    # Shield so a cancelled caller (e.g. the pre-connect prefetch) doesn't cancel the shared fetch
+    assistant = await asyncio.shield(future)
+    # Each caller gets its own copy; callers mutate the config
+    return dict(assistant) if assistant is not None else None
+
+
+_MISS = object()
+
+
+def _walk(data: Any, path: tuple) -> Optional[Any]:
+    """Follow a key path through nested dicts, returning None on the first miss."""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key, _MISS)
+        if data is _MISS or data is None:
+            return None
+    if isinstance(data, str):
+        return data if data.strip() else None
+    return data or None
+
+
+def _choose_from_sources(sources: tuple, paths: tuple) -> Optional[Any]:
+    """Return the first non-empty value found by trying each path against each source in order."""
+    for source in sources:
+        # Non-dict sources (bare scalars/lists in metadata) can never match any path
+        if not isinstance(source, dict):
+            continue
+        for path in paths:
+            value = _walk(source, path)
+            if value is not None:
+                return value
+    return None
+
+
 class ConfigResolver:
     """Resolves assistant configurations for different call types."""
     
     def __init__(self, supabase_client: SupabaseClient):
         self.supabase = supabase_client
     
-    async def resolve_assistant_config(self, ctx: JobContext, call_type: str) -> Optional[Dict[str, Any]]:
-        """Resolve assistant configuration for the call."""
+    async def prefetch_assistant(self, job_metadata: Optional[str], room_name: str) -> None:
+        """
+        Warm the assistant cache from job data alone, before the room is connected.
+        
+        resolve_assistant_config() then finds the row cached, or awaits the in-flight
+        fetch instead of issuing a second query.
+        """
         try:
+            dial_info = metadata_dict(job_metadata)
+            assistant_id = _choose_from_sources((dial_info,), _OUTBOUND_ASSISTANT_ID_PATHS)
+            if assistant_id:
+                await self._get_assistant_by_id(assistant_id)
+                return
+            called_did = _choose_from_sources((dial_info,), _CALLED_DID_PATHS) or extract_did_from_room(room_name)
+            if called_did:
+                await self._get_assistant_by_phone(called_did)
+        except Exception as e:
+            logger.debug("ASSISTANT_PREFETCH_FAILED | error=%s", str(e))
+
+    async def resolve_assistant_config(
+        self,
+        ctx: JobContext,
+        call_type: str,
+        call_meta: Optional[CallMetadata] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Resolve assistant configuration for the call, reusing already-decoded metadata when given."""
+        try:
+            call_meta = call_meta or CallMetadata.from_job_context(ctx)
+            
             # For web calls, check room metadata first
             if call_type == "web":
                 assistant_id = None
                 
                 # Try to get assistant_id from room metadata
-                if ctx.room.metadata:
-                    try:
-                        room_metadata = json.loads(ctx.room.metadata)
-                        assistant_id = room_metadata.get("assistantId") or room_metadata.get("assistant_id")
-                        logger.info(f"WEB_ASSISTANT_FROM_ROOM | assistant_id={assistant_id}")
-                    except (json.JSONDecodeError, KeyError):
-                        pass
+                if call_meta.room:
+                    assistant_id = _choose_from_sources((call_meta.room,), _ASSISTANT_ID_PATHS)
+                    logger.info("WEB_ASSISTANT_FROM_ROOM | assistant_id=%s", assistant_id)
                 
                 # If not found in room metadata, try job metadata
-                if not assistant_id and ctx.job.metadata:
-                    try:
-                        job_metadata = json.loads(ctx.job.metadata)
-                        assistant_id = job_metadata.get("assistantId") or job_metadata.get("assistant_id")
-                        logger.info(f"WEB_ASSISTANT_FROM_JOB | assistant_id={assistant_id}")
-                    except (json.JSONDecodeError, KeyError):
-                        pass
+                if not assistant_id and call_meta.job:
+                    assistant_id = _choose_from_sources((call_meta.job,), _ASSISTANT_ID_PATHS)
+                    logger.info("WEB_ASSISTANT_FROM_JOB | assistant_id=%s", assistant_id)
                 
                 if assistant_id:
                     return await self._get_assistant_by_id(assistant_id)
@@ -55,105 +161,157 @@ class ConfigResolver:
                 logger.warning("No job metadata available")
                 return None
                 
-            dial_info = json.loads(metadata)
+            dial_info = call_meta.job
             
             if call_type == "outbound":
                 # For outbound calls, get assistant_id from job metadata
-                assistant_id = dial_info.get("assistantId") or dial_info.get("agentId") or dial_info.get("assistant_id")
+                assistant_id = _choose_from_sources((dial_info,), _OUTBOUND_ASSISTANT_ID_PATHS)
                 if assistant_id:
-                    logger.info(f"OUTBOUND_ASSISTANT | assistant_id={assistant_id}")
+                    logger.info("OUTBOUND_ASSISTANT | assistant_id=%s", assistant_id)
                     return await self._get_assistant_by_id(assistant_id)
                 else:
-                    logger.error(f"OUTBOUND_NO_ASSISTANT_ID | metadata={metadata}")
+                    logger.error("OUTBOUND_NO_ASSISTANT_ID | metadata=%s", metadata)
                     return None
 
             elif call_type == "inbound_with_assistant":
                 # For inbound calls with pre-configured assistant, use assistantId from metadata
-                assistant_id = dial_info.get("assistantId") or dial_info.get("assistant_id")
+                assistant_id = _choose_from_sources((dial_info,), _ASSISTANT_ID_PATHS)
                 if assistant_id:
-                    logger.info(f"INBOUND_WITH_ASSISTANT | assistant_id={assistant_id}")
+                    logger.info("INBOUND_WITH_ASSISTANT | assistant_id=%s", assistant_id)
                     return await self._get_assistant_by_id(assistant_id)
                 else:
-                    logger.error("INBOUND_NO_ASSISTANT_ID | metadata={metadata}")
+                    logger.error("INBOUND_NO_ASSISTANT_ID | metadata=%s", metadata)
                     return None
 
             # For regular inbound calls, get the called number (DID) to look up assistant
-            called_did = dial_info.get("called_number") or dial_info.get("to_number") or dial_info.get("phoneNumber")
-            logger.info(f"INBOUND_METADATA_CHECK | metadata={metadata} | called_did={called_did}")
+            called_did = _choose_from_sources((dial_info,), _CALLED_DID_PATHS)
+            logger.info("INBOUND_METADATA_CHECK | metadata_len=%d | called_did=%s", len(metadata), called_did)
+            logger.debug("INBOUND_METADATA_RAW | metadata=%s", metadata)
 
             # Fallback to room name extraction if not found in metadata
             if not called_did:
                 called_did = extract_did_from_room(ctx.room.name)
-                logger.info(f"INBOUND_ROOM_NAME_FALLBACK | room={ctx.room.name} | called_did={called_did}")
+                logger.info("INBOUND_ROOM_NAME_FALLBACK | room=%s | called_did=%s", ctx.room.name, called_did)
 
             if called_did:
-                logger.info(f"INBOUND_LOOKUP | looking up assistant for DID={called_did}")
+                logger.info("INBOUND_LOOKUP | looking up assistant for DID=%s", called_did)
                 return await self._get_assistant_by_phone(called_did)
 
             logger.error("INBOUND_NO_DID | could not determine called number")
             return None
 
         except Exception as e:
-            logger.error(f"ASSISTANT_RESOLUTION_ERROR | error={str(e)}")
+            logger.error("ASSISTANT_RESOLUTION_ERROR | error=%s", str(e))
             return None
 
     async def _get_assistant_by_id(self, assistant_id: str) -> Optional[Dict[str, Any]]:
         """Get assistant configuration by ID."""
+        cached = _get_cached_assistant(_assistant_by_id_cache, assistant_id)
+        if cached is not None:
+            logger.info("ASSISTANT_CACHE_HIT | assistant_id=%s", assistant_id)
+            return cached
+        
+        # Coalesce concurrent misses for the same assistant into one query
+        return await _single_flight(("id", assistant_id), lambda: self._fetch_assistant_by_id(assistant_id))
+
+    async def _fetch_assistant_by_id(self, assistant_id: str) -> Optional[Dict[str, Any]]:
+        """Query the assistant row by ID and cache it."""
         try:
             if not self.supabase.is_available():
                 logger.warning("Supabase client not available")
                 return None
                 
             assistant_result = await asyncio.wait_for(
-                asyncio.to_thread(lambda: self.supabase.client.table("assistant").select("*").eq("id", assistant_id).execute()),
+                asyncio.to_thread(lambda: self.supabase.client.table("assistant").select("*").eq("id", assistant_id).limit(1).execute()),
                 timeout=5
             )
             
             if assistant_result.data and len(assistant_result.data) > 0:
                 assistant_data = assistant_result.data[0]
-                logger.info(f"ASSISTANT_FOUND_BY_ID | assistant_id={assistant_id}")
-                logger.info(f"ASSISTANT_CONFIG_DEBUG | knowledge_base_id={assistant_data.get('knowledge_base_id')} | use_rag={assistant_data.get('use_rag')}")
-                logger.info(f"ASSISTANT_CALENDAR_DEBUG | cal_api_key present: {bool(assistant_data.get('cal_api_key'))} | cal_event_type_id present: {bool(assistant_data.get('cal_event_type_id'))}")
-                cal_api_key = assistant_data.get('cal_api_key') or 'NOT_FOUND'
-                cal_event_type_id = assistant_data.get('cal_event_type_id') or 'NOT_FOUND'
-                logger.info(f"ASSISTANT_CALENDAR_DEBUG | cal_api_key: {cal_api_key[:10] if cal_api_key != 'NOT_FOUND' else 'NOT_FOUND'}... | cal_event_type_id: {cal_event_type_id}")
+                logger.info("ASSISTANT_FOUND_BY_ID | assistant_id=%s", assistant_id)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("ASSISTANT_CONFIG_DEBUG | knowledge_base_id=%s | use_rag=%s", assistant_data.get('knowledge_base_id'), assistant_data.get('use_rag'))
+                    logger.debug("ASSISTANT_CALENDAR_DEBUG | cal_api_key present: %s | cal_event_type_id: %s", bool(assistant_data.get('cal_api_key')), assistant_data.get('cal_event_type_id') or 'NOT_FOUND')
+                _cache_assistant(_assistant_by_id_cache, assistant_id, assistant_data)
                 return assistant_data
             
-            logger.warning(f"No assistant found for ID: {assistant_id}")
+            logger.warning("No assistant found for ID: %s", assistant_id)
             return None
         except Exception as e:
-            logger.error(f"DATABASE_ERROR | assistant_id={assistant_id} | error={str(e)}")
+            logger.error("DATABASE_ERROR | assistant_id=%s | error=%s", assistant_id, str(e))
             return None
 
     async def _get_assistant_by_phone(self, phone_number: str) -> Optional[Dict[str, Any]]:
         """Get assistant configuration by phone number."""
+        cached = _get_cached_assistant(_assistant_by_did_cache, phone_number)
+        if cached is not None:
+            logger.info("ASSISTANT_CACHE_HIT | phone=%s", phone_number)
+            return cached
+        
+        # Coalesce concurrent misses for the same number into one query
+        return await _single_flight(("did", phone_number), lambda: self._fetch_assistant_by_phone(phone_number))
+
+    async def _fetch_assistant_by_phone(self, phone_number: str) -> Optional[Dict[str, Any]]:
+        """Query the assistant mapped to a phone number and cache it."""
         try:
             if not self.supabase.is_available():
                 logger.warning("Supabase client not available")
                 return None
                 
-            # First, find the assistant_id for this phone number
-            phone_result = await asyncio.wait_for(
-                asyncio.to_thread(lambda: self.supabase.client.table("phone_number").select("inbound_assistant_id").eq("number", phone_number).execute()),
-                timeout=5
-            )
+            # Fetch the phone mapping and the assistant it points to in one round trip,
+            # embedding the assistant row through the fk_phone_number_assistant foreign key
+            try:
+                phone_result = await asyncio.wait_for(
+                    asyncio.to_thread(lambda: self.supabase.client.table("phone_number").select("inbound_assistant_id, assistant!fk_phone_number_assistant(*)").eq("number", phone_number).limit(1).execute()),
+                    timeout=5
+                )
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                # Only a missing/ambiguous relationship (PostgREST PGRST200/PGRST201) is worth a
+                # second query; network or auth failures would just fail again on the plain select
+                if not str(getattr(e, "code", "") or "").startswith("PGRST20"):
+                    raise
+                # Embedding not available (e.g. schema cache not refreshed); use the two-step lookup
+                logger.warning("ASSISTANT_EMBED_FAILED | phone=%s | error=%s", phone_number, str(e))
+                phone_result = await asyncio.wait_for(
+                    asyncio.to_thread(lambda: self.supabase.client.table("phone_number").select("inbound_assistant_id").eq("number", phone_number).limit(1).execute()),
+                    timeout=5
+                )
             
             if not phone_result.data or len(phone_result.data) == 0:
-                logger.warning(f"No assistant found for phone number: {phone_number}")
+                logger.warning("No assistant found for phone number: %s", phone_number)
                 return None
             
-            assistant_id = phone_result.data[0]["inbound_assistant_id"]
+            phone_row = phone_result.data[0]
+            embedded_assistant = phone_row.get("assistant")
+            if embedded_assistant:
+                _cache_assistant(_assistant_by_did_cache, phone_number, embedded_assistant)
+                return embedded_assistant
+            
+            assistant_id = phone_row["inbound_assistant_id"]
+            if not assistant_id:
+                logger.warning("No assistant found for phone number: %s", phone_number)
+                return None
+            
+            # Embedded row missing; reuse a recent by-ID lookup before fetching it separately
+            cached = _get_cached_assistant(_assistant_by_id_cache, assistant_id)
+            if cached is not None:
+                _cache_assistant(_assistant_by_did_cache, phone_number, cached)
+                return cached
             
-            # Now fetch the assistant configuration
             assistant_result = await asyncio.wait_for(
-                asyncio.to_thread(lambda: self.supabase.client.table("assistant").select("*").eq("id", assistant_id).execute()),
+                asyncio.to_thread(lambda: self.supabase.client.table("assistant").select("*").eq("id", assistant_id).limit(1).execute()),
                 timeout=5
             )
             
             if assistant_result.data and len(assistant_result.data) > 0:
-                return assistant_result.data[0]
+                assistant_data = assistant_result.data[0]
+                _cache_assistant(_assistant_by_did_cache, phone_number, assistant_data)
+                _cache_assistant(_assistant_by_id_cache, assistant_id, assistant_data)
+                return assistant_data
 
             return None
         except Exception as e:
-            logger.error(f"DATABASE_ERROR | phone={phone_number} | error={str(e)}")
+            logger.error("DATABASE_ERROR | phone=%s | error=%s", phone_number, str(e))
             return None
@@ -6,33 +6,37 @@ Integrates with Pinecone knowledge bases to provide context for voice agents
 import os
 import logging
 import asyncio
-import hashlib
+import threading
 import time
-from typing import Optional, Dict, List, Any
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass
 from functools import lru_cache
 
-try:
-    from supabase import create_client, Client
-except ImportError:
-    create_client = None
-    Client = object
+from config.database import get_database_client
+from utils.latency_logger import measure_latency_context
 
-try:
-    from pinecone import Pinecone
-except ImportError:
-    Pinecone = None
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+@lru_cache(maxsize=None)
+def _load_pinecone():
+    """Import pinecone on first use so calls without a knowledge base never load it."""
+    try:
+        from pinecone import Pinecone
+    except ImportError:
+        return None
+    return Pinecone
 
-from utils.latency_logger import measure_latency_context
 
 # Cache configuration
 _cache_ttl = 300  # 5 minutes cache TTL
 _cache_max_size = 100  # Maximum cache entries
-_rag_cache: Dict[str, tuple] = {}  # Global cache for RAG queries
+_rag_cache: Dict[Tuple[str, str], tuple] = {}  # Global cache for RAG queries
 
-def _get_cache_key(knowledge_base_id: str, query: str) -> str:
-    """Generate cache key for RAG query."""
-    return hashlib.md5(f"{knowledge_base_id}:{query.lower().strip()}".encode()).hexdigest()
+def _get_cache_key(knowledge_base_id: str, query: str) -> Tuple[str, str]:
+    """Generate cache key for RAG query (a plain tuple; dict hashing is all we need)."""
+    return (knowledge_base_id, query.lower().strip())
 
 def _is_cache_valid(timestamp: float) -> bool:
     """Check if cache entry is still valid."""
@@ -69,7 +73,7 @@ class RAGService:
     """Service for retrieving context from knowledge bases using Pinecone"""
 
     def __init__(self):
-        self.supabase: Optional[Client] = None
+        self.supabase: Optional["Client"] = None
         self.pinecone = None
         # in-process caches
         self._kb_cache: Dict[str, Dict[str, Any]] = {}               # kb_id -> kb_info
@@ -78,20 +82,15 @@ class RAGService:
 
     def _initialize_clients(self):
         """Initialize Supabase and Pinecone clients"""
-        if create_client:
-            supabase_url = os.getenv("SUPABASE_URL", "").strip()
-            supabase_key = (
-                os.getenv("SUPABASE_SERVICE_ROLE", "").strip()
-                or os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
-            )
-            if supabase_url and supabase_key:
-                self.supabase = create_client(supabase_url, supabase_key)
-                logging.info("RAG_SERVICE | Supabase client initialized")
-            else:
-                logging.warning("RAG_SERVICE | Supabase credentials not configured")
+        # Reuse the worker-wide Supabase client so its HTTP connection pool is shared
+        db_client = get_database_client()
+        if db_client and db_client.is_available():
+            self.supabase = db_client.client
+            logging.info("RAG_SERVICE | Supabase client initialized")
         else:
-            logging.warning("RAG_SERVICE | Supabase client not available")
+            logging.warning("RAG_SERVICE | Supabase client not available or credentials not configured")
 
+        Pinecone = _load_pinecone()
         if Pinecone:
             pinecone_api_key = os.getenv("PINECONE_API_KEY", "").strip()
             if pinecone_api_key:
@@ -212,9 +211,8 @@ class RAGService:
                 
                 for attempt in range(max_retries):
                     try:
-                        resp = await asyncio.get_event_loop().run_in_executor(
-                            None,
-                            lambda: assistant.context(query=query, top_k=top_k, snippet_size=snippet_size),
+                        resp = await asyncio.to_thread(
+                            assistant.context, query=query, top_k=top_k, snippet_size=snippet_size
                         )
                         break  # Success, exit retry loop
                     except Exception as e:
@@ -333,14 +331,10 @@ class RAGService:
 
         # unique, non-empty queries
         qset = list(dict.fromkeys([q for q in (queries or []) if q and q.strip()]))
-        loop = asyncio.get_event_loop()
-
-        def fetch(q: str):
-            return assistant.context(query=q, top_k=8, snippet_size=1536)
 
         try:
             responses = await asyncio.gather(
-                *[loop.run_in_executor(None, (lambda q=q: fetch(q))) for q in qset],
+                *[asyncio.to_thread(assistant.context, query=q, top_k=8, snippet_size=1536) for q in qset],
                 return_exceptions=True,
             )
         except Exception as e:
@@ -403,9 +397,13 @@ class RAGService:
 
 # ---- Singleton factory (prevents double initialization seen in logs) ----
 _service_singleton: Optional[RAGService] = None
+_service_lock = threading.Lock()
 
 def get_rag_service() -> RAGService:
     global _service_singleton
     if _service_singleton is None:
-        _service_singleton = RAGService()
+        # prewarm may be building it on a worker thread while the first call asks for it
+        with _service_lock:
+            if _service_singleton is None:
+                _service_singleton = RAGService()
     return _service_singleton
\ No newline at end of file
@@ -10,6 +10,8 @@ from typing import Optional, Dict, Any
 import aiohttp
 from datetime import datetime
 
+from utils.helpers import parse_json
+
 class TwilioRecordingService:
     def __init__(self):
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
@@ -48,7 +50,7 @@ class TwilioRecordingService:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, auth=auth) as response:
                     if response.status == 200:
-                        return await response.json()
+                        return await response.json(loads=parse_json)
                     else:
                         error_text = await response.text()
                         logging.warning("CALL_STATUS_FAILED | call_sid=%s | status=%d | error=%s", 
@@ -117,7 +119,7 @@ class TwilioRecordingService:
             async with aiohttp.ClientSession() as session:
                 async with session.post(url, data=default_options, auth=auth) as response:
                     if response.status == 201:
-                        recording_data = await response.json()
+                        recording_data = await response.json(loads=parse_json)
                         logging.info(
                             "RECORDING_STARTED | call_sid=%s | recording_sid=%s | status=%s",
                             call_sid,
@@ -138,7 +140,7 @@ class TwilioRecordingService:
                             
                             async with session.post(url, data=default_options, auth=auth) as retry_response:
                                 if retry_response.status == 201:
-                                    recording_data = await retry_response.json()
+                                    recording_data = await retry_response.json(loads=parse_json)
                                     logging.info(
                                         "RECORDING_STARTED_RETRY | call_sid=%s | recording_sid=%s | status=%s | attempt=%d",
                                         call_sid,
@@ -233,7 +235,7 @@ class TwilioRecordingService:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, auth=auth) as response:
                     if response.status == 200:
-                        return await response.json()
+                        return await response.json(loads=parse_json)
                     else:
                         logging.error(
                             "RECORDING_FETCH_FAILED | recording_sid=%s | status=%d",
@@ -3,7 +3,6 @@ from __future__ import annotations
 import asyncio
 import datetime
 import logging
-import os
 import re
 from dataclasses import dataclass
 from typing import Optional
@@ -18,9 +17,38 @@ from services.call_outcome_service import CallOutcomeService
 from services.rag_service import get_rag_service
 from integrations.calendar_api import Calendar, SlotUnavailableError
 from integrations.supabase_client import SupabaseClient
+from config.settings import get_runtime_config
 from utils.latency_logger import measure_latency_context
 from utils.timezone_utils import normalize_caller_timezone
 
+# English day/month names for slot formatting; avoids per-slot strftime locale lookups
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTHS = ("", "January", "February", "March", "April", "May", "June",
+           "July", "August", "September", "October", "November", "December")
+
+
+# Month lookups and patterns used when parsing spoken dates/times
+_MONTH_NUMBERS = {name.lower(): i for i, name in enumerate(_MONTHS) if name}
+_MONTH_ABBREVS = {name[:3]: i for name, i in _MONTH_NUMBERS.items()}
+_NUMERIC_DATE_RE = re.compile(r"^\s*(\d{1,2})[\/\-\s](\d{1,2})\s*$")
+_ORDINAL_SUFFIX_RE = re.compile(r'(\d+)(st|nd|rd|th)')
+_WHITESPACE_RE = re.compile(r"\s+")
+_CLOCK_TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?(am|pm)")
+_CODE_FENCE_RE = re.compile(r"```[\s\S]*?```")
+_ROOM_PHONE_RE = re.compile(r'\+?\d{10,}')
+
+
+def _format_clock(dt: datetime.datetime, pad_hour: bool = True) -> str:
+    """Format as strftime('%I:%M %p'); pad_hour=False drops the leading hour zero."""
+    hour12 = (dt.hour - 1) % 12 + 1
+    ampm = "AM" if dt.hour < 12 else "PM"
+    return f"{hour12:02d}:{dt.minute:02d} {ampm}" if pad_hour else f"{hour12}:{dt.minute:02d} {ampm}"
+
+
+def _format_slot_long(dt: datetime.datetime) -> str:
+    """Format as strftime('%A, %B %d at %I:%M %p')."""
+    return f"{_WEEKDAYS[dt.weekday()]}, {_MONTHS[dt.month]} {dt.day:02d} at {_format_clock(dt)}"
+
 
 @dataclass
 class BookingData:
@@ -69,7 +97,7 @@ class UnifiedAgent(Agent):
         except Exception:
             pass
 
-        m = re.match(r"^\s*(\d{1,2})[\/\-\s](\d{1,2})\s*$", q)
+        m = _NUMERIC_DATE_RE.match(q)
         if m:
             a, b = int(m.group(1)), int(m.group(2))
             for (d, mo) in [(a, b), (b, a)]:
@@ -81,14 +109,13 @@ class UnifiedAgent(Agent):
                 except Exception:
                     pass
 
-        months = {m.lower(): i for i, m in enumerate(
-            ["January","February","March","April","May","June","July","August","September","October","November","December"], 1)}
-        short = {k[:3]: v for k, v in months.items()}
+        months = _MONTH_NUMBERS
+        short = _MONTH_ABBREVS
 
         def clean_day(day_str: str) -> str:
-            return re.sub(r'(\d+)(st|nd|rd|th)', r'\1', day_str)
+            return _ORDINAL_SUFFIX_RE.sub(r'\1', day_str)
 
-        toks = re.split(r"\s+", q)
+        toks = _WHITESPACE_RE.split(q)
         if len(toks) == 2:
             a, b = toks
             # "<day> <month>"
@@ -118,14 +145,12 @@ class UnifiedAgent(Agent):
 
     def _find_slot_by_time_string(self, time_str: str) -> Optional[object]:
         """Find a slot by parsing a time string like '8am', '3:30pm', etc."""
-        import re
-        
         # Parse time string like "8am", "8:30am", "3pm", "10:00am", "12:00pm"
         # Also handle variations like "8 am", "3 PM", "8:30 AM"
         time_str = time_str.strip().lower().replace(" ", "")
         
         # Match patterns: 8am, 8:30am, 3:00pm, 10:15am
-        match = re.match(r"(\d{1,2})(?::(\d{2}))?(am|pm)", time_str)
+        match = _CLOCK_TIME_RE.match(time_str)
         if not match:
             return None
         
@@ -217,6 +242,8 @@ class UnifiedAgent(Agent):
         self._booking_data = BookingData()
         # Persistent booking data - preserved across resets for post-call processing
         self._finalized_booking_data: Optional[BookingData] = None
+        # bookings-table writes running off the conversational path; awaited before post-call save
+        self._booking_save_tasks: set[asyncio.Task] = set()
         self._slots_map: dict[str, object] = {}
         self._display_map: dict[str, str] = {} # display_text (lower) -> ISO key
         self._presented_slot_keys: list[str] = [] # Track what user actually heard (Fix)
@@ -277,8 +304,32 @@ class UnifiedAgent(Agent):
     def set_room_name(self, room_name: str):
         """Set room name for transfer operations."""
         self._room_name = room_name
-        logging.debug(f"ROOM_NAME_SET | room={room_name}")
+        logging.debug("ROOM_NAME_SET | room=%s", room_name)
     
+    async def _save_booking_record(self, booking_record: dict, targets: tuple[BookingData, ...]) -> None:
+        """Insert a confirmed booking and record its ID on the booking data it was made from."""
+        try:
+            insert_res = await asyncio.to_thread(
+                lambda: self.supabase.client.table("bookings").insert(booking_record).execute()
+            )
+            booking_id = insert_res.data[0].get("id") if insert_res.data else None
+            # The targets were captured at spawn time, so a booking started meanwhile is untouched
+            for booking_data in targets:
+                booking_data.appointment_id = booking_id
+            logging.info("BOOKING_DB_SAVE_SUCCESS | saved to bookings table | ID=%s", booking_id)
+        except Exception as db_err:
+            logging.error("BOOKING_DB_SAVE_FAILED | error=%s", str(db_err))
+
+    async def wait_for_pending_writes(self, timeout: float = 10.0) -> None:
+        """Wait for background bookings writes so post-call processing sees their appointment IDs."""
+        pending = [task for task in self._booking_save_tasks if not task.done()]
+        if not pending:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.gather(*pending)), timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.warning("BOOKING_DB_SAVE_PENDING | timeout=%ss", timeout)
+
     def _reset_state(self):
         """Reset all state for a new conversation/run."""
         self._booking_data = BookingData()
@@ -304,18 +355,19 @@ class UnifiedAgent(Agent):
             # Update latency variables based on metric type
             if event.metrics.type == "eou_metrics":
                 self.end_of_utterance_delay = event.metrics.end_of_utterance_delay
-                logging.info(f"LATENCY_EOU | end_of_utterance_delay={self.end_of_utterance_delay}s")
+                logging.debug("LATENCY_EOU | end_of_utterance_delay=%ss", self.end_of_utterance_delay)
 
             elif event.metrics.type == "llm_metrics":
                 self.llm_latency = event.metrics.ttft
-                logging.info(f"LATENCY_LLM | ttft={self.llm_latency}s")
+                logging.debug("LATENCY_LLM | ttft=%ss", self.llm_latency)
 
             elif event.metrics.type == "tts_metrics":
                 self.tts_latency = event.metrics.ttfb
                 # Calculate and log total latency when TTS completes
                 total_latency = self.end_of_utterance_delay + self.llm_latency + self.tts_latency
-                logging.info(f"LATENCY_TTS | ttfb={self.tts_latency}s")
-                logging.info(f"LATENCY_TOTAL | transcription_delay={self.end_of_utterance_delay}s | llm={self.llm_latency}s | tts={self.tts_latency}s | total={total_latency}s")
+                logging.debug("LATENCY_TTS | ttfb=%ss", self.tts_latency)
+                logging.info("LATENCY_TOTAL | transcription_delay=%ss | llm=%ss | tts=%ss | total=%ss",
+                            self.end_of_utterance_delay, self.llm_latency, self.tts_latency, total_latency)
 
         except Exception as e:
             logging.error(f"METRICS_COLLECTION_ERROR | error={str(e)}")
@@ -475,7 +527,7 @@ class UnifiedAgent(Agent):
         """Strip markdown fences and HTML tags, then cap length."""
         if not text:
             return ""
-        t = re.sub(r"```[\s\S]*?```", "", text)
+        t = _CODE_FENCE_RE.sub("", text)
         t = self._html_tag_regex.sub("", t)  # strip html tags using pre-compiled regex
         t = t.strip()
         return (t[:cap] + ("…" if len(t) > cap else ""))
@@ -681,43 +733,36 @@ class UnifiedAgent(Agent):
                 if not filtered_slots and timeframe:
                     return f"I don't see any available slots in the {timeframe} for {day}. Would you like to hear all available slots instead?"
 
-                # Build ISO map for all slots
+                # Build ISO map for all slots in one pass
                 self._slots_map.clear()
-                for slot in all_slots:
-                    self._slots_map[slot.start_time.isoformat()] = slot
+                self._slots_map.update({slot.start_time.isoformat(): slot for slot in all_slots})
                 
                 # Determine which slice of slots to show
                 if show_more:
                     # Skip first 3, show a larger set (default 10) regardless of max_options if it's too small
                     limit = max(max_options, 10)
                     display_slots = filtered_slots[3:3+limit]
-                    reason_str = f"following {len(display_slots)} different options as requested"
                 else:
                     # Initial view: exactly 3
                     display_slots = filtered_slots[:3]
-                    reason_str = "exactly 3 as per guidelines"
+
+                # Format each presented slot once; reused for the display map and the response lines.
+                # Drop the leading zero from the hour for natural matching
+                formatted = [
+                    (slot, f"{_WEEKDAYS[local_time.weekday()]} at {_format_clock(local_time, pad_hour=False)}")
+                    for slot, local_time in ((s, s.start_time.astimezone(search_tz)) for s in display_slots)
+                ]
 
                 # Build display map for the slots being presented
                 self._display_map.clear()
-                for slot in display_slots:
-                    local_time = slot.start_time.astimezone(search_tz)
-                    time_part = local_time.strftime('%I:%M %p').lstrip('0')
-                    display_text = f"{local_time.strftime('%A')} at {time_part}".lower()
-                    self._display_map[display_text] = slot.start_time.isoformat()
+                self._display_map.update({text.lower(): slot.start_time.isoformat() for slot, text in formatted})
                 
                 # Track exactly what we are presenting (Fix)
                 self._presented_slot_keys = [s.start_time.isoformat() for s in display_slots]
                 
-                lines = []
-                for i, slot in enumerate(display_slots, 1):
-                    local_time = slot.start_time.astimezone(search_tz)
-                    # Use lstrip('0') to remove leading zero from the hour for natural matching
-                    time_part = local_time.strftime('%I:%M %p').lstrip('0')
-                    formatted_time = f"{local_time.strftime('%A')} at {time_part}"
-                    lines.append(f"- {formatted_time}")
+                lines = [f"- {text}" for _, text in formatted]
                 
                 timeframe_str = f" in the {timeframe}" if timeframe else ""
-                response_parts = [f"Available slots for {day}{timeframe_str} (Offered {reason_str}):\n" + "\n".join(lines)]
                 
                 if not display_slots:
                     if show_more:
@@ -741,18 +786,22 @@ class UnifiedAgent(Agent):
 
     def _resolve_slot(self, option_id: str) -> Optional[object]:
         """Helper to resolve a slot from display text, ISO string, or numeric index."""
-        option = option_id.lower().strip()
+        raw = option_id.strip()
+        option = raw.lower()
         
         # 1. Try exact display match
-        if option in self._display_map:
-            iso_key = self._display_map[option]
+        iso_key = self._display_map.get(option)
+        if iso_key is not None:
             return self._slots_map.get(iso_key)
         
         # 2. Try exact ISO match
-        if option_id in self._slots_map:
-            return self._slots_map[option_id]
+        slot = self._slots_map.get(raw)
+        if slot is not None:
+            return slot
         
-        # 3. Try numeric index
+        # 3. Try numeric index ("2", "option 2", "option_2")
+        if option.startswith("option"):
+            option = option.removeprefix("option").lstrip(" _#")
         if option.isdigit():
             idx = int(option) - 1
             if 0 <= idx < len(self._presented_slot_keys):
@@ -795,14 +844,16 @@ class UnifiedAgent(Agent):
         slot = self._resolve_slot(option_id)
         
         if not slot:
-            logging.info("SLOT_CHOOSE_FAILED | option_id=%s | available_iso=%s | available_display=%s", option_id, list(self._slots_map.keys()), list(self._display_map.keys()))
+            logging.info("SLOT_CHOOSE_FAILED | option_id=%s | available=%d", option_id, len(self._slots_map))
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("SLOT_CHOOSE_FAILED_KEYS | available_iso=%s | available_display=%s", list(self._slots_map), list(self._display_map))
             return f"Option {option_id} doesn't seem to be available. Would you like to hear the slots again?"
         
         self._booking_data.selected_slot = slot
         logging.info("SLOT_CHOOSE_SUCCESS | option_id=%s | slot_key=%s", option_id, slot.start_time.isoformat() if hasattr(slot, 'start_time') else 'unknown')
 
         local_time = self._booking_data.selected_slot.start_time.astimezone(self._tz())
-        formatted_time = local_time.strftime('%A, %B %d at %I:%M %p')
+        formatted_time = _format_slot_long(local_time)
         
         # Guide the LLM to be compact
         res = [f"Okay, I've selected {formatted_time} for you."]
@@ -1162,7 +1213,7 @@ class UnifiedAgent(Agent):
             if not participant_identity:
                 # Room names for SIP calls often contain phone numbers
                 # Extract potential phone number from room name and add sip_ prefix
-                phone_match = re.search(r'\+?\d{10,}', room_name)
+                phone_match = _ROOM_PHONE_RE.search(room_name)
                 if phone_match:
                     phone_number = phone_match.group()
                     # SIP participant identity format is typically "sip_+phone"
@@ -1170,7 +1221,7 @@ class UnifiedAgent(Agent):
                     logging.info(f"TRANSFER_PARTICIPANT_FROM_ROOM_NAME | extracted_phone={phone_number} | identity={participant_identity}")
                     
         except Exception as e:
-            logging.warning(f"TRANSFER_PARTICIPANT_DETECTION_ERROR | error={str(e)}", exc_info=True)
+            logging.warning(f"TRANSFER_PARTICIPANT_DETECTION_ERROR | error={e!r}")
         
         if not participant_identity:
             logging.error("TRANSFER_NO_PARTICIPANT | could not find participant identity")
@@ -1189,10 +1240,11 @@ class UnifiedAgent(Agent):
         
         # Perform the actual LiveKit transfer
         try:
-            # Get LiveKit credentials from environment
-            livekit_url = os.getenv("LIVEKIT_URL")
-            livekit_api_key = os.getenv("LIVEKIT_API_KEY")
-            livekit_api_secret = os.getenv("LIVEKIT_API_SECRET")
+            # Get LiveKit credentials from the worker's environment snapshot
+            runtime_config = get_runtime_config()
+            livekit_url = runtime_config.livekit_url
+            livekit_api_key = runtime_config.livekit_api_key
+            livekit_api_secret = runtime_config.livekit_api_secret
             
             if not all([livekit_url, livekit_api_key, livekit_api_secret]):
                 logging.error("TRANSFER_MISSING_CREDENTIALS | LiveKit credentials not configured")
@@ -1317,9 +1369,10 @@ class UnifiedAgent(Agent):
                 # Format confirmation message with details
                 tz = self._tz()
                 local_time = self._booking_data.selected_slot.start_time.astimezone(tz)
-                formatted_time = local_time.strftime('%A, %B %d at %I:%M %p')
+                formatted_time = _format_slot_long(local_time)
                 
                 # Save to bookings table if supabase client is available
+                booking_record = None
                 if self.supabase and self.user_id:
                     try:
                         booking_record = {
@@ -1336,14 +1389,6 @@ class UnifiedAgent(Agent):
                             "cal_com_booking_id": str(resp.get("id")) if isinstance(resp, dict) and resp.get("id") else None,
                             "event_type_id": str(self.calendar.event_type_id) if self.calendar else None
                         }
-                        
-                        insert_res = await asyncio.to_thread(
-                            lambda: self.supabase.client.table("bookings").insert(booking_record).execute()
-                        )
-                        booking_id = insert_res.data[0].get("id") if insert_res.data else None
-                        self._booking_data.appointment_id = booking_id
-                        logging.info("BOOKING_DB_SAVE_SUCCESS | saved to bookings table | ID=%s", booking_id)
-                        
                     except Exception as db_err:
                         logging.error("BOOKING_DB_SAVE_FAILED | error=%s", str(db_err))
 
@@ -1368,14 +1413,23 @@ class UnifiedAgent(Agent):
                     calendar_response=self._booking_data.calendar_response,
                     booking_uid=self._booking_data.booking_uid
                 )
+
+                if booking_record is not None:
+                    # The caller is waiting on the confirmation, not the bookings row; write it in
+                    # the background and let the post-call save wait for it
+                    task = asyncio.create_task(self._save_booking_record(
+                        booking_record, (self._booking_data, self._finalized_booking_data)
+                    ))
+                    self._booking_save_tasks.add(task)
+                    task.add_done_callback(self._booking_save_tasks.discard)
                 
                 logging.info("BOOKING_COMPLETED_SUCCESSFULLY | slot=%s", formatted_time)
                 
                 # One short, confident confirmation sentence as per guidelines
                 responses = {
-                    "hi": f"आपका अपॉइंटमेंट {local_time.strftime('%A')} को {local_time.strftime('%I:%M %p')} के लिए बुक हो गया है। आपको जल्द ही एक पुष्टिकरण मैसेज मिलेगा।",
-                    "es": f"Todo listo para el {local_time.strftime('%A')} a las {local_time.strftime('%I:%M %p')}. Recibirá un mensaje de confirmación en breve.",
-                    "en": f"You’re all set for {local_time.strftime('%A')} at {local_time.strftime('%I:%M %p')}. You’ll get a confirmation text shortly."
+                    "hi": f"आपका अपॉइंटमेंट {_WEEKDAYS[local_time.weekday()]} को {_format_clock(local_time)} के लिए बुक हो गया है। आपको जल्द ही एक पुष्टिकरण मैसेज मिलेगा।",
+                    "es": f"Todo listo para el {_WEEKDAYS[local_time.weekday()]} a las {_format_clock(local_time)}. Recibirá un mensaje de confirmación en breve.",
+                    "en": f"You’re all set for {_WEEKDAYS[local_time.weekday()]} at {_format_clock(local_time)}. You’ll get a confirmation text shortly."
                 }
                 return responses.get(self.language_setting, responses["en"])
             
@@ -1436,7 +1490,7 @@ class UnifiedAgent(Agent):
         if self._booking_data.booked:
             tz = self._tz()
             local_time = self._booking_data.selected_slot.start_time.astimezone(tz)
-            formatted_time = local_time.strftime('%A, %B %d at %I:%M %p')
+            formatted_time = _format_slot_long(local_time)
             responses = {
                 "hi": f"आपकी बुकिंग {formatted_time} के लिए पक्की हो गई है। आपको जल्द ही एक पुष्टिकरण ईमेल प्राप्त होना चाहिए।",
                 "es": f"Su reserva está confirmada para el {formatted_time}. Debería recibir un correo electrónico de confirmación en breve.",
@@ -1463,7 +1517,7 @@ class UnifiedAgent(Agent):
                 self._booking_data.booked = True
                 tz = self._tz()
                 local_time = self._booking_data.selected_slot.start_time.astimezone(tz)
-                formatted_time = local_time.strftime('%A, %B %d at %I:%M %p')
+                formatted_time = _format_slot_long(local_time)
                 responses = {
                     "hi": f"अच्छी खबर! आपकी बुकिंग {formatted_time} के लिए पक्की हो गई है। स्लॉट अब उपलब्ध नहीं है, जिसका मतलब है कि यह सफलतापूर्वक बुक हो गया था।",
                     "es": f"¡Buenas noticias! Su reserva está confirmada para el {formatted_time}. El horario ya no está disponible, lo que significa que se reservó con éxito.",
@@ -2,14 +2,19 @@
 Utility functions for the LiveKit voice agent system.
 """
 
-from .helpers import sha256_text, preview, extract_called_did
+from .helpers import sha256_text, fingerprint_text, preview, extract_called_did, parse_json, dump_json, parse_json_or_b64, parse_metadata
 from .call_analysis import determine_call_status, CallAnalyzer
 from .logging_config import setup_logging, get_logger
 
 __all__ = [
     "sha256_text",
+    "fingerprint_text",
     "preview", 
     "extract_called_did",
+    "parse_json",
+    "dump_json",
+    "parse_json_or_b64",
+    "parse_metadata",
     "determine_call_status",
     "CallAnalyzer",
     "setup_logging",
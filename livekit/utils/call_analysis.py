@@ -3,9 +3,17 @@ Call analysis and status determination utilities.
 """
 
 import logging
+import re
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
 
 @dataclass
 class CallMetrics:
@@ -20,24 +28,132 @@ class CallMetrics:
     success_score: float
 
 
+# Keyword sets are built once per process rather than per analyzer instance
+SPAM_KEYWORDS = frozenset({
+    "robocall", "telemarketing", "scam", "fraud", "suspicious",
+    "unwanted", "spam", "junk", "harassment", "threat"
+})
+
+SUCCESS_KEYWORDS = frozenset({
+    "appointment", "book", "schedule", "confirm", "details",
+    "name", "email", "phone", "thank you", "goodbye"
+})
+
+BOOKING_KEYWORDS = frozenset({
+    "appointment", "book", "schedule", "meeting", "consultation",
+    "reservation", "slot", "time", "date", "calendar"
+})
+
+CONTACT_INDICATORS = frozenset({
+    "my name is", "i'm", "call me", "email", "phone", "number",
+    "contact", "reach me", "get in touch"
+})
+
+
+KEYWORD_CATEGORIES = {
+    "spam": SPAM_KEYWORDS,
+    "success": SUCCESS_KEYWORDS,
+    "booking": BOOKING_KEYWORDS,
+    "contact": CONTACT_INDICATORS,
+}
+
+
+class KeywordMatcher:
+    """
+    Finds which keywords of each category occur in a piece of text.
+    
+    Uses a single Aho-Corasick pass when pyahocorasick is installed, otherwise
+    a single precompiled regex scan.
+    """
+    
+    def __init__(self, categories: Dict[str, Any]):
+        self.categories = {category: frozenset(keywords) for category, keywords in categories.items()}
+        self._automaton = self._build_automaton() if AHOCORASICK_AVAILABLE else None
+        if self._automaton is None:
+            self._pattern, self._implied = self._build_pattern()
+    
+    def _build_pattern(self):
+        """
+        Build one alternation over every keyword, plus the keywords each one contains.
+        
+        The zero-width lookahead tries the alternation at every position, so overlapping
+        keywords are still seen; a keyword starting where a longer one matched (or inside
+        it) is recovered through the containment map.
+        """
+        keywords = sorted(set().union(*self.categories.values()), key=len, reverse=True)
+        pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+        implied = {
+            keyword: tuple(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+        return pattern, implied
+    
+    def _build_automaton(self):
+        """Build one automaton over every keyword set, tagged by category."""
+        # A keyword may belong to several categories (e.g. "appointment", "phone")
+        categories_by_keyword: Dict[str, List[str]] = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                categories_by_keyword.setdefault(keyword, []).append(category)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, categories in categories_by_keyword.items():
+            automaton.add_word(keyword, (keyword, tuple(categories)))
+        automaton.make_automaton()
+        return automaton
+    
+    def match(self, content: str) -> Dict[str, set]:
+        """
+        Scan lowercase content once.
+        
+        Args:
+            content: Lowercase text to scan
+            
+        Returns:
+            Mapping of category name to the set of keywords found
+        """
+        matches: Dict[str, set] = {category: set() for category in self.categories}
+        if not content:
+            return matches
+        
+        if self._automaton is not None:
+            for _, (keyword, categories) in self._automaton.iter(content):
+                for category in categories:
+                    matches[category].add(keyword)
+            return matches
+        
+        found = set()
+        for match in self._pattern.finditer(content):
+            found.update(self._implied[match.group(1)])
+        for category, keywords in self.categories.items():
+            matches[category].update(found & keywords)
+        return matches
+
+
+_KEYWORD_MATCHER = KeywordMatcher(KEYWORD_CATEGORIES)
+
+
+def match_keywords(content: str) -> Dict[str, set]:
+    """
+    Find which call-analysis keywords of each category occur in lowercase content.
+    
+    Args:
+        content: Lowercase text to scan
+        
+    Returns:
+        Mapping of category name ("spam", "success", "booking", "contact") to the
+        set of keywords found
+    """
+    return _KEYWORD_MATCHER.match(content)
+
+
 class CallAnalyzer:
     """Analyzes call content and determines status."""
     
     def __init__(self):
-        self.spam_keywords = [
-            "robocall", "telemarketing", "scam", "fraud", "suspicious",
-            "unwanted", "spam", "junk", "harassment", "threat"
-        ]
-        
-        self.success_keywords = [
-            "appointment", "book", "schedule", "confirm", "details",
-            "name", "email", "phone", "thank you", "goodbye"
-        ]
-        
-        self.booking_keywords = [
-            "appointment", "book", "schedule", "meeting", "consultation",
-            "reservation", "slot", "time", "date", "calendar"
-        ]
+        self.spam_keywords = SPAM_KEYWORDS
+        self.success_keywords = SUCCESS_KEYWORDS
+        self.booking_keywords = BOOKING_KEYWORDS
     
     def analyze_call(self, duration: int, transcription: List[Dict[str, Any]]) -> CallMetrics:
         """
@@ -50,23 +166,30 @@ class CallAnalyzer:
         Returns:
             CallMetrics object with analysis results
         """
-        message_count = len(transcription) if transcription else 0
-        user_messages = [item for item in transcription if item.get("role") == "user"] if transcription else []
-        assistant_messages = [item for item in transcription if item.get("role") == "assistant"] if transcription else []
+        transcription = transcription or []
         
-        user_message_count = len(user_messages)
-        assistant_message_count = len(assistant_messages)
+        # Single pass: count roles and gather lowercase text together
+        user_message_count = 0
+        assistant_message_count = 0
+        content_parts: List[str] = []
+        for item in transcription:
+            role = item.get("role")
+            if role == "user":
+                user_message_count += 1
+            elif role == "assistant":
+                assistant_message_count += 1
+            self._collect_content(item, content_parts)
         
-        # Analyze content
-        all_content = self._extract_all_content(transcription)
-        has_booking_intent = self._has_booking_intent(all_content)
-        has_contact_info = self._has_contact_info(all_content)
-        spam_score = self._calculate_spam_score(all_content)
-        success_score = self._calculate_success_score(all_content)
+        # Analyze content with one keyword scan for all categories
+        matches = match_keywords(" ".join(content_parts))
+        has_booking_intent = bool(matches["booking"])
+        has_contact_info = bool(matches["contact"])
+        spam_score = min(len(matches["spam"]) / len(SPAM_KEYWORDS), 1.0)
+        success_score = min(len(matches["success"]) / len(SUCCESS_KEYWORDS), 1.0)
         
         return CallMetrics(
             duration=duration,
-            message_count=message_count,
+            message_count=len(transcription),
             user_message_count=user_message_count,
             assistant_message_count=assistant_message_count,
             has_booking_intent=has_booking_intent,
@@ -75,62 +198,48 @@ class CallAnalyzer:
             success_score=success_score
         )
     
+    @staticmethod
+    def _collect_content(item: Any, parts: List[str]) -> None:
+        """Append the lowercase text of one transcription item to parts."""
+        if isinstance(item, dict) and "content" in item:
+            content = item["content"]
+            if isinstance(content, str):
+                parts.append(content.lower())
+            elif isinstance(content, list):
+                parts.extend(part.lower() for part in content if isinstance(part, str))
+    
     def _extract_all_content(self, transcription: List[Dict[str, Any]]) -> str:
         """Extract all text content from transcription."""
         if not transcription:
             return ""
         
-        all_content = ""
+        parts: List[str] = []
         for item in transcription:
-            if isinstance(item, dict) and "content" in item:
-                content = item["content"]
-                if isinstance(content, str):
-                    all_content += content.lower() + " "
-                elif isinstance(content, list):
-                    for part in content:
-                        if isinstance(part, str):
-                            all_content += part.lower() + " "
+            self._collect_content(item, parts)
         
-        return all_content.strip()
+        return " ".join(parts).strip()
     
     def _has_booking_intent(self, content: str) -> bool:
         """Check if call has booking intent."""
-        if not content:
-            return False
-        
-        return any(keyword in content for keyword in self.booking_keywords)
+        return bool(content) and bool(match_keywords(content)["booking"])
     
     def _has_contact_info(self, content: str) -> bool:
         """Check if call contains contact information."""
-        if not content:
-            return False
-        
-        contact_indicators = [
-            "my name is", "i'm", "call me", "email", "phone", "number",
-            "contact", "reach me", "get in touch"
-        ]
-        
-        return any(indicator in content for indicator in contact_indicators)
+        return bool(content) and bool(match_keywords(content)["contact"])
     
     def _calculate_spam_score(self, content: str) -> float:
         """Calculate spam likelihood score (0.0 to 1.0)."""
         if not content:
             return 0.0
         
-        spam_matches = sum(1 for keyword in self.spam_keywords if keyword in content)
-        total_keywords = len(self.spam_keywords)
-        
-        return min(spam_matches / total_keywords, 1.0)
+        return min(len(match_keywords(content)["spam"]) / len(SPAM_KEYWORDS), 1.0)
     
     def _calculate_success_score(self, content: str) -> float:
         """Calculate success likelihood score (0.0 to 1.0)."""
         if not content:
             return 0.0
         
-        success_matches = sum(1 for keyword in self.success_keywords if keyword in content)
-        total_keywords = len(self.success_keywords)
-        
-        return min(success_matches / total_keywords, 1.0)
+        return min(len(match_keywords(content)["success"]) / len(SUCCESS_KEYWORDS), 1.0)
     
     def determine_call_status(self, metrics: CallMetrics) -> str:
         """
@@ -176,6 +285,10 @@ class CallAnalyzer:
         return "incomplete"
 
 
+# Stateless, so one shared instance serves every call
+_default_analyzer = CallAnalyzer()
+
+
 def determine_call_status(call_duration: int, transcription: List[Dict[str, Any]]) -> str:
     """
     Determine call status based on duration and transcription content.
@@ -189,6 +302,5 @@ def determine_call_status(call_duration: int, transcription: List[Dict[str, Any]
     Returns:
         Call status string: 'dropped', 'spam', 'no_response', 'completed', 'incomplete'
     """
-    analyzer = CallAnalyzer()
-    metrics = analyzer.analyze_call(call_duration, transcription)
-    return analyzer.determine_call_status(metrics)
+    metrics = _default_analyzer.analyze_call(call_duration, transcription)
+    return _default_analyzer.determine_call_status(metrics)
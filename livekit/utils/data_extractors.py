@@ -3,22 +3,36 @@ Data extraction utilities for phone numbers, names, and other metadata.
 """
 
 import re
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from utils.helpers import parse_metadata
+
+# Common patterns for names in summaries, compiled once
+_SUMMARY_NAME_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'greeting the user,?\s+([A-Z][a-z]+)',  # "greeting the user, Jane"
+    r'customer\s+([A-Z][a-z]+)',  # "customer Jane"
+    r'caller\s+([A-Z][a-z]+)',  # "caller Jane"
+    r'user\s+([A-Z][a-z]+)',  # "user Jane"
+    r'client\s+([A-Z][a-z]+)',  # "client Jane"
+    r'([A-Z][a-z]+)\s+mentioned',  # "Jane mentioned"
+    r'([A-Z][a-z]+)\s+requested',  # "Jane requested"
+    r'([A-Z][a-z]+)\s+asked',  # "Jane asked"
+    r'([A-Z][a-z]+)\s+provided',  # "Jane provided"
+    r'([A-Z][a-z]+)\s+confirmed',  # "Jane confirmed"
+))
+
+
+# Room-name phone patterns, e.g. "assistant-_+12017656193_tVG5An7aEcnF",
+# "inbound-_+12017656193_..." and "+12017656193_..."
+_ASSISTANT_ROOM_PHONE_RE = re.compile(r'assistant-[^_]*_(\+[^_]*)')
+_INBOUND_ROOM_DID_RE = re.compile(r'(?:inbound-[^_]*_)?(\+[^_]*)')
 
 
 def extract_phone_from_room(room_name: str) -> str:
     """Extract phone number from room name."""
-    try:
-        # Handle patterns like "assistant-_+12017656193_tVG5An7aEcnF"
-        if room_name.startswith("assistant-"):
-            parts = room_name.split("_")
-            if len(parts) >= 2:
-                phone_part = parts[1]
-                if phone_part.startswith("+"):
-                    return phone_part
-        return "unknown"
-    except Exception:
-        return "unknown"
+    match = _ASSISTANT_ROOM_PHONE_RE.match(room_name) if isinstance(room_name, str) else None
+    return match.group(1) if match else "unknown"
 
 
 def extract_name_from_summary(summary: str) -> Optional[str]:
@@ -26,22 +40,8 @@ def extract_name_from_summary(summary: str) -> Optional[str]:
     if not summary:
         return None
     
-    # Common patterns for names in summaries
-    patterns = [
-        r'greeting the user,?\s+([A-Z][a-z]+)',  # "greeting the user, Jane"
-        r'customer\s+([A-Z][a-z]+)',  # "customer Jane"
-        r'caller\s+([A-Z][a-z]+)',  # "caller Jane"
-        r'user\s+([A-Z][a-z]+)',  # "user Jane"
-        r'client\s+([A-Z][a-z]+)',  # "client Jane"
-        r'([A-Z][a-z]+)\s+mentioned',  # "Jane mentioned"
-        r'([A-Z][a-z]+)\s+requested',  # "Jane requested"
-        r'([A-Z][a-z]+)\s+asked',  # "Jane asked"
-        r'([A-Z][a-z]+)\s+provided',  # "Jane provided"
-        r'([A-Z][a-z]+)\s+confirmed',  # "Jane confirmed"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, summary, re.IGNORECASE)
+    for pattern in _SUMMARY_NAME_PATTERNS:
+        match = pattern.search(summary)
         if match:
             name = match.group(1).strip()
             # Basic validation - should be a proper name
@@ -53,24 +53,9 @@ def extract_name_from_summary(summary: str) -> Optional[str]:
 
 def extract_did_from_room(room_name: str) -> Optional[str]:
     """Extract DID (phone number) from room name for inbound calls."""
-    try:
-        # 1. Handle prefixed patterns: "inbound-_+12017656193_..."
-        if room_name.startswith("inbound-"):
-            parts = room_name.split("_")
-            if len(parts) >= 2:
-                did_part = parts[1]
-                if did_part.startswith("+"):
-                    return did_part
-        
-        # 2. Handle prefix-less or other patterns: "+12017656193_..."
-        if room_name.startswith("+"):
-            parts = room_name.split("_")
-            if len(parts) >= 1:
-                return parts[0]
-                
-        return None
-    except Exception:
-        return None
+    # Matches both "inbound-_+12017656193_..." and prefix-less "+12017656193_..."
+    match = _INBOUND_ROOM_DID_RE.match(room_name) if isinstance(room_name, str) else None
+    return match.group(1) if match else None
 
 
 def extract_call_sid_from_metadata(ctx_metadata: dict) -> Optional[str]:
@@ -86,3 +71,29 @@ def extract_call_sid_from_metadata(ctx_metadata: dict) -> Optional[str]:
             break
     
     return call_sid
+
+
+def metadata_dict(raw: Any) -> Dict[str, Any]:
+    """Decode a metadata value into a dict, returning {} when empty, invalid or not an object."""
+    if not raw:
+        return {}
+    if isinstance(raw, dict):
+        return raw
+    try:
+        data = parse_metadata(raw) if isinstance(raw, str) else None
+    except ValueError:
+        # JSONDecodeError (stdlib and orjson), binascii.Error and UnicodeDecodeError are all ValueErrors
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+@dataclass(slots=True)
+class CallMetadata:
+    """Room and job metadata for one call, decoded once and shared by the call handler."""
+    room: Dict[str, Any] = field(default_factory=dict)
+    job: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_job_context(cls, ctx) -> "CallMetadata":
+        """Decode metadata from a connected JobContext."""
+        return cls(room=metadata_dict(ctx.room.metadata), job=metadata_dict(ctx.job.metadata))
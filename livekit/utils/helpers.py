@@ -2,9 +2,34 @@
 General utility functions for the LiveKit voice agent system.
 """
 
+import base64
 import hashlib
+import json
+import logging
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    blake3 = None
+    BLAKE3_AVAILABLE = False
+
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    pybase64 = None
+    PYBASE64_AVAILABLE = False
 
 
 def sha256_text(s: str) -> str:
@@ -12,9 +37,147 @@ def sha256_text(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
+def fingerprint_text(s: str) -> str:
+    """
+    Generate a short, non-cryptographic fingerprint of a text string for logging.
+    
+    Uses BLAKE3 when installed (SIMD tree hashing), otherwise SHA256.
+    
+    Args:
+        s: Text to fingerprint (e.g. a full agent prompt)
+        
+    Returns:
+        32-character hex digest
+    """
+    data = s.encode("utf-8")
+    if BLAKE3_AVAILABLE:
+        return blake3(data).hexdigest()[:32]
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+# Base64 decoder chosen once at import; the payload is already checked against
+# _B64_RE, so the decoder itself does not need to re-validate the alphabet.
+_b64decode = pybase64.b64decode if PYBASE64_AVAILABLE else base64.b64decode
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on metadata payloads we are willing to decode; real room/job/participant
+# metadata is a few KB, so anything larger is treated as malformed
+MAX_METADATA_CHARS = 64 * 1024
+
+_B64_RE = re.compile(r"^[A-Za-z0-9+/]+={0,2}$")
+_DID_RE = re.compile(r"\+\d{7,}")
+_NON_DIGIT_RE = re.compile(r'\D')
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$', re.IGNORECASE)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def parse_json(raw: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document, using orjson when it is installed.
+    
+    Args:
+        raw: JSON text as str or bytes
+        
+    Returns:
+        The decoded Python object
+        
+    Raises:
+        json.JSONDecodeError: If the payload is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+        # catching the stdlib exception keep working.
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dump_json(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    Serialize an object to a JSON string, using orjson when it is installed.
+    
+    Args:
+        obj: Object to serialize
+        default: Fallback for objects the encoder does not handle (e.g. str)
+        
+    Returns:
+        Compact JSON text
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, default=default)
+
+
+def parse_json_or_b64(raw: Union[str, bytes]) -> Any:
+    """
+    Parse a metadata payload that may be plain JSON or base64-wrapped JSON.
+    
+    Args:
+        raw: JSON text, or base64 text encoding a JSON document
+        
+    Returns:
+        The decoded Python object
+        
+    Raises:
+        json.JSONDecodeError: If the payload is neither JSON nor base64 JSON
+    """
+    text = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
+    text = text.strip()
+    
+    # JSON objects/arrays start with a bracket; never try base64 on them
+    if text[:1] in ("{", "["):
+        return parse_json(text)
+    
+    # Only attempt base64 when the payload could actually be base64
+    if text and len(text) % 4 == 0 and _B64_RE.match(text):
+        try:
+            # The regex guarantees ASCII, so the decoder can take the str directly
+            return parse_json(_b64decode(text, validate=False))
+        except (ValueError, TypeError):
+            # binascii.Error and UnicodeDecodeError are ValueErrors
+            pass
+    
+    # Neither form; let the JSON parser produce the error (or accept a bare scalar)
+    return parse_json(text)
+
+
+def parse_metadata(raw: str) -> Any:
+    """
+    Parse a LiveKit metadata string once and reuse the result.
+    
+    Room, job and participant metadata are read at several points during a call;
+    each distinct payload is decoded only the first time. The returned object is
+    shared between callers and must be treated as read-only.
+    
+    Args:
+        raw: Metadata string (plain or base64-wrapped JSON)
+        
+    Returns:
+        The decoded Python object, or an empty dict if the payload exceeds
+        MAX_METADATA_CHARS
+        
+    Raises:
+        json.JSONDecodeError: If the payload is neither JSON nor base64 JSON
+    """
+    # Checked before the cache so oversized payloads are never kept as cache keys
+    if len(raw) > MAX_METADATA_CHARS:
+        logger.warning("METADATA_TOO_LARGE | length=%s | limit=%s", len(raw), MAX_METADATA_CHARS)
+        return {}
+    return _parse_metadata_cached(raw)
+
+
+@lru_cache(maxsize=64)
+def _parse_metadata_cached(raw: str) -> Any:
+    """Memoized parse_json_or_b64 for payloads already checked against MAX_METADATA_CHARS."""
+    return parse_json_or_b64(raw)
+
+
 def preview(s: str, n: int = 160) -> str:
     """Create a preview of text with ellipsis if truncated."""
-    return s[:n] + ("…" if len(s) > n else "")
+    if len(s) <= n:
+        return s
+    return s[:n] + "…"
 
 
 def extract_called_did(room_name: str) -> Optional[str]:
@@ -31,7 +194,7 @@ def extract_called_did(room_name: str) -> Optional[str]:
         return None
     
     # Look for phone number pattern in room name
-    m = re.search(r'\+\d{7,}', room_name)
+    m = _DID_RE.search(room_name)
     return m.group(0) if m else None
 
 
@@ -49,7 +212,7 @@ def validate_phone_number(phone: str) -> bool:
         return False
     
     # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
+    digits = _NON_DIGIT_RE.sub('', phone)
     
     # Check if it's a valid length (7-15 digits)
     return 7 <= len(digits) <= 15
@@ -69,8 +232,7 @@ def validate_email(email: str) -> bool:
         return False
     
     # Basic email regex pattern
-    pattern = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
-    return bool(re.match(pattern, email.strip(), re.IGNORECASE))
+    return bool(_EMAIL_RE.match(email.strip()))
 
 
 def sanitize_text(text: str) -> str:
@@ -87,8 +249,8 @@ def sanitize_text(text: str) -> str:
         return ""
     
     # Remove control characters and normalize whitespace
-    sanitized = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
-    sanitized = re.sub(r'\s+', ' ', sanitized).strip()
+    sanitized = _CONTROL_CHARS_RE.sub('', text)
+    sanitized = _WHITESPACE_RE.sub(' ', sanitized).strip()
     
     return sanitized
 
@@ -17,7 +17,7 @@ async def build_analysis_instructions(config: Dict[str, Any], classify_data_fiel
     # Handle case where structured_data_fields is None
     if structured_data is None:
         structured_data = []
-    logger.info(f"ANALYSIS_INSTRUCTIONS_DEBUG | structured_data_count={len(structured_data)} | data={structured_data}")
+    logger.info("ANALYSIS_INSTRUCTIONS_DEBUG | structured_data_count=%d | data=%s", len(structured_data), structured_data)
     if structured_data:
         # Use LLM to classify fields
         try:
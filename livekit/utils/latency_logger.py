@@ -11,7 +11,8 @@ from typing import Optional, Dict, Any, Callable, Union
 from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
-import json
+
+from utils.helpers import dump_json
 
 
 logger = logging.getLogger(__name__)
@@ -49,7 +50,7 @@ class LatencyTracker:
             f"operation={measurement.operation} | "
             f"duration_ms={measurement.duration_ms:.2f} | "
             f"status={status} | "
-            f"metadata={json.dumps(measurement.metadata)}"
+            f"metadata={dump_json(measurement.metadata)}"
         )
         
         if measurement.error:
@@ -211,7 +212,7 @@ def measure_latency(
                             f"operation={operation} | "
                             f"duration_ms={duration_ms:.2f} | "
                             f"status={status} | "
-                            f"metadata={json.dumps(metadata or {})}"
+                            f"metadata={dump_json(metadata or {})}"
                         )
             
             return async_wrapper
@@ -253,7 +254,7 @@ def measure_latency(
                             f"operation={operation} | "
                             f"duration_ms={duration_ms:.2f} | "
                             f"status={status} | "
-                            f"metadata={json.dumps(metadata or {})}"
+                            f"metadata={dump_json(metadata or {})}"
                         )
             
             return sync_wrapper
@@ -307,7 +308,7 @@ async def measure_latency_context(
                 f"operation={operation} | "
                 f"duration_ms={duration_ms:.2f} | "
                 f"status={status} | "
-                f"metadata={json.dumps(metadata or {})}"
+                f"metadata={dump_json(metadata or {})}"
             )
 
 
@@ -357,7 +358,7 @@ def measure_latency_sync_context(
                 f"operation={operation} | "
                 f"duration_ms={duration_ms:.2f} | "
                 f"status={status} | "
-                f"metadata={json.dumps(metadata or {})}"
+                f"metadata={dump_json(metadata or {})}"
             )
 
 
@@ -400,7 +401,7 @@ def log_latency_measurement(
             f"operation={operation} | "
             f"duration_ms={duration_ms:.2f} | "
             f"status={status} | "
-            f"metadata={json.dumps(metadata or {})}"
+            f"metadata={dump_json(metadata or {})}"
         )
 
 
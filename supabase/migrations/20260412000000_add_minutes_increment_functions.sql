@@ -0,0 +1,35 @@
+-- Atomic minutes increments for post-call deduction
+-- Migration Date: 2026-04-12
+
+-- The voice agent used to read minutes_used and write back minutes_used + n, which costs
+-- two round-trips and loses increments when calls for the same user end concurrently.
+-- These functions do the increment in a single UPDATE and return the new totals.
+
+CREATE OR REPLACE FUNCTION public.increment_user_minutes_used(p_user_id UUID, p_minutes INTEGER)
+RETURNS TABLE (minutes_limit INTEGER, minutes_used INTEGER, is_unlimited BOOLEAN)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE public.users u
+  SET minutes_used = COALESCE(u.minutes_used, 0) + p_minutes
+  WHERE u.id = p_user_id
+  RETURNING COALESCE(u.minutes_limit, 0), u.minutes_used, COALESCE(u.is_unlimited, false);
+$$;
+
+CREATE OR REPLACE FUNCTION public.increment_workspace_minutes_used(p_workspace_id UUID, p_minutes INTEGER)
+RETURNS TABLE (minute_limit INTEGER, minutes_used INTEGER)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE public.workspace_settings w
+  SET minutes_used = COALESCE(w.minutes_used, 0) + p_minutes
+  WHERE w.id = p_workspace_id
+  RETURNING COALESCE(w.minute_limit, 0), w.minutes_used;
+$$;
+
+REVOKE ALL ON FUNCTION public.increment_user_minutes_used(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.increment_workspace_minutes_used(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.increment_user_minutes_used(UUID, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.increment_workspace_minutes_used(UUID, INTEGER) TO service_role;